@@ -1,11 +1,41 @@
 import streamlit as st
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import asyncio
 import json
+from urllib.parse import urlencode
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, date
 import os
 
-# Notion API設定
-NOTION_API_URL = "https://api.notion.com/v1"
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+import metrics
+from notion_errors import NotionQueryError
+from notion_mirror import NotionMirror, normalize_id
+from score_queue import ScoreWriteQueue, start_flush_worker
+from scoring import olympic_rates, score_round, settle, settlement_relations
+from season_ledger import SeasonLedger
+from player_stats import PlayerStats
+from records import Score, parse_game_page, parse_score_page, parse_user_page
+from scoreboard import (
+    ScoreBoard,
+    olympic_table,
+    scorecard_table,
+    snake_out_totals,
+    snake_table,
+    special_score_counts
+)
+
+# Notion API設定（環境変数 NOTION_API_URL でローカルの代替サーバーなどに切り替え可能）
+NOTION_API_URL = os.environ.get("NOTION_API_URL", "https://api.notion.com/v1")
 API_KEY = st.secrets["notion"]["api_key"]
 USER_DB_ID = st.secrets["notion"]["user_db_id"]
 GAME_DB_ID = st.secrets["notion"]["game_db_id"]
@@ -17,23 +47,291 @@ HEADERS = {
     "Notion-Version": "2022-06-28"
 }
 
+# スコア入力画面で使うスコアのプロパティ
+SCORE_ENTRY_PROPERTIES = ["id", "game", "user", "hole", "stroke", "putt", "snake", "olympic", "snake_out"]
+
+# ローカルデータ（オフライン保存の待ち行列・Notionの複製など）の保存先
+LOCAL_DB_PATH = os.environ.get(
+    "GOLF_LOCAL_DB",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "golf_local.db")
+)
+
+# Notion APIの1ページあたりの最大取得件数
+QUERY_PAGE_SIZE = 100
+
+# サイドバーでラウンドを選択するメニュー
+ROUND_MENUS = ["ラウンド編集", "スコア入力", "スコア確認", "計算シート"]
+
+# サイドバーのラウンド選択で1回に取得する件数と、並び順（プレー日の新しい順）
+GAME_PAGE_SIZE = 20
+GAME_SORTS = [
+    {"property": "play_date", "direction": "descending"},
+    {"property": "id", "direction": "descending"}
+]
+
+# HTTP接続設定（接続プール・リトライ）
+POOL_SIZE = 10
+MAX_RETRIES = 3
+BACKOFF_FACTOR = 0.5  # 0.5秒, 1秒, 2秒... と待ち時間を倍増
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+# ページ作成は5xx・読み取りタイムアウトでは作成済みの可能性があるため、429（未処理が確実）のときだけ再試行する
+PAGE_CREATE_RETRY_STATUS_CODES = (429,)
+REQUEST_TIMEOUT = 30
+
+# 読み取りキャッシュの有効期限（秒、データベースごと）
+CACHE_TTL = {
+    USER_DB_ID: 300,
+    GAME_DB_ID: 60,
+    SCORE_DB_ID: 30
+}
+DEFAULT_CACHE_TTL = 30
+
+# Notionのレート制限（平均約3リクエスト/秒）に合わせた送信設定
+REQUESTS_PER_SECOND = 3
+REQUEST_BURST = 4
+MAX_CONCURRENT_WRITES = 4
+
+def _request_operation(method, url):
+    """計測用にリクエストの種類を分類する"""
+    if url.endswith("/query") or "/query?" in url:
+        return "query_database"
+    if "/databases/" in url:
+        return "retrieve_database"
+    return "create_page" if method == "POST" else "update_page"
+
+class RateLimiter:
+    """トークンバケット方式のレートリミッター（スレッドセーフ）"""
+    def __init__(self, rate=REQUESTS_PER_SECOND, burst=REQUEST_BURST):
+        self.rate = rate
+        self.capacity = burst
+        self._tokens = burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def reserve(self):
+        """トークンを1つ予約し、送信可能になるまでの待ち時間（秒）を返す"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            return max(0.0, -self._tokens / self.rate)
+    
+    def acquire(self):
+        """送信可能になるまで待機する"""
+        wait_time = self.reserve()
+        if wait_time > 0:
+            time.sleep(wait_time)
+    
+    async def acquire_async(self):
+        """送信可能になるまで待機する（イベントループを止めない）"""
+        wait_time = self.reserve()
+        if wait_time > 0:
+            await asyncio.sleep(wait_time)
+
+class PageCreateRetry(Retry):
+    """ページの作成・更新用のリトライ設定（POSTは429のときだけ再試行し、二重作成を防ぐ）"""
+    def is_retry(self, method, status_code, has_retry_after=False):
+        if method.upper() == "POST":
+            return status_code in PAGE_CREATE_RETRY_STATUS_CODES
+        return super().is_retry(method, status_code, has_retry_after)
+
 class NotionClient:
-    def __init__(self):
+    def __init__(self, pool_size=POOL_SIZE, max_retries=MAX_RETRIES, backoff_factor=BACKOFF_FACTOR, rate_limiter=None):
         self.headers = HEADERS
+        self.session = self._create_session(pool_size, max_retries, backoff_factor)
+        # 全セッションでレート制限を共有できるよう外から渡せる
+        self.rate_limiter = rate_limiter or RateLimiter()
+        
+        # 読み取りキャッシュ（クライアントはセッション間で共有されるためロックで保護）
+        self._cache = {}
+        self._cache_generation = {}
+        self._cache_lock = threading.Lock()
+        self._error_count = 0
+        self._invalidation_listeners = []
+        self._property_ids = {}
+        self.cache_stats = {"hits": 0, "misses": 0}
     
-    def query_database(self, db_id, filter_dict=None):
-        """データベースをクエリする"""
+    def _create_session(self, pool_size, max_retries, backoff_factor):
+        """接続プールとリトライ設定済みのセッションを作成する"""
+        # 429/5xxは指数バックオフで再試行し、Retry-Afterヘッダーがあればそれに従う
+        # （データベースのクエリはPOSTだが読み取りなので、5xxでも再試行してよい）
+        retry = Retry(
+            total=max_retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=RETRY_STATUS_CODES,
+            allowed_methods=frozenset(["GET", "POST", "PATCH"]),
+            respect_retry_after_header=True,
+            raise_on_status=False
+        )
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+        # /pages への送信（作成・更新）は別のアダプターにし、作成は429以外では再送しない
+        page_retry = PageCreateRetry(
+            total=max_retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=RETRY_STATUS_CODES,
+            allowed_methods=frozenset(["GET", "PATCH"]),
+            respect_retry_after_header=True,
+            raise_on_status=False
+        )
+        page_adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=page_retry)
+        
+        session = requests.Session()
+        session.headers.update(self.headers)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        session.mount(f"{NOTION_API_URL}/pages", page_adapter)
+        return session
+    
+    def _request(self, method, url, payload=None):
+        """APIリクエストを送信し、(レスポンスJSON, エラーメッセージ)を返す"""
+        operation = _request_operation(method, url)
+        with metrics.registry.timer("notion_rate_limit_wait_seconds", operation=operation):
+            self.rate_limiter.acquire()
+        
+        started = time.perf_counter()
+        try:
+            response = self.session.request(
+                method,
+                url,
+                data=json.dumps(payload) if payload is not None else None,
+                timeout=REQUEST_TIMEOUT
+            )
+        except requests.RequestException as e:
+            self._error_count += 1
+            metrics.registry.inc("notion_requests_total", operation=operation, status="error")
+            return None, str(e)
+        finally:
+            metrics.registry.observe("notion_request_seconds", time.perf_counter() - started, operation=operation)
+        
+        metrics.registry.inc("notion_requests_total", operation=operation, status=str(response.status_code))
+        metrics.registry.inc("notion_response_bytes_total", len(response.content or b""), operation=operation)
+        if response.status_code == 200:
+            with metrics.registry.timer("notion_json_decode_seconds", operation=operation):
+                return response.json(), None
+        self._error_count += 1
+        return None, f"{response.status_code} - {response.text}"
+    
+    @property
+    def error_count(self):
+        """これまでに失敗したリクエストの件数"""
+        return self._error_count
+    
+    def _cached(self, db_id, key, loader):
+        """TTL付きキャッシュから取得し、期限切れ・未取得ならloaderで読み込む
+
+        loader は (値, 全件取得できたか) を返す。取得に失敗した値は返すだけでキャッシュしない
+        """
+        hit, value, token = self.cache_lookup(db_id, key)
+        if hit:
+            return value
+        value, complete = loader()
+        if complete:
+            self.cache_store(db_id, token, value)
+        return value
+    
+    def cache_lookup(self, db_id, key):
+        """キャッシュを引き、(ヒットしたか, 値, cache_store に渡すトークン) を返す"""
+        cache_key = (normalize_id(db_id), key)
+        with self._cache_lock:
+            entry = self._cache.get(cache_key)
+            if entry and entry[0] > time.monotonic():
+                self.cache_stats["hits"] += 1
+                return True, entry[1], None
+            self.cache_stats["misses"] += 1
+            return False, None, (cache_key, self._generation(cache_key[0]))
+    
+    def cache_store(self, db_id, token, value):
+        """cache_lookup で外れた値を、全件読み込んだ後にキャッシュへ保存する"""
+        cache_key, generation = token
+        with self._cache_lock:
+            # 読み込み中に書き込み（無効化）があった場合は保存しない
+            if generation == self._generation(cache_key[0]):
+                expires_at = time.monotonic() + CACHE_TTL.get(db_id, DEFAULT_CACHE_TTL)
+                self._cache[cache_key] = (expires_at, value)
+    
+    def _generation(self, normalized_id):
+        """無効化の世代番号（全体・データベース単位）を返す"""
+        return (self._cache_generation.get(None, 0), self._cache_generation.get(normalized_id, 0))
+    
+    def invalidate_cache(self, db_id=None):
+        """キャッシュを破棄する（db_id指定時はそのデータベース分のみ）"""
+        normalized_id = normalize_id(db_id)
+        with self._cache_lock:
+            if normalized_id is None:
+                self._cache.clear()
+            else:
+                self._cache = {key: entry for key, entry in self._cache.items() if key[0] != normalized_id}
+            self._cache_generation[normalized_id] = self._cache_generation.get(normalized_id, 0) + 1
+        
+        for listener in self._invalidation_listeners:
+            listener(normalized_id)
+    
+    def add_invalidation_listener(self, listener):
+        """書き込みでキャッシュが破棄されたときに呼ばれる関数を登録する（引数はdb_id、全体の場合はNone）"""
+        self._invalidation_listeners.append(listener)
+    
+    def query_database(self, db_id, filter_dict=None, start_cursor=None, sorts=None, filter_properties=None, page_size=QUERY_PAGE_SIZE):
+        """データベースを1ページ分クエリする（全件は iter_query で next_cursor をたどって取得する）
+
+        filter_properties を指定した場合は、そのプロパティ（名前またはID）だけを取得する
+        """
         url = f"{NOTION_API_URL}/databases/{db_id}/query"
-        payload = {}
+        if filter_properties:
+            # filter_properties はプロパティIDで指定する必要があるため、名前から変換する
+            property_ids = self.get_property_ids(db_id)
+            url += "?" + urlencode([("filter_properties", property_ids.get(name, name)) for name in filter_properties])
+        payload = {"page_size": page_size}
         if filter_dict:
             payload["filter"] = filter_dict
-        
-        response = requests.post(url, headers=self.headers, data=json.dumps(payload))
-        if response.status_code == 200:
-            return response.json()
-        else:
-            st.error(f"Error querying database: {response.status_code} - {response.text}")
-            return None
+        if sorts:
+            payload["sorts"] = sorts
+        if start_cursor:
+            payload["start_cursor"] = start_cursor
+        
+        result, error = self._request("POST", url, payload)
+        if error:
+            st.error(f"Error querying database: {error}")
+        return result
+    
+    def iter_query(self, db_id, filter_dict=None, sorts=None, filter_properties=None, raise_on_error=False):
+        """データベースをページ単位でクエリし、結果を1件ずつ返すジェネレータ
+
+        取得に失敗するとそこで終了する。raise_on_error=True の場合は NotionQueryError を送出し、
+        途中までの結果を全件と取り違えないようにする
+        """
+        start_cursor = None
+        while True:
+            result = self.query_database(
+                db_id,
+                filter_dict,
+                start_cursor=start_cursor,
+                sorts=sorts,
+                filter_properties=filter_properties
+            )
+            if not result or "results" not in result:
+                if raise_on_error:
+                    raise NotionQueryError(f"{db_id} のクエリに失敗しました")
+                return
+            yield from result["results"]
+            
+            # 次のページがなければ終了
+            if not result.get("has_more") or not result.get("next_cursor"):
+                return
+            start_cursor = result["next_cursor"]
+    
+    def get_property_ids(self, db_id):
+        """データベースのプロパティ名→プロパティIDの対応を取得（スキーマは変わらない前提で保持）"""
+        normalized_id = normalize_id(db_id)
+        if normalized_id not in self._property_ids:
+            result, error = self._request("GET", f"{NOTION_API_URL}/databases/{db_id}")
+            if error:
+                st.error(f"Error retrieving database: {error}")
+                return {}
+            self._property_ids[normalized_id] = {
+                name: prop["id"] for name, prop in result.get("properties", {}).items()
+            }
+        return self._property_ids[normalized_id]
     
     def create_page(self, db_id, properties):
         """新しいページを作成する"""
@@ -43,172 +341,1229 @@ class NotionClient:
             "properties": properties
         }
         
-        response = requests.post(url, headers=self.headers, data=json.dumps(payload))
-        if response.status_code == 200:
-            return response.json()
+        result, error = self._request("POST", url, payload)
+        if error:
+            st.error(f"Error creating page: {error}")
         else:
-            st.error(f"Error creating page: {response.status_code} - {response.text}")
-            return None
+            self.invalidate_cache(db_id)
+        return result
     
     def update_page(self, page_id, properties):
         """ページを更新する"""
         url = f"{NOTION_API_URL}/pages/{page_id}"
         payload = {"properties": properties}
         
-        response = requests.patch(url, headers=self.headers, data=json.dumps(payload))
-        if response.status_code == 200:
-            return response.json()
+        result, error = self._request("PATCH", url, payload)
+        if error:
+            st.error(f"Error updating page: {error}")
         else:
-            st.error(f"Error updating page: {response.status_code} - {response.text}")
-            return None
+            # 更新したページの親データベースのキャッシュを破棄（不明な場合は全て）
+            self.invalidate_cache(result.get("parent", {}).get("database_id"))
+        return result
+    
+    def batch_write(self, writes):
+        """複数ページの作成・更新を並列に送信する
+        
+        writes: {"db_id", "properties", "page_id"（更新時のみ）} のリスト
+        戻り値: 各書き込みの (レスポンスJSON, エラーメッセージ) を writes と同じ順番で返す
+        """
+        if not writes:
+            return []
+        
+        with ThreadPoolExecutor(max_workers=min(MAX_CONCURRENT_WRITES, len(writes))) as executor:
+            outcomes = list(executor.map(self._send_write, writes))
+        
+        for db_id in {write["db_id"] for write in writes}:
+            self.invalidate_cache(db_id)
+        return outcomes
+    
+    def _send_write(self, write):
+        """1件の作成・更新リクエストを送信する（page_idがあれば更新）"""
+        if write.get("page_id"):
+            url = f"{NOTION_API_URL}/pages/{write['page_id']}"
+            return self._request("PATCH", url, {"properties": write["properties"]})
+        
+        url = f"{NOTION_API_URL}/pages"
+        payload = {
+            "parent": {"database_id": write["db_id"]},
+            "properties": write["properties"]
+        }
+        return self._request("POST", url, payload)
     
     def get_users(self):
         """ユーザー一覧を取得"""
-        result = self.query_database(USER_DB_ID)
-        users = []
-        if result and "results" in result:
-            for page in result["results"]:
-                user_id = page["properties"]["id"]["title"][0]["text"]["content"] if page["properties"]["id"]["title"] else ""
-                user_name = page["properties"]["name"]["rich_text"][0]["text"]["content"] if page["properties"]["name"]["rich_text"] else ""
-                name_display = page["properties"]["name_display"]["rich_text"][0]["text"]["content"] if page["properties"].get("name_display", {}).get("rich_text") else user_name[:3]
-                users.append({"id": user_id, "name": user_name, "name_display": name_display, "page_id": page["id"]})
-        return users
+        return self._cached(USER_DB_ID, "users", self._load_users)
+    
+    def _load_users(self):
+        return self._load_pages(parse_user_page, "user", USER_DB_ID)
     
     def get_games(self):
         """ラウンド一覧を取得"""
-        result = self.query_database(GAME_DB_ID)
-        games = []
-        if result and "results" in result:
+        return self._cached(GAME_DB_ID, "games", self._load_games)
+    
+    def _load_games(self):
+        return self._load_pages(parse_game_page, "game", GAME_DB_ID)
+    
+    def get_games_page(self, filter_dict=None, start_cursor=None, page_size=GAME_PAGE_SIZE):
+        """ラウンドをプレー日の新しい順に1ページ分取得し、(ラウンド一覧, 次ページのカーソル) を返す"""
+        cache_key = games_page_cache_key(filter_dict, start_cursor, page_size)
+        return self._cached(GAME_DB_ID, cache_key, lambda: self._load_games_page(filter_dict, start_cursor, page_size))
+    
+    def _load_games_page(self, filter_dict, start_cursor, page_size):
+        result = self.query_database(
+            GAME_DB_ID,
+            filter_dict,
+            start_cursor=start_cursor,
+            sorts=GAME_SORTS,
+            page_size=page_size
+        )
+        if not result or "results" not in result:
+            return ([], None), False
+        next_cursor = result.get("next_cursor") if result.get("has_more") else None
+        return (parse_pages(parse_game_page, result["results"], "game"), next_cursor), True
+    
+    def get_scores(self, game=None, hole=None, filter_properties=None, raise_on_error=False):
+        """スコア一覧を取得（ラウンド・ホールで絞り込み可能、raise_on_error は iter_query と同じ）"""
+        cache_key = scores_cache_key(game, hole, filter_properties)
+        return self._cached(SCORE_DB_ID, cache_key, lambda: self._load_scores(game, hole, filter_properties, raise_on_error))
+    
+    def _load_scores(self, game, hole, filter_properties, raise_on_error):
+        return self._load_pages(parse_score_page, "score", SCORE_DB_ID, score_filter(game, hole), filter_properties, raise_on_error)
+    
+    def _load_pages(self, parser, kind, db_id, filter_dict=None, filter_properties=None, raise_on_error=False):
+        """全ページを取得しながら変換し、(変換結果, 全件取得できたか) を返す
+
+        取得に失敗した場合は途中までの結果を返す（raise_on_error=True なら NotionQueryError を送出）
+        """
+        complete = True
+        
+        def pages():
+            nonlocal complete
+            try:
+                yield from self.iter_query(db_id, filter_dict, filter_properties=filter_properties, raise_on_error=True)
+            except NotionQueryError:
+                if raise_on_error:
+                    raise
+                complete = False
+        
+        return parse_pages(parser, pages(), kind), complete
+
+def games_page_cache_key(filter_dict, start_cursor, page_size):
+    """get_games_page のキャッシュキー"""
+    return ("games_page", json.dumps(filter_dict, sort_keys=True), start_cursor, page_size)
+
+def scores_cache_key(game, hole, filter_properties):
+    """get_scores のキャッシュキー"""
+    return (
+        "scores",
+        game["page_id"] if game else None,
+        hole,
+        tuple(filter_properties) if filter_properties else None
+    )
+
+def score_filter(game, hole):
+    """スコアをラウンド・ホールで絞り込むフィルター（どちらも指定しなければNone）"""
+    filters = []
+    if game:
+        # ラウンドのリレーションで絞り込む
+        # （リレーションが未設定の古いスコアはIDの前方一致で拾う。"_"まで含めて別ラウンドとの誤一致を防ぐ）
+        filters.append({
+            "or": [
+                {"property": "game", "relation": {"contains": game["page_id"]}},
+                {"property": "id", "title": {"starts_with": f"{game['id']}_"}}
+            ]
+        })
+    if hole:
+        filters.append({"property": "hole", "number": {"equals": hole}})
+    
+    if len(filters) == 1:
+        return filters[0]
+    if filters:
+        return {"and": filters}
+    return None
+
+def parse_pages(parser, pages, kind):
+    """ページを順に変換し、変換だけにかかった時間（取得の待ち時間を除く）を記録する"""
+    parsed = []
+    parse_seconds = 0.0
+    for page in pages:
+        started = time.perf_counter()
+        parsed.append(parser(page))
+        parse_seconds += time.perf_counter() - started
+    metrics.registry.observe("page_parse_seconds", parse_seconds, kind=kind)
+    return parsed
+
+class AsyncNotionClient:
+    """asyncio版のNotionクライアント（httpxが必要）
+
+    NotionClient と同じメソッドを async で提供する。元の NotionClient とレート制限・読み取りキャッシュを共有し、
+    書き込み時はそのキャッシュを破棄するため、同期側と混ぜて使っても送信ペースと表示は変わらない。
+    httpxのクライアントはイベントループごとに作るため、async with の中で使う
+        async with AsyncNotionClient(notion) as client:
+            users, games = await asyncio.gather(client.get_users(), client.get_games())
+    """
+    def __init__(self, client, pool_size=POOL_SIZE, max_retries=MAX_RETRIES, backoff_factor=BACKOFF_FACTOR):
+        if httpx is None:
+            raise RuntimeError("AsyncNotionClient を使うには httpx をインストールしてください")
+        self.client = client
+        self.rate_limiter = client.rate_limiter
+        self.pool_size = pool_size
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.http = None
+        self._property_ids = {}
+    
+    async def __aenter__(self):
+        self.http = httpx.AsyncClient(
+            headers=self.client.headers,
+            timeout=REQUEST_TIMEOUT,
+            limits=httpx.Limits(max_connections=self.pool_size, max_keepalive_connections=self.pool_size)
+        )
+        return self
+    
+    async def __aexit__(self, *exc_info):
+        await self.http.aclose()
+        self.http = None
+    
+    def _retry_wait(self, response, retry_count):
+        """再試行までの待ち時間（Retry-Afterがあればそれに従い、なければ同期版と同じ指数バックオフ）"""
+        retry_after = response.headers.get("Retry-After") if response is not None else None
+        if retry_after:
+            try:
+                return float(retry_after)
+            except ValueError:
+                pass
+        return 0.0 if retry_count == 0 else self.backoff_factor * (2 ** retry_count)
+    
+    async def _request(self, method, url, payload=None):
+        """APIリクエストを送信し、(レスポンスJSON, エラーメッセージ)を返す
+
+        再試行の条件は NotionClient のセッションと同じ（429/5xxを再試行し、ページの作成は429のときだけ）。
+        送信前の接続エラーは再試行するが、送信後の読み取りエラーは作成済みの可能性があるためページの作成では再試行しない
+        """
+        operation = _request_operation(method, url)
+        is_page_create = method == "POST" and operation == "create_page"
+        retry_status_codes = PAGE_CREATE_RETRY_STATUS_CODES if is_page_create else RETRY_STATUS_CODES
+        for retry_count in range(self.max_retries + 1):
+            with metrics.registry.timer("notion_rate_limit_wait_seconds", operation=operation):
+                await self.rate_limiter.acquire_async()
+            
+            started = time.perf_counter()
+            try:
+                response = await self.http.request(
+                    method,
+                    url,
+                    content=json.dumps(payload) if payload is not None else None
+                )
+            except httpx.TransportError as e:
+                metrics.registry.inc("notion_requests_total", operation=operation, status="error")
+                error = str(e) or type(e).__name__
+                response = None
+                retryable = isinstance(e, (httpx.ConnectError, httpx.ConnectTimeout)) or not is_page_create
+            else:
+                metrics.registry.inc("notion_requests_total", operation=operation, status=str(response.status_code))
+                metrics.registry.inc("notion_response_bytes_total", len(response.content or b""), operation=operation)
+                if response.status_code == 200:
+                    with metrics.registry.timer("notion_json_decode_seconds", operation=operation):
+                        return response.json(), None
+                error = f"{response.status_code} - {response.text}"
+                retryable = response.status_code in retry_status_codes
+            finally:
+                metrics.registry.observe("notion_request_seconds", time.perf_counter() - started, operation=operation)
+            
+            if not retryable or retry_count == self.max_retries:
+                break
+            await asyncio.sleep(self._retry_wait(response, retry_count))
+        return None, error
+    
+    async def query_database(self, db_id, filter_dict=None, start_cursor=None, sorts=None, filter_properties=None, page_size=QUERY_PAGE_SIZE):
+        """データベースを1ページ分クエリする（引数は NotionClient.query_database と同じ）"""
+        url = f"{NOTION_API_URL}/databases/{db_id}/query"
+        if filter_properties:
+            property_ids = await self.get_property_ids(db_id)
+            url += "?" + urlencode([("filter_properties", property_ids.get(name, name)) for name in filter_properties])
+        payload = {"page_size": page_size}
+        if filter_dict:
+            payload["filter"] = filter_dict
+        if sorts:
+            payload["sorts"] = sorts
+        if start_cursor:
+            payload["start_cursor"] = start_cursor
+        
+        result, error = await self._request("POST", url, payload)
+        if error:
+            st.error(f"Error querying database: {error}")
+        return result
+    
+    async def iter_query(self, db_id, filter_dict=None, sorts=None, filter_properties=None, raise_on_error=False):
+        """データベースをページ単位でクエリし、結果を1件ずつ返す非同期ジェネレータ（raise_on_error は NotionClient.iter_query と同じ）"""
+        start_cursor = None
+        while True:
+            result = await self.query_database(
+                db_id,
+                filter_dict,
+                start_cursor=start_cursor,
+                sorts=sorts,
+                filter_properties=filter_properties
+            )
+            if not result or "results" not in result:
+                if raise_on_error:
+                    raise NotionQueryError(f"{db_id} のクエリに失敗しました")
+                return
             for page in result["results"]:
-                game_id = page["properties"]["id"]["title"][0]["text"]["content"] if page["properties"]["id"]["title"] else ""
-                play_date = page["properties"]["play_date"]["date"]["start"] if page["properties"]["play_date"]["date"] else ""
-                place = page["properties"]["place"]["rich_text"][0]["text"]["content"] if page["properties"]["place"]["rich_text"] else ""
-                par = page["properties"]["par"]["number"] if "par" in page["properties"] and page["properties"]["par"]["number"] else 72
+                yield page
+            
+            if not result.get("has_more") or not result.get("next_cursor"):
+                return
+            start_cursor = result["next_cursor"]
+    
+    async def get_property_ids(self, db_id):
+        """データベースのプロパティ名→プロパティIDの対応を取得（スキーマは変わらない前提で保持）"""
+        normalized_id = normalize_id(db_id)
+        if normalized_id not in self._property_ids:
+            result, error = await self._request("GET", f"{NOTION_API_URL}/databases/{db_id}")
+            if error:
+                st.error(f"Error retrieving database: {error}")
+                return {}
+            self._property_ids[normalized_id] = {
+                name: prop["id"] for name, prop in result.get("properties", {}).items()
+            }
+        return self._property_ids[normalized_id]
+    
+    async def create_page(self, db_id, properties):
+        """新しいページを作成する"""
+        payload = {
+            "parent": {"database_id": db_id},
+            "properties": properties
+        }
+        result, error = await self._request("POST", f"{NOTION_API_URL}/pages", payload)
+        if error:
+            st.error(f"Error creating page: {error}")
+        else:
+            self.client.invalidate_cache(db_id)
+        return result
+    
+    async def update_page(self, page_id, properties):
+        """ページを更新する"""
+        result, error = await self._request("PATCH", f"{NOTION_API_URL}/pages/{page_id}", {"properties": properties})
+        if error:
+            st.error(f"Error updating page: {error}")
+        else:
+            self.client.invalidate_cache(result.get("parent", {}).get("database_id"))
+        return result
+    
+    async def batch_write(self, writes):
+        """複数ページの作成・更新を並行して送信する（戻り値は NotionClient.batch_write と同じ）"""
+        if not writes:
+            return []
+        
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_WRITES)
+        
+        async def send(write):
+            async with semaphore:
+                if write.get("page_id"):
+                    return await self._request("PATCH", f"{NOTION_API_URL}/pages/{write['page_id']}", {"properties": write["properties"]})
+                payload = {
+                    "parent": {"database_id": write["db_id"]},
+                    "properties": write["properties"]
+                }
+                return await self._request("POST", f"{NOTION_API_URL}/pages", payload)
+        
+        outcomes = await asyncio.gather(*(send(write) for write in writes))
+        for db_id in {write["db_id"] for write in writes}:
+            self.client.invalidate_cache(db_id)
+        return list(outcomes)
+    
+    async def _cached(self, db_id, key, loader):
+        """NotionClientのキャッシュから取得し、外れたらloader（コルーチン関数）で読み込む"""
+        hit, value, token = self.client.cache_lookup(db_id, key)
+        if hit:
+            return value
+        value, complete = await loader()
+        if complete:
+            self.client.cache_store(db_id, token, value)
+        return value
+    
+    async def _load_pages(self, parser, kind, db_id, filter_dict=None, filter_properties=None, raise_on_error=False):
+        """全ページを取得して変換し、(変換結果, 全件取得できたか) を返す（NotionClient._load_pages と同じ）"""
+        pages = []
+        complete = True
+        try:
+            async for page in self.iter_query(db_id, filter_dict, filter_properties=filter_properties, raise_on_error=True):
+                pages.append(page)
+        except NotionQueryError:
+            if raise_on_error:
+                raise
+            complete = False
+        return parse_pages(parser, pages, kind), complete
+    
+    async def get_users(self):
+        """ユーザー一覧を取得"""
+        return await self._cached(USER_DB_ID, "users", lambda: self._load_pages(parse_user_page, "user", USER_DB_ID))
+    
+    async def get_games(self):
+        """ラウンド一覧を取得"""
+        return await self._cached(GAME_DB_ID, "games", lambda: self._load_pages(parse_game_page, "game", GAME_DB_ID))
+    
+    async def get_games_page(self, filter_dict=None, start_cursor=None, page_size=GAME_PAGE_SIZE):
+        """ラウンドをプレー日の新しい順に1ページ分取得し、(ラウンド一覧, 次ページのカーソル) を返す"""
+        cache_key = games_page_cache_key(filter_dict, start_cursor, page_size)
+        return await self._cached(GAME_DB_ID, cache_key, lambda: self._load_games_page(filter_dict, start_cursor, page_size))
+    
+    async def _load_games_page(self, filter_dict, start_cursor, page_size):
+        result = await self.query_database(
+            GAME_DB_ID,
+            filter_dict,
+            start_cursor=start_cursor,
+            sorts=GAME_SORTS,
+            page_size=page_size
+        )
+        if not result or "results" not in result:
+            return ([], None), False
+        next_cursor = result.get("next_cursor") if result.get("has_more") else None
+        return (parse_pages(parse_game_page, result["results"], "game"), next_cursor), True
+    
+    async def get_scores(self, game=None, hole=None, filter_properties=None, raise_on_error=False):
+        """スコア一覧を取得（引数は NotionClient.get_scores と同じ）"""
+        cache_key = scores_cache_key(game, hole, filter_properties)
+        return await self._cached(SCORE_DB_ID, cache_key, lambda: self._load_pages(
+            parse_score_page, "score", SCORE_DB_ID, score_filter(game, hole), filter_properties, raise_on_error
+        ))
+
+def _pending_score_values(properties):
+    """待ち行列に積まれたプロパティをスコアの値に変換する"""
+    values = {}
+    for key in ("hole", "stroke", "putt", "snake"):
+        if key in properties:
+            values[key] = properties[key]["number"]
+    if "olympic" in properties:
+        values["olympic"] = (properties["olympic"]["select"] or {}).get("name", "")
+    if "snake_out" in properties:
+        values["snake_out"] = properties["snake_out"]["checkbox"]
+    return values
+
+class MenuData:
+    """メニューで必要になったデータだけを取得し、1回の再実行の間は使い回す"""
+    def __init__(self, notion):
+        self.notion = notion
+        self._values = {}
+    
+    def _get(self, key, loader):
+        if key not in self._values:
+            self._values[key] = loader()
+        return self._values[key]
+    
+    def users(self):
+        """ユーザー一覧（Notionから）"""
+        return self._get("users", self.notion.get_users)
+    
+    def local_users(self):
+        """ユーザー一覧（ローカル複製から）"""
+        return self._get("local_users", lambda: get_local_users(self.notion))
+    
+    def recent_games(self):
+        """最近のラウンド（プレー日の新しい順に1ページ分）"""
+        return self._get("recent_games", lambda: self.notion.get_games_page()[0])
+
+@st.cache_resource
+def get_rate_limiter():
+    """Notionのレート制限はAPIキー単位のため、全セッション・全クライアントで1つのリミッターを共有する"""
+    return RateLimiter()
+
+@st.cache_resource
+def get_notion_client():
+    """接続プールを再実行・セッション間で共有するため、クライアントを1つだけ生成する"""
+    return NotionClient(rate_limiter=get_rate_limiter())
+
+@st.cache_resource
+def get_score_queue():
+    """オフライン保存用の待ち行列を生成し、バックグラウンド送信を開始する"""
+    score_queue = ScoreWriteQueue(LOCAL_DB_PATH)
+    start_flush_worker(score_queue, get_notion_client())
+    return score_queue
+
+@st.cache_resource
+def get_notion_mirror():
+    """Notionデータベースのローカル複製を生成し、書き込み時に同期が走るよう登録する"""
+    mirror = NotionMirror(LOCAL_DB_PATH)
+    get_notion_client().add_invalidation_listener(mirror.mark_stale)
+    return mirror
+
+@st.cache_resource
+def get_season_ledger():
+    """確定したラウンドの収支を記録するシーズン台帳を生成"""
+    return SeasonLedger(LOCAL_DB_PATH)
+
+@st.cache_resource
+def get_player_stats():
+    """メンバーごとの成績集計を生成"""
+    return PlayerStats(LOCAL_DB_PATH)
+
+def get_local_users(notion):
+    """ローカル複製からユーザー一覧を取得（必要に応じて差分同期）"""
+    mirror = get_notion_mirror()
+    mirror.maybe_sync(notion, USER_DB_ID)
+    return parse_pages(parse_user_page, mirror.pages(USER_DB_ID), "user")
+
+def get_local_scores(notion, game):
+    """ローカル複製からラウンドのスコア一覧を取得（必要に応じて差分同期）"""
+    mirror = get_notion_mirror()
+    mirror.maybe_sync(notion, SCORE_DB_ID)
+    pages = mirror.pages(SCORE_DB_ID, game_relation=game["page_id"], title_prefix=f"{game['id']}_")
+    return parse_pages(parse_score_page, pages, "score")
+
+def prefetch_menu_data(notion, menu):
+    """メニューで使うデータを並行して読み込み、キャッシュ・ローカル複製を温めておく
+
+    直列に取得すると往復の待ち時間が積み重なるため、まとめて送信して一番遅い1件分の待ち時間で済ませる
+    """
+    if menu not in ROUND_MENUS:
+        return
+    game = st.session_state.get("selected_game")
+    
+    # サイドバーのラウンド選択と同じ絞り込み条件・ページ数で取得し、表示時にキャッシュから引けるようにする
+    filter_dict, page_count = sidebar_game_query()
+    loads = [lambda: load_game_pages(notion, filter_dict, page_count)]
+    if menu in ("ラウンド編集", "スコア入力"):
+        loads.append(notion.get_users)
+    if menu == "スコア入力" and game:
+        grid = st.session_state.get("score_grid")
+        if not grid or grid["game_page_id"] != game["page_id"]:
+            loads.append(lambda: notion.get_scores(game, filter_properties=SCORE_ENTRY_PROPERTIES))
+    if menu in ("スコア確認", "計算シート"):
+        # ローカル複製から読むメニューは差分同期を済ませておく（同期はデータベースごとに順番に行われる）
+        mirror = get_notion_mirror()
+        loads.append(lambda: [mirror.maybe_sync(notion, db_id) for db_id in (USER_DB_ID, SCORE_DB_ID)])
+    
+    # 取得エラー（st.error）が画面に表示されるよう、ワーカースレッドにも実行中のスクリプトを引き継ぐ
+    script_run_ctx = get_script_run_ctx()
+    with metrics.registry.timer("prefetch_seconds", menu=menu):
+        with ThreadPoolExecutor(
+            max_workers=len(loads),
+            initializer=lambda: add_script_run_ctx(threading.current_thread(), script_run_ctx)
+        ) as executor:
+            for future in [executor.submit(load) for load in loads]:
+                future.result()
+
+def load_score_grid(notion, game, refresh=False):
+    """ラウンドの全ホール分のスコア（メンバー×18ホール）をセッションに保持して返す
+
+    ホールの移動や入力欄の初期値はここから引き、Notionへは保存時（と refresh=True のとき）だけアクセスする
+    戻り値: {score_id: スコア}。取得に失敗した場合はNone
+    """
+    grid = st.session_state.get("score_grid")
+    if grid and grid["game_page_id"] == game["page_id"] and not refresh:
+        return grid["scores"]
+    if refresh:
+        notion.invalidate_cache(SCORE_DB_ID)
+    
+    try:
+        scores = notion.get_scores(game, filter_properties=SCORE_ENTRY_PROPERTIES, raise_on_error=True)
+    except NotionQueryError:
+        # 一部しか取得できていない状態で保持すると、保存時に既存スコアを重複作成してしまう
+        return None
+    st.session_state.score_grid = {"game_page_id": game["page_id"], "scores": {score["id"]: score for score in scores}}
+    return st.session_state.score_grid["scores"]
+
+def update_score_grid(saved_scores):
+    """保存したスコアをセッションのスコア表に反映する（取得し直さずに次の表示に使う）"""
+    grid = st.session_state.get("score_grid")
+    if grid:
+        for score in saved_scores:
+            grid["scores"][score["id"]] = score
+
+def refresh_player_stats(notion):
+    """前回の集計以降にスコア・ラウンドが更新されたラウンドだけ成績集計を作り直す"""
+    mirror = get_notion_mirror()
+    mirror.maybe_sync(notion, GAME_DB_ID)
+    mirror.maybe_sync(notion, SCORE_DB_ID)
+    stats = get_player_stats()
+    watermark = stats.watermark()
+    
+    # 前回と同じ時刻に更新されたページも返るため、反映済みのものは除く
+    changed_score_pages = stats.unprocessed(mirror.pages(SCORE_DB_ID, edited_since=watermark))
+    changed_game_pages = stats.unprocessed(mirror.pages(GAME_DB_ID, edited_since=watermark))
+    if not changed_score_pages and not changed_game_pages:
+        return stats
+    
+    games = [parse_game_page(page) for page in mirror.pages(GAME_DB_ID)]
+    games_by_page_id = {normalize_id(game["page_id"]): game for game in games}
+    games_by_id = {game["id"]: game for game in games}
+    
+    changed_games = {normalize_id(page["id"]): games_by_page_id[normalize_id(page["id"])] for page in changed_game_pages}
+    for page in changed_score_pages:
+        score = parse_score_page(page)
+        # ラウンドのリレーションがない古いスコアはIDの接頭辞（ラウンドID）から探す
+        game = games_by_page_id.get(normalize_id(score["game_relation"])) or games_by_id.get(score["id"].rsplit("_", 2)[0])
+        if game:
+            changed_games[normalize_id(game["page_id"])] = game
+    
+    rounds = []
+    for game in changed_games.values():
+        pages = mirror.pages(SCORE_DB_ID, game_relation=game["page_id"], title_prefix=f"{game['id']}_")
+        rounds.append((game, [parse_score_page(page) for page in pages]))
+    stats.refresh_rounds(rounds, changed_score_pages + changed_game_pages)
+    return stats
+
+def game_filter(place_query, date_range):
+    """ラウンド選択の絞り込み条件（コース名の部分一致・プレー日の範囲）をNotionのフィルターにする"""
+    conditions = []
+    if place_query:
+        conditions.append({"property": "place", "rich_text": {"contains": place_query}})
+    if len(date_range) >= 1:
+        conditions.append({"property": "play_date", "date": {"on_or_after": date_range[0].isoformat()}})
+    if len(date_range) == 2:
+        conditions.append({"property": "play_date", "date": {"on_or_before": date_range[1].isoformat()}})
+    if not conditions:
+        return None
+    return conditions[0] if len(conditions) == 1 else {"and": conditions}
+
+def load_game_pages(notion, filter_dict, page_count):
+    """ラウンドを新しい順にpage_countページ分取得し、(ラウンド一覧, 続きがあるか) を返す"""
+    games = []
+    start_cursor = None
+    for _ in range(page_count):
+        page_games, start_cursor = notion.get_games_page(filter_dict, start_cursor)
+        games.extend(page_games)
+        if not start_cursor:
+            return games, False
+    return games, True
+
+def sidebar_game_query():
+    """サイドバーのラウンド選択の絞り込み条件（入力欄の値）と読み込むページ数を返す
+
+    先読み（prefetch_menu_data）と表示で同じクエリになるよう、どちらもここから条件を作る
+    """
+    filter_dict = game_filter(
+        st.session_state.get("game_filter_place", "").strip(),
+        st.session_state.get("game_filter_dates", ())
+    )
+    
+    # 絞り込み条件が変わったら1ページ目から読み直す
+    filter_signature = json.dumps(filter_dict, sort_keys=True)
+    if st.session_state.get("game_filter_signature") != filter_signature:
+        st.session_state.game_filter_signature = filter_signature
+        st.session_state.game_page_count = 1
+    return filter_dict, st.session_state.game_page_count
+
+def select_sidebar_game(notion):
+    """サイドバーのラウンド選択（検索・絞り込み・追加読み込み）を表示し、選択をpage_idで保持する"""
+    st.sidebar.subheader("🏌️ ラウンド選択")
+    
+    with st.sidebar.expander("🔍 ラウンドを探す"):
+        st.text_input("コース名", key="game_filter_place")
+        st.date_input("プレー日", value=(), key="game_filter_dates")
+    filter_dict, page_count = sidebar_game_query()
+    
+    games, has_more = load_game_pages(notion, filter_dict, page_count)
+    games_by_page_id = {game["page_id"]: game for game in games}
+    
+    # 選択中のラウンドが読み込んだ範囲に含まれない場合も選択肢に残す
+    selected_page_id = st.session_state.get("selected_game_page_id")
+    selected_game = st.session_state.get("selected_game")
+    if selected_page_id and selected_page_id not in games_by_page_id and selected_game:
+        games_by_page_id = {selected_page_id: selected_game, **games_by_page_id}
+    
+    # 他のメニューから戻ったときも選択を復元する（ウィジェットの値はpage_id）
+    if "sidebar_game_select" not in st.session_state:
+        st.session_state.sidebar_game_select = selected_page_id if selected_page_id in games_by_page_id else None
+    
+    selected_page_id = st.sidebar.selectbox(
+        "ラウンドを選択",
+        [None] + list(games_by_page_id),
+        format_func=lambda page_id: "選択なし" if page_id is None else (
+            f"{games_by_page_id[page_id]['play_date']} - {games_by_page_id[page_id]['place']} ({games_by_page_id[page_id]['id']})"
+        ),
+        key="sidebar_game_select"
+    )
+    st.session_state.selected_game_page_id = selected_page_id
+    st.session_state.selected_game = games_by_page_id.get(selected_page_id)
+    
+    if has_more:
+        st.sidebar.button(
+            "さらに読み込む",
+            on_click=lambda: st.session_state.update(game_page_count=st.session_state.game_page_count + 1)
+        )
+    elif not games:
+        st.sidebar.caption("条件に一致するラウンドがありません。")
+
+def dispatch_score_writes(notion, writes):
+    """スコアの書き込みを送信し、各書き込みの (結果, エラー) を順番通りに返す
+
+    オフライン保存が有効な場合は待ち行列に積んで即座に完了とする
+    """
+    score_queue = get_score_queue()
+    if st.session_state.get("write_behind"):
+        queued_indexes = set(range(len(writes)))
+    else:
+        # 未送信の編集が残っているスコアは、順序を保つため待ち行列側に積む
+        pending = score_queue.pending_properties()
+        queued_indexes = {i for i, write in enumerate(writes) if write["score_id"] in pending}
+    
+    for i in queued_indexes:
+        write = writes[i]
+        score_queue.enqueue(write["score_id"], write["db_id"], write.get("page_id"), write["properties"])
+    
+    direct_outcomes = iter(notion.batch_write([write for i, write in enumerate(writes) if i not in queued_indexes]))
+    return [(None, None) if i in queued_indexes else next(direct_outcomes) for i in range(len(writes))]
+
+def game_properties(game_id, play_date, place, par, rates, member_ids):
+    """ラウンドページのプロパティを作る（rates: 金〜ダイヤモンドの点数、member_ids: 枠順のメンバーのpage_id）"""
+    properties = {
+        "id": {"title": [{"text": {"content": game_id}}]},
+        "play_date": {"date": {"start": play_date}},
+        "place": {"rich_text": [{"text": {"content": place}}]},
+        "par": {"number": par},
+        **{rate_key: {"number": rates[rate_key]} for rate_key in ("gold", "silver", "bronze", "iron", "diamond")}
+    }
+    
+    # メンバーのリレーション（空き枠は空のリレーション）
+    for i in range(1, 5):
+        member_id = member_ids[i - 1] if i - 1 < len(member_ids) else None
+        properties[f"member{i}"] = {"relation": [{"id": member_id}] if member_id else []}
+    return properties
+
+def known_game_properties(game):
+    """取得済みのラウンドから、サーバー側の現在のプロパティを作る（差分の比較用）"""
+    member_ids = [game["member_ids"].get(f"member{i}_id") for i in range(1, 5)]
+    return game_properties(game["id"], game["play_date"], game["place"], game["par"], game, member_ids)
+
+def changed_properties(properties, known_properties):
+    """送信するプロパティのうち、最後に把握しているサーバー側の値（known_properties）から変わったものだけを返す"""
+    return {name: value for name, value in properties.items() if known_properties.get(name) != value}
+
+def score_properties(score_id, game_page_id, user_page_id, hole_number, values):
+    """スコアページのプロパティを作る（values: stroke / putt / snake / olympic / snake_out）"""
+    properties = {
+        "id": {"title": [{"text": {"content": score_id}}]},
+        "game": {"relation": [{"id": game_page_id}] if game_page_id else []},
+        "user": {"relation": [{"id": user_page_id}] if user_page_id else []},
+        "hole": {"number": hole_number},
+        "stroke": {"number": values['stroke']},
+        "putt": {"number": values['putt']},
+        "snake": {"number": values['snake']},
+        # 未選択に戻した場合も反映されるよう、空の場合はNoneで送る
+        "olympic": {"select": {"name": values['olympic']} if values['olympic'] else None}
+    }
+    
+    # 3の倍数ホールの場合のみsnake_outを追加
+    if hole_number % 3 == 0:
+        properties["snake_out"] = {"checkbox": values['snake_out']}
+    return properties
+
+def build_score_write(game, hole_number, score_data):
+    """1メンバー分のスコアの書き込み（dispatch_score_writes に渡す形式）を作る
+
+    既存スコアの更新は変わったプロパティだけを送る（変更がなければ properties は空）
+    """
+    properties = score_properties(
+        score_data['score_id'], game["page_id"], score_data['member']['page_id'], hole_number, score_data
+    )
+    
+    # 既存スコアは更新、なければ新規作成
+    existing_score = score_data['existing_score']
+    page_id = existing_score['page_id'] if existing_score else None
+    if page_id:
+        # ラウンドのリレーションがない古いスコアは、差分としてリレーションも送られる
+        known_properties = score_properties(
+            existing_score.get('id', score_data['score_id']),
+            existing_score.get('game_relation'),
+            existing_score.get('user_relation'),
+            existing_score.get('hole', hole_number),
+            existing_score
+        )
+        properties = changed_properties(properties, known_properties)
+    elif existing_score:
+        # 待ち行列で作成待ちのスコアは、入力値が変わっていなければ送らない（変わっていれば作成内容ごと送る）
+        known_properties = score_properties(
+            score_data['score_id'], game["page_id"], score_data['member']['page_id'], hole_number, existing_score
+        )
+        if not changed_properties(properties, known_properties):
+            properties = {}
+    
+    return {
+        "score_id": score_data['score_id'],
+        "db_id": SCORE_DB_ID,
+        "page_id": page_id,
+        "properties": properties
+    }
+
+def save_hole_scores(notion, game, hole_number, member_scores):
+    """1ホール分の全メンバーのスコアを保存する（保存・次のホール・前のホールで共通）
+
+    入力値が既存スコアと同じメンバーは送信せず、残りをまとめて並列送信する
+    戻り値: {"saved": 送信に成功した人数, "skipped": 変更がなく送信しなかった人数,
+             "errors": [(メンバー, エラー)], "scores": 保存できたスコア（保存後の値）}
+    """
+    changed = []
+    writes = []
+    for score_data in member_scores.values():
+        write = build_score_write(game, hole_number, score_data)
+        if write["properties"]:
+            changed.append(score_data)
+            writes.append(write)
+    
+    outcomes = dispatch_score_writes(notion, writes)
+    errors = []
+    saved_scores = []
+    for score_data, write, (result, error) in zip(changed, writes, outcomes):
+        if error:
+            errors.append((score_data['member'], error))
+        else:
+            saved_scores.append(saved_score(game, hole_number, score_data, (result or {}).get("id") or write["page_id"]))
+    
+    skipped_count = len(member_scores) - len(changed)
+    metrics.registry.inc("score_writes_skipped_total", skipped_count)
+    return {"saved": len(saved_scores), "skipped": skipped_count, "errors": errors, "scores": saved_scores}
+
+def saved_score(game, hole_number, score_data, page_id):
+    """保存した入力値から、get_scores と同じ形式のスコアを作る（待ち行列に積んだ新規スコアはpage_idなし）"""
+    existing_score = score_data['existing_score'] or {}
+    return Score(
+        id=score_data['score_id'],
+        hole=hole_number,
+        stroke=score_data['stroke'],
+        putt=score_data['putt'],
+        snake=score_data['snake'],
+        olympic=score_data['olympic'],
+        # snake_outは3の倍数ホールでのみ保存される
+        snake_out=score_data['snake_out'] if hole_number % 3 == 0 else existing_score.get("snake_out", False),
+        birdie=existing_score.get("birdie", False),
+        game_relation=game["page_id"],
+        user_relation=score_data['member']['page_id'],
+        page_id=page_id
+    )
+
+@st.fragment
+def score_review_panel(notion, selected_game, game_members):
+    """スコア確認の表（更新ボタンを押しても画面全体ではなくこの部分だけを再実行する）"""
+    with metrics.registry.timer("panel_render_seconds", panel="score_review"):
+        render_score_review(notion, selected_game, game_members)
+
+def render_score_review(notion, selected_game, game_members):
+    """スコアシート・ヘビ・オリンピック・スペシャルスコア・詳細情報を描画する"""
+    # 他の端末で入力されたスコアを反映する（同期の間隔を待たずにローカル複製を差分同期）
+    if st.button("🔄 最新の状態に更新", key="refresh_score_review"):
+        get_notion_mirror().sync(notion, SCORE_DB_ID)
+    
+    # スコアを取得（ローカル複製から）
+    scores = get_local_scores(notion, selected_game)
+    
+    if not scores:
+        st.warning("このラウンドのスコアが記録されていません。")
+        return
+    
+    # スコアカードを表示
+    st.subheader(f"📊 {selected_game['place']} - {selected_game['play_date']}")
+    
+    # ホール別スコア表を作成（メンバー×ホールで1回だけ整理）
+    board = ScoreBoard(game_members, scores)
+    
+    # スコアシート形式のテーブルを作成
+    st.subheader("📋 スコアシート")
+    
+    # 合計パー数を取得
+    total_par = selected_game.get('par', 72)
+    
+    # メンバー×ホールの配列から一括で集計
+    df = scorecard_table(board, total_par)
+    
+    # IN/OUT/計列の数値セルを太字にするスタイリング
+    def style_bold_totals(df):
+        def apply_bold_style(val):
+            if str(val) != "-" and str(val).isdigit():
+                return "font-weight: bold"
+            return ""
+        
+        styled_df = df.style
+        for col in ["IN", "OUT", "計"]:
+            if col in df.columns:
+                styled_df = styled_df.map(apply_bold_style, subset=[col])
+        
+        return styled_df
+    
+    # スタイル付きデータフレームを表示
+    st.dataframe(style_bold_totals(df), use_container_width=True, hide_index=True)
+    
+    # ヘビスコア確認シートを追加
+    st.subheader("🐍 ヘビスコア")
+    
+    snake_df = snake_table(board)
+    st.dataframe(snake_df, use_container_width=True, hide_index=True)
+
+    # 各メンバーのOUT合計を計算
+    member_out_totals = dict(zip([member["name"] for member in game_members], snake_out_totals(board).tolist()))
+        
+    # 結果を表示
+    out_total_cols = st.columns(len(game_members))
+    for i, member in enumerate(game_members):
+        member_name = member["name"]
+        with out_total_cols[i]:
+            st.metric(
+                member_name,
+                f"{member_out_totals[member_name]}",
+                help="OUTになった時の3ホール区間合計ヘビ数の累計"
+            )
+    
+    # オリンピックスコア確認シートを追加
+    st.subheader("🏅 オリンピックスコア")
+    
+    # オリンピック設定値を取得
+    rates = olympic_rates(selected_game)
+    
+    # オリンピックスコアテーブルを表示
+    olympic_df = olympic_table(board, rates)
+    
+    # 合計点列を太字にするスタイリング
+    def style_olympic_totals(df):
+        def apply_bold_style(val):
+            if str(val).isdigit():
+                return "font-weight: bold"
+            return ""
+        
+        styled_df = df.style
+        if "合計点" in df.columns:
+            styled_df = styled_df.map(apply_bold_style, subset=["合計点"])
+        
+        return styled_df
+    
+    st.dataframe(style_olympic_totals(olympic_df), use_container_width=True, hide_index=True)
+    
+    # オリンピック設定値を表示
+    st.caption("設定値: " + ", ".join(f"{medal}={points}点" for medal, points in rates.items()))
+    
+    # スペシャルスコア確認シートを追加
+    st.subheader("🏆 スペシャルスコア")
+    
+    # 各メンバーのスペシャルスコア取得数を計算
+    member_special_scores = {
+        member["name"]: {"albatross": albatross, "eagle": eagle, "birdie": birdie}
+        for member, (albatross, eagle, birdie) in zip(game_members, special_score_counts(board).tolist())
+    }
+    
+    # 結果を表示
+    special_score_cols = st.columns(len(game_members))
+    for i, member in enumerate(game_members):
+        member_name = member["name"]
+        scores = member_special_scores[member_name]
+        with special_score_cols[i]:
+            st.markdown(f"**{member_name}**")
+            if scores["albatross"] > 0:
+                st.metric("🦈 アルバトロス", scores["albatross"])
+            if scores["eagle"] > 0:
+                st.metric("🦅 イーグル", scores["eagle"])
+            if scores["birdie"] > 0:
+                st.metric("🐦 バーディー", scores["birdie"])
+            if scores["albatross"] == 0 and scores["eagle"] == 0 and scores["birdie"] == 0:
+                st.caption("スペシャルスコアなし")
+    
+    # 詳細情報（オリンピック、ヘビ）の表示
+    st.subheader("🏅 詳細情報")
+    
+    for member in game_members:
+        member_name = member["name"]
+        with st.expander(f"{member_name} の詳細"):
+            detail_cols = st.columns(6)
+            
+            for hole in range(1, 19):
+                col_index = (hole - 1) % 6
+                with detail_cols[col_index]:
+                    hole_data = board.score(member["page_id"], hole)
+                    if hole_data:
+                        par_diff = hole_data['stroke']  # データベースにはパー±が保存されている
+                        
+                        st.write(f"**ホール {hole}**")
+                        if par_diff > 0:
+                            st.write(f"パー: +{par_diff}")
+                        elif par_diff < 0:
+                            st.write(f"パー: {par_diff}")
+                        else:
+                            st.write("パー: E")
+                        st.write(f"パット: {hole_data['putt']}")
+                        if hole_data['olympic']:
+                            st.write(f"🏅 {hole_data['olympic']}")
+                        else:
+                            st.write("🏅 -")
+                        if hole_data['snake'] > 0:
+                            st.write(f"🐍 ヘビ: {hole_data['snake']}")
+                        else:
+                            st.write("🐍 -")
+                    else:
+                        st.write(f"**ホール {hole}**")
+                        st.write("未記録")
+
+@st.fragment
+def score_entry_panel(notion, selected_game, game_members):
+    """スコア入力のホール選択と入力フォーム（ここでの操作は画面全体ではなくこの部分だけを再実行する）"""
+    with metrics.registry.timer("panel_render_seconds", panel="score_entry"):
+        render_score_entry(notion, selected_game, game_members)
+
+def render_score_entry(notion, selected_game, game_members):
+    """ホール選択・スコア入力フォームを描画する"""
+    # サイドバーでホールが選択されている場合はそれを使用、そうでなければボタン形式で選択
+    if "selected_hole" not in st.session_state:
+        st.session_state.selected_hole = 1
+    
+    hole_number = st.session_state.selected_hole
+    
+    # ホール選択セクション（ボタン形式 - サイドバー選択と連動）
+    st.subheader("🏌️ ホール選択")
+    
+    # 現在選択中のホールを表示
+    st.info(f"📌 現在選択中: ホール {hole_number} (サイドバーから変更可能)")
+    
+    # クイックホール選択ボタン（オプション、押すと描画前にホールを切り替える）
+    with st.expander("🔄 クイックホール選択", expanded=False):
+        # 1行目：1-9ホール、2行目：10-18ホール
+        for first_hole in (1, 10):
+            hole_cols = st.columns(9)
+            for i in range(first_hole, first_hole + 9):
+                with hole_cols[i - first_hole]:
+                    button_type = "primary" if hole_number == i else "secondary"
+                    st.button(
+                        str(i),
+                        key=f"hole_{i}",
+                        type=button_type,
+                        use_container_width=True,
+                        on_click=lambda hole=i: st.session_state.update(selected_hole=hole)
+                    )
+    
+    # ラウンドの全ホール分のスコアはセッションに保持し、ホール移動では取得し直さない
+    if st.button("🔄 最新のスコアを読み込む", help="他の端末で入力されたスコアを反映します"):
+        score_grid = load_score_grid(notion, selected_game, refresh=True)
+    else:
+        score_grid = load_score_grid(notion, selected_game)
+    if score_grid is None:
+        st.warning("スコアを取得できませんでした。時間をおいて再度お試しください。")
+        return
+    
+    # 既存スコア（オフライン保存で未送信のスコアを含む）
+    existing_scores = hole_existing_scores(selected_game, game_members, hole_number)
+    
+    # 既存データがあるかどうかを表示
+    if any(existing_scores.values()):
+        st.info(f"ℹ️ ホール{hole_number}には既存のスコアデータがあります。既存データが入力欄に表示されています。")
+    else:
+        st.info(f"ℹ️ ホール{hole_number}は新規入力です。")
+    
+    # 前回の保存結果を表示
+    for level, message in st.session_state.pop("hole_save_messages", []):
+        getattr(st, level)(message)
+    
+    # 全メンバーのスコア入力フォーム
+    with st.form(f"hole_score_form_{hole_number}"):  # ホール番号をキーに含める
+        olympic_options = ["", "金", "銀", "銅", "鉄", "ダイヤモンド"]
+        
+        # 保存・次のホール・前のホールは、再描画の前に同じ保存処理を通す（成功したら移動）
+        submit_args = (notion, selected_game, game_members, hole_number)
+        
+        # ヘッダーとボタンを同じ行に配置
+        header_col, save_col, prev_col, next_col = st.columns([1.5, 1, 1, 1])
+        with header_col:
+            st.subheader(f"ホール {hole_number} - スコア入力")
+        with save_col:
+            st.form_submit_button(
+                "保存", use_container_width=True, type="primary",
+                on_click=submit_hole_scores, args=submit_args + (0,)
+            )
+        with prev_col:
+            # 前のホールへのボタン（1ホールより大きい場合のみ表示）
+            if hole_number > 1:
+                st.form_submit_button(
+                    "前のホール", use_container_width=True, type="secondary",
+                    on_click=submit_hole_scores, args=submit_args + (-1,)
+                )
+        with next_col:
+            # 次のホールへのボタン（18ホール未満の場合のみ表示）
+            if hole_number < 18:
+                st.form_submit_button(
+                    "次のホール", use_container_width=True, type="secondary",
+                    on_click=submit_hole_scores, args=submit_args + (1,)
+                )
+        
+        # メンバーを横に並べて表示
+        member_cols = st.columns(len(game_members))
+        
+        # 各メンバーの入力欄を作成
+        for i, member in enumerate(game_members):
+            existing_score = existing_scores[member["page_id"]]
+            
+            # 各メンバーのカラム内で縦に配置
+            with member_cols[i]:
+                # 既存データがある場合の表示
+                data_status = "📊" if existing_score else "🆕"
+                st.markdown(f"### {member['name_display']} {data_status}")
+                st.caption(f"ホール{hole_number}")
                 
-                # レート情報を取得
-                gold = page["properties"]["gold"]["number"] if "gold" in page["properties"] and page["properties"]["gold"]["number"] else 4
-                silver = page["properties"]["silver"]["number"] if "silver" in page["properties"] and page["properties"]["silver"]["number"] else 3
-                bronze = page["properties"]["bronze"]["number"] if "bronze" in page["properties"] and page["properties"]["bronze"]["number"] else 2
-                iron = page["properties"]["iron"]["number"] if "iron" in page["properties"] and page["properties"]["iron"]["number"] else 1
-                diamond = page["properties"]["diamond"]["number"] if "diamond" in page["properties"] and page["properties"]["diamond"]["number"] else 5
+                # パー±での入力（既存データから取得またはデフォルト0）
+                par_relative = st.number_input(
+                    f"スコア",
+                    min_value=-3,
+                    max_value=20,
+                    value=existing_score["stroke"] if existing_score else 0,
+                    key=f"stroke_{member['page_id']}_{hole_number}",  # ホール番号を含める
+                    help="パーからの打数差を入力（-3～+20）"
+                )
                 
-                # メンバー情報を取得
-                members = []
-                member_names = {}
-                for i in range(1, 5):
-                    member_key = f"member{i}"
-                    if page["properties"][member_key]["relation"]:
-                        member_id = page["properties"][member_key]["relation"][0]["id"]
-                        members.append(member_id)
-                        # メンバー名も取得する（後でユーザー情報から名前を検索するため）
-                        member_names[f"member{i}_id"] = member_id
-                    else:
-                        member_names[f"member{i}_id"] = None
+                # スコア表示
+                if par_relative == -3:
+                    st.caption("☆ アルバトロス!")
+                elif par_relative == -2:
+                    st.caption("◎ イーグル!")
+                elif par_relative == -1:
+                    st.caption("○ バーディー!")
+                elif par_relative == 0:
+                    st.caption("‐ パー")
+                elif par_relative == 1:
+                    st.caption("△ ボギー")
+                elif par_relative == 2:
+                    st.caption("▢ ダブルボギー")
+                elif par_relative >= 3:
+                    st.caption(f"✕ トリプルボギー以上 (+{par_relative})")
                 
-                games.append({
-                    "id": game_id,
-                    "play_date": play_date,
-                    "place": place,
-                    "par": par,
-                    "members": members,
-                    "member_ids": member_names,  # 個別のメンバーID情報を追加
-                    "gold": gold,
-                    "silver": silver,
-                    "bronze": bronze,
-                    "iron": iron,
-                    "diamond": diamond,
-                    "page_id": page["id"]
-                })
-        return games
-    
-    def get_scores(self, game_id=None):
-        """スコア一覧を取得"""
-        filter_dict = None
-        if game_id:
-            filter_dict = {
-                "property": "id",
-                "title": {
-                    "starts_with": game_id
-                }
-            }
-        
-        result = self.query_database(SCORE_DB_ID, filter_dict)
-        scores = []
-        if result and "results" in result:
-            for page in result["results"]:
-                score_id = page["properties"]["id"]["title"][0]["text"]["content"] if page["properties"]["id"]["title"] else ""
-                hole = page["properties"]["hole"]["number"] if page["properties"]["hole"]["number"] else 0
-                stroke = page["properties"]["stroke"]["number"] if page["properties"]["stroke"]["number"] else 0
-                putt = page["properties"]["putt"]["number"] if page["properties"]["putt"]["number"] else 0
-                snake = page["properties"]["snake"]["number"] if page["properties"]["snake"]["number"] else 0
-                olympic = page["properties"]["olympic"]["select"]["name"] if page["properties"]["olympic"]["select"] else ""
-                snake_out = page["properties"]["snake_out"]["checkbox"] if "snake_out" in page["properties"] and page["properties"]["snake_out"] else False
-                birdie = page["properties"]["birdie"]["checkbox"] if "birdie" in page["properties"] and page["properties"]["birdie"] else False
+                st.number_input(
+                    "パット",
+                    min_value=0,
+                    max_value=5,
+                    value=existing_score["putt"] if existing_score else 0,
+                    key=f"putt_{member['page_id']}_{hole_number}"  # ホール番号を含める
+                )
                 
-                # ゲームとユーザーのリレーション
-                game_relation = page["properties"]["game"]["relation"][0]["id"] if page["properties"]["game"]["relation"] else ""
-                user_relation = page["properties"]["user"]["relation"][0]["id"] if page["properties"]["user"]["relation"] else ""
+                st.selectbox(
+                    "オリンピック",
+                    olympic_options,
+                    index=olympic_options.index(existing_score["olympic"]) if existing_score and existing_score["olympic"] in olympic_options else 0,
+                    key=f"olympic_{member['page_id']}_{hole_number}"  # ホール番号を含める
+                )
+                
+                st.number_input(
+                    "ヘビ",
+                    min_value=0,
+                    max_value=20,
+                    value=existing_score["snake"] if existing_score else 0,
+                    key=f"snake_{member['page_id']}_{hole_number}"  # ホール番号を含める
+                )
                 
-                scores.append({
-                    "id": score_id,
-                    "hole": hole,
-                    "stroke": stroke,
-                    "putt": putt,
-                    "snake": snake,
-                    "olympic": olympic,
-                    "snake_out": snake_out,
-                    "birdie": birdie,
-                    "game_relation": game_relation,
-                    "user_relation": user_relation,
-                    "page_id": page["id"]
-                })
-        return scores
+                # 3の倍数ホール（3、6、9、12、15、18）でsnake_outチェックボックスを表示
+                snake_out = False
+                # if hole_number % 3 == 0:
+                snake_out = st.checkbox(
+                    "🐍アウト",
+                    value=existing_score["snake_out"] if existing_score else False,
+                    key=f"snake_out_{member['page_id']}_{hole_number}",
+                    help="このホールでヘビアウトになった場合にチェック"
+                )
+                
+                # 既存データの詳細情報を表示
+                if existing_score:
+                    st.caption("📊 既存データが読み込まれています")
+                else:
+                    st.caption("🆕 新規入力")
 
-def main():
+def hole_existing_scores(game, game_members, hole_number):
+    """メンバーごとの表示中ホールの既存スコア（オフライン保存で未送信の値を反映、未記録はNone）"""
+    score_grid = st.session_state.score_grid["scores"]
+    board = ScoreBoard(game_members, score_grid.values())
+    
+    score_queue = get_score_queue()
+    pending_scores = score_queue.pending_properties(f"{game['id']}_")
+    created_page_ids = score_queue.created_page_ids(f"{game['id']}_")
+    
+    existing_scores = {}
+    for member_index, member in enumerate(game_members, 1):
+        score_id = f"{game['id']}_{member_index}_{hole_number}"
+        existing_score = board.score(member["page_id"], hole_number)
+        if score_id in pending_scores:
+            base_score = existing_score or {"page_id": None, "stroke": 0, "putt": 0, "snake": 0, "olympic": "", "snake_out": False}
+            existing_score = {**base_score, **_pending_score_values(pending_scores[score_id])}
+        if existing_score and not existing_score["page_id"] and score_id in created_page_ids:
+            # バックグラウンド送信で作成済みのスコアは、以降の保存を更新として送る
+            existing_score = {**existing_score, "page_id": created_page_ids[score_id]}
+        existing_scores[member["page_id"]] = existing_score
+    return existing_scores
+
+def submit_hole_scores(notion, game, game_members, hole_number, hole_move):
+    """スコア入力フォームの送信時（再描画の前）に入力値を保存し、成功したらhole_moveだけホールを移動する
+
+    保存結果のメッセージは hole_save_messages に残し、再描画時に表示する
+    """
+    existing_scores = hole_existing_scores(game, game_members, hole_number)
+    member_scores = {}
+    for member_index, member in enumerate(game_members, 1):
+        widget_suffix = f"{member['page_id']}_{hole_number}"
+        member_scores[member['page_id']] = {
+            'member': member,
+            'member_index': member_index,
+            'score_id': f"{game['id']}_{member_index}_{hole_number}",
+            'stroke': st.session_state[f"stroke_{widget_suffix}"],  # パー±の値をそのまま保存
+            'putt': st.session_state[f"putt_{widget_suffix}"],
+            'snake': st.session_state[f"snake_{widget_suffix}"],
+            'olympic': st.session_state[f"olympic_{widget_suffix}"],
+            'snake_out': st.session_state[f"snake_out_{widget_suffix}"],
+            'existing_score': existing_scores[member['page_id']]
+        }
+    
+    messages = []
+    st.session_state.hole_save_messages = messages
+    
+    # 3の倍数ホールでのsnake_outバリデーション
+    if hole_number % 3 == 0 and sum(1 for score_data in member_scores.values() if score_data['snake_out']) > 1:
+        messages.append(("error", {
+            0: "🐍アウトは1人だけ選択できます。",
+            1: "🐍アウトは1人だけ選択してから次のホールへ進んでください。",
+            -1: "🐍アウトは1人だけ選択してから前のホールに戻ってください。"
+        }[hole_move]))
+        return
+    
+    save_result = save_hole_scores(notion, game, hole_number, member_scores)
+    update_score_grid(save_result["scores"])
+    for member, error in save_result["errors"]:
+        messages.append(("error", f"{member['name']}のスコア保存に失敗しました: {error}"))
+    
+    if save_result["errors"]:
+        messages.append((
+            "warning",
+            f"ホール{hole_number}のスコア保存: 成功{save_result['saved']}件、エラー{len(save_result['errors'])}件"
+        ))
+        return
+    
+    # 保存が成功した場合のみ移動する
+    st.session_state.selected_hole = hole_number + hole_move
+    message = f"ホール{hole_number}のスコアを保存しました（更新{save_result['saved']}名、変更なし{save_result['skipped']}名）"
+    if hole_move:
+        message += f"。ホール{hole_number + hole_move}に移動しました"
+    messages.append(("success", message))
+
+def render_page():
+    """選択中のメニューの画面を描画する"""
     st.set_page_config(page_title="ゴルフスコア記録アプリ", layout="wide")
     st.title("🏌️ ゴルフスコア記録アプリ")
     
-    notion = NotionClient()
+    notion = get_notion_client()
     
     # サイドバーでメニュー選択
     menu = st.sidebar.selectbox(
         "メニューを選択",
-        ["ラウンド記録", "ラウンド編集", "スコア入力", "スコア確認", "計算シート", "ユーザー管理"]
+        ["ラウンド記録", "ラウンド編集", "スコア入力", "スコア確認", "計算シート", "シーズン収支", "統計", "ユーザー管理"],
+        key="menu"
     )
     
     # サイドバーにラウンド・ホール選択を追加
     st.sidebar.divider()
     
-    # ラウンド選択（全メニュー共通）
-    games = notion.get_games()
-    if games:
-        st.sidebar.subheader("🏌️ ラウンド選択")
-        game_options = {f"{game['id']} - {game['place']} ({game['play_date']})": game for game in games}
-        
-        # セッション状態でラウンドを管理
-        if "selected_game" not in st.session_state:
-            st.session_state.selected_game = None
-        
-        selected_game_key = st.sidebar.selectbox(
-            "ラウンドを選択",
-            ["選択なし"] + list(game_options.keys()),
-            index=0 if st.session_state.selected_game is None else (
-                list(game_options.keys()).index(st.session_state.selected_game_key) + 1 
-                if "selected_game_key" in st.session_state and st.session_state.selected_game_key in game_options 
-                else 0
-            ),
-            key="sidebar_game_select"
-        )
-        
-        if selected_game_key != "選択なし":
-            st.session_state.selected_game = game_options[selected_game_key]
-            st.session_state.selected_game_key = selected_game_key
-        else:
-            st.session_state.selected_game = None
-            st.session_state.selected_game_key = None
+    # メニューで必要になったデータだけを取得する（ラウンドを扱うメニューは並行して先読みしておく）
+    prefetch_menu_data(notion, menu)
+    data = MenuData(notion)
+    
+    # ラウンド選択（ラウンドを扱うメニューのみ）
+    games = []
+    if menu in ROUND_MENUS:
+        games = data.recent_games()
+        if games:
+            select_sidebar_game(notion)
     
     # ホール選択（ラウンドが選択されている場合のみ表示）
-    if "selected_game" in st.session_state and st.session_state.selected_game is not None:
+    if menu in ROUND_MENUS and st.session_state.get("selected_game") is not None:
         st.sidebar.subheader("🎯 ホール選択")
         
         # セッション状態でホール番号を管理
@@ -229,13 +1584,36 @@ def main():
         # 選択中のラウンドとホールを表示
         st.sidebar.info(f"🏌️ {st.session_state.selected_game['place']}\n🎯 ホール {st.session_state.selected_hole}")
     
+    # オフライン保存（書き込みを待ち行列に積み、バックグラウンドで送信）
+    st.sidebar.toggle(
+        "📶 オフライン保存",
+        key="write_behind",
+        help="保存をすぐに完了し、Notionへはバックグラウンドでまとめて送信します"
+    )
+    st.sidebar.caption(f"📤 未送信のスコア: {get_score_queue().pending_count()}件")
+    
+    # ローカル複製の全件再同期（Notion側で削除したページを反映する場合など）
+    with st.sidebar.expander("🗄️ ローカルデータ"):
+        if st.button("全件再同期", help="ローカル複製を破棄してNotionから作り直します"):
+            mirror = get_notion_mirror()
+            synced_counts = [mirror.sync(notion, db_id, full=True) for db_id in (USER_DB_ID, GAME_DB_ID, SCORE_DB_ID)]
+            if None in synced_counts:
+                st.error("一部のデータベースを同期できませんでした。もう一度お試しください。")
+            else:
+                st.success(f"{sum(synced_counts)}件のページを同期しました。")
+    
     st.sidebar.divider()
+    st.sidebar.caption(f"キャッシュ: ヒット {notion.cache_stats['hits']} / ミス {notion.cache_stats['misses']}")
+    
+    # 計測パネル（前回の再実行までの集計）
+    if st.sidebar.toggle("🔧 計測パネル", key="show_metrics"):
+        render_metrics_panel()
     
     if menu == "ラウンド記録":
         st.header("新しいラウンドを記録")
         
         # ユーザー一覧を取得
-        users = notion.get_users()
+        users = data.users()
         user_options = {user["name"]: user for user in users}
         
         # ラウンド情報入力フォーム
@@ -286,21 +1664,15 @@ def main():
                     game_id = datetime.now().strftime("%Y%m%d%H%M")
                     
                     # Notionページのプロパティを構築
-                    properties = {
-                        "id": {"title": [{"text": {"content": game_id}}]},
-                        "play_date": {"date": {"start": play_date.isoformat()}},
-                        "place": {"rich_text": [{"text": {"content": place}}]},
-                        "par": {"number": total_par},
-                        "gold": {"number": gold_rate},
-                        "silver": {"number": silver_rate},
-                        "bronze": {"number": bronze_rate},
-                        "iron": {"number": iron_rate},
-                        "diamond": {"number": diamond_rate}
+                    rates = {
+                        "gold": gold_rate,
+                        "silver": silver_rate,
+                        "bronze": bronze_rate,
+                        "iron": iron_rate,
+                        "diamond": diamond_rate
                     }
-                    
-                    # メンバーのリレーションを追加
-                    for i, member in enumerate(selected_members, 1):
-                        properties[f"member{i}"] = {"relation": [{"id": member["page_id"]}]}
+                    member_ids = [member["page_id"] for member in selected_members]
+                    properties = game_properties(game_id, play_date.isoformat(), place, total_par, rates, member_ids)
                     
                     result = notion.create_page(GAME_DB_ID, properties)
                     if result:
@@ -311,7 +1683,7 @@ def main():
         st.header("ラウンド編集")
         
         # 既存のユーザー一覧を取得
-        users = notion.get_users()
+        users = data.users()
         
         if not games:
             st.warning("編集可能なラウンドがありません。まずラウンドを記録してください。")
@@ -349,7 +1721,7 @@ def main():
             
             # デバッグ情報（開発用）
             with st.expander("🔍 デバッグ情報（開発用）"):
-                st.json(selected_game)
+                st.json(dict(selected_game))
             
             with st.form("edit_round_form"):
                 st.subheader("ラウンド情報編集")
@@ -476,40 +1848,36 @@ def main():
                     elif not edit_place:
                         st.error("ゴルフ場名を入力してください。")
                     else:
-                        # プレー日からIDを自動生成
-                        edit_game_id = edit_date.strftime("%Y%m%d")
+                        # プレー日を変更した場合はプレー日からIDを自動生成（変更しなければ今のIDのまま）
+                        edit_play_date = edit_date.strftime("%Y-%m-%d")
+                        edit_game_id = selected_game["id"] if edit_play_date == selected_game["play_date"] else edit_date.strftime("%Y%m%d")
                         
-                        # 更新用のプロパティを作成
-                        properties = {
-                            "play_date": {"date": {"start": edit_date.strftime("%Y-%m-%d")}},
-                            "place": {"rich_text": [{"text": {"content": edit_place}}]},
-                            "id": {"title": [{"text": {"content": edit_game_id}}]},
-                            "par": {"number": edit_par},
-                            "gold": {"number": edit_gold_rate},
-                            "silver": {"number": edit_silver_rate},
-                            "bronze": {"number": edit_bronze_rate},
-                            "iron": {"number": edit_iron_rate},
-                            "diamond": {"number": edit_diamond_rate}
+                        # 更新用のプロパティを作成し、今のラウンドから変わったものだけを送る
+                        rates = {
+                            "gold": edit_gold_rate,
+                            "silver": edit_silver_rate,
+                            "bronze": edit_bronze_rate,
+                            "iron": edit_iron_rate,
+                            "diamond": edit_diamond_rate
                         }
+                        properties = changed_properties(
+                            game_properties(edit_game_id, edit_play_date, edit_place, edit_par, rates, selected_member_ids),
+                            known_game_properties(selected_game)
+                        )
                         
-                        # メンバーのリレーションを更新（プルダウンの選択順序で設定）
-                        for i in range(1, 5):
-                            member_id = selected_member_ids[i-1] if i-1 < len(selected_member_ids) else None
-                            if member_id:
-                                properties[f"member{i}"] = {"relation": [{"id": member_id}]}
-                            else:
-                                properties[f"member{i}"] = {"relation": []}
-                        
-                        result = notion.update_page(selected_game["page_id"], properties)
-                        if result:
-                            st.success(f"ラウンド '{edit_game_id}' を更新しました！")
-                            st.rerun()
+                        if not properties:
+                            st.info("変更がないため、更新しませんでした。")
+                        else:
+                            result = notion.update_page(selected_game["page_id"], properties)
+                            if result:
+                                st.success(f"ラウンド '{edit_game_id}' を更新しました！")
+                                st.rerun()
     
     elif menu == "スコア入力":
         st.header("スコア入力")
         
         # ユーザー一覧を取得
-        users = notion.get_users()
+        users = data.users()
         
         if not games:
             st.warning("記録されたラウンドがありません。まずラウンドを記録してください。")
@@ -531,328 +1899,13 @@ def main():
             st.warning("このラウンドにメンバーが設定されていません。")
             return
         
-        # サイドバーでホールが選択されている場合はそれを使用、そうでなければボタン形式で選択
-        if "selected_hole" not in st.session_state:
-            st.session_state.selected_hole = 1
-        
-        hole_number = st.session_state.selected_hole
-        
-        # ホール選択セクション（ボタン形式 - サイドバー選択と連動）
-        st.subheader("🏌️ ホール選択")
-        
-        # 現在選択中のホールを表示
-        st.info(f"📌 現在選択中: ホール {hole_number} (サイドバーから変更可能)")
-        
-        # クイックホール選択ボタン（オプション）
-        with st.expander("🔄 クイックホール選択", expanded=False):
-            # 1行目：1-9ホール
-            hole_cols_1 = st.columns(9)
-            for i in range(1, 10):
-                with hole_cols_1[i-1]:
-                    button_type = "primary" if st.session_state.selected_hole == i else "secondary"
-                    if st.button(str(i), key=f"hole_{i}", type=button_type, use_container_width=True):
-                        st.session_state.selected_hole = i
-                        st.rerun()
-            
-            # 2行目：10-18ホール
-            hole_cols_2 = st.columns(9)
-            for i in range(10, 19):
-                with hole_cols_2[i-10]:
-                    button_type = "primary" if st.session_state.selected_hole == i else "secondary"
-                    if st.button(str(i), key=f"hole_{i}", type=button_type, use_container_width=True):
-                        st.session_state.selected_hole = i
-                        st.rerun()
-        
-        # 既存のスコアを確認（ホール変更時に動的に更新）
-        existing_scores = notion.get_scores(selected_game["id"])
-        
-        # 既存データがあるかどうかを表示
-        hole_scores_exist = any(score["hole"] == hole_number for score in existing_scores)
-        if hole_scores_exist:
-            st.info(f"ℹ️ ホール{hole_number}には既存のスコアデータがあります。既存データが入力欄に表示されています。")
-        else:
-            st.info(f"ℹ️ ホール{hole_number}は新規入力です。")
-        
-        # 全メンバーのスコア入力フォーム
-        with st.form(f"hole_score_form_{hole_number}"):  # ホール番号をキーに含める
-            member_scores = {}
-            olympic_options = ["", "金", "銀", "銅", "鉄", "ダイヤモンド"]
-            
-            # ヘッダーとボタンを同じ行に配置
-            header_col, save_col, prev_col, next_col = st.columns([1.5, 1, 1, 1])
-            with header_col:
-                st.subheader(f"ホール {hole_number} - スコア入力")
-            with save_col:
-                submitted = st.form_submit_button("保存", use_container_width=True, type="primary")
-            with prev_col:
-                # 前のホールへのボタン（1ホールより大きい場合のみ表示）
-                if hole_number > 1:
-                    prev_hole_clicked = st.form_submit_button("前のホール", use_container_width=True, type="secondary")
-            with next_col:
-                # 次のホールへのボタン（18ホール未満の場合のみ表示）
-                if hole_number < 18:
-                    next_hole_clicked = st.form_submit_button("次のホール", use_container_width=True, type="secondary")
-            
-            # メンバーを横に並べて表示
-            member_cols = st.columns(len(game_members))
-            
-            # 各メンバーの入力欄を作成
-            for i, member in enumerate(game_members):
-                member_index = i + 1
-                score_id = f"{selected_game['id']}_{member_index}_{hole_number}"
-                existing_score = next((score for score in existing_scores if score["id"] == score_id), None)
-                
-                # 各メンバーのカラム内で縦に配置
-                with member_cols[i]:
-                    # 既存データがある場合の表示
-                    data_status = "📊" if existing_score else "🆕"
-                    st.markdown(f"### {member['name_display']} {data_status}")
-                    st.caption(f"ホール{hole_number}")
-                    
-                    # パー±での入力（既存データから取得またはデフォルト0）
-                    par_relative = st.number_input(
-                        f"スコア",
-                        min_value=-3,
-                        max_value=20,
-                        value=existing_score["stroke"] if existing_score else 0,
-                        key=f"stroke_{member['page_id']}_{hole_number}",  # ホール番号を含める
-                        help="パーからの打数差を入力（-3～+20）"
-                    )
-                    
-                    # スコア表示
-                    if par_relative == -3:
-                        st.caption("☆ アルバトロス!")
-                    elif par_relative == -2:
-                        st.caption("◎ イーグル!")
-                    elif par_relative == -1:
-                        st.caption("○ バーディー!")
-                    elif par_relative == 0:
-                        st.caption("‐ パー")
-                    elif par_relative == 1:
-                        st.caption("△ ボギー")
-                    elif par_relative == 2:
-                        st.caption("▢ ダブルボギー")
-                    elif par_relative >= 3:
-                        st.caption(f"✕ トリプルボギー以上 (+{par_relative})")
-                    
-                    putt = st.number_input(
-                        "パット",
-                        min_value=0,
-                        max_value=5,
-                        value=existing_score["putt"] if existing_score else 0,
-                        key=f"putt_{member['page_id']}_{hole_number}"  # ホール番号を含める
-                    )
-                    
-                    olympic = st.selectbox(
-                        "オリンピック",
-                        olympic_options,
-                        index=olympic_options.index(existing_score["olympic"]) if existing_score and existing_score["olympic"] in olympic_options else 0,
-                        key=f"olympic_{member['page_id']}_{hole_number}"  # ホール番号を含める
-                    )
-                    
-                    snake = st.number_input(
-                        "ヘビ",
-                        min_value=0,
-                        max_value=20,
-                        value=existing_score["snake"] if existing_score else 0,
-                        key=f"snake_{member['page_id']}_{hole_number}"  # ホール番号を含める
-                    )
-                    
-                    # 3の倍数ホール（3、6、9、12、15、18）でsnake_outチェックボックスを表示
-                    snake_out = False
-                    # if hole_number % 3 == 0:
-                    snake_out = st.checkbox(
-                        "🐍アウト",
-                        value=existing_score["snake_out"] if existing_score else False,
-                        key=f"snake_out_{member['page_id']}_{hole_number}",
-                        help="このホールでヘビアウトになった場合にチェック"
-                    )
-                    
-                    # 既存データの詳細情報を表示
-                    if existing_score:
-                        st.caption("📊 既存データが読み込まれています")
-                    else:
-                        st.caption("🆕 新規入力")
-                
-                member_scores[member['page_id']] = {
-                    'member': member,
-                    'member_index': member_index,
-                    'score_id': score_id,
-                    'stroke': par_relative,  # パー±の値をそのまま保存
-                    'putt': putt,
-                    'snake': snake,
-                    'olympic': olympic,
-                    'snake_out': snake_out,
-                    'existing_score': existing_score
-                }
-            
-            if submitted:
-                # 3の倍数ホールでのsnake_outバリデーション
-                if hole_number % 3 == 0:
-                    snake_out_count = sum(1 for score_data in member_scores.values() if score_data['snake_out'])
-                    if snake_out_count > 1:
-                        st.error("🐍アウトは1人だけ選択できます。")
-                        st.stop()
-                
-                success_count = 0
-                error_count = 0
-                
-                # 各メンバーのスコアを保存
-                for member_page_id, score_data in member_scores.items():
-                    # スコアデータのプロパティを構築
-                    properties = {
-                        "id": {"title": [{"text": {"content": score_data['score_id']}}]},
-                        "game": {"relation": [{"id": selected_game["page_id"]}]},
-                        "user": {"relation": [{"id": score_data['member']['page_id']}]},
-                        "hole": {"number": hole_number},
-                        "stroke": {"number": score_data['stroke']},
-                        "putt": {"number": score_data['putt']},
-                        "snake": {"number": score_data['snake']}
-                    }
-                    
-                    # 3の倍数ホールの場合のみsnake_outを追加
-                    if hole_number % 3 == 0:
-                        properties["snake_out"] = {"checkbox": score_data['snake_out']}
-                    
-                    if score_data['olympic']:
-                        properties["olympic"] = {"select": {"name": score_data['olympic']}}
-                    
-                    if score_data['existing_score']:
-                        # 既存スコアを更新
-                        result = notion.update_page(score_data['existing_score']['page_id'], properties)
-                        if result:
-                            success_count += 1
-                        else:
-                            error_count += 1
-                    else:
-                        # 新規スコアを作成
-                        result = notion.create_page(SCORE_DB_ID, properties)
-                        if result:
-                            success_count += 1
-                        else:
-                            error_count += 1
-                
-                if error_count == 0:
-                    st.success(f"ホール{hole_number}の全メンバー（{success_count}名）のスコアを保存しました！")
-                    st.rerun()
-                else:
-                    st.warning(f"ホール{hole_number}のスコア保存完了: 成功{success_count}件、エラー{error_count}件")
-            
-            # 次のホールボタンが押された場合の処理
-            if hole_number < 18 and 'next_hole_clicked' in locals() and next_hole_clicked:
-                # 現在のスコアを保存してから次のホールへ移動
-                if member_scores:
-                    # 3の倍数ホールでのsnake_outバリデーション
-                    if hole_number % 3 == 0:
-                        snake_out_count = sum(1 for score_data in member_scores.values() if score_data['snake_out'])
-                        if snake_out_count > 1:
-                            st.error("🐍アウトは1人だけ選択してから次のホールへ進んでください。")
-                            st.stop()
-                    
-                    # スコアを保存
-                    success_count = 0
-                    error_count = 0
-                    
-                    for score_data in member_scores.values():
-                        properties = {
-                            "id": {"title": [{"text": {"content": score_data['score_id']}}]},
-                            "user": {"relation": [{"id": score_data['member']['page_id']}]},
-                            "hole": {"number": hole_number},
-                            "stroke": {"number": score_data['stroke']},
-                            "putt": {"number": score_data['putt']},
-                            "snake": {"number": score_data['snake']}
-                        }
-                        
-                        # 3の倍数ホールの場合のみsnake_outを追加
-                        if hole_number % 3 == 0:
-                            properties["snake_out"] = {"checkbox": score_data['snake_out']}
-                        
-                        if score_data['olympic']:
-                            properties["olympic"] = {"select": {"name": score_data['olympic']}}
-                        
-                        if score_data['existing_score']:
-                            result = notion.update_page(score_data['existing_score']['page_id'], properties)
-                        else:
-                            result = notion.create_page(SCORE_DB_ID, properties)
-                        
-                        if result:
-                            success_count += 1
-                        else:
-                            error_count += 1
-                    
-                    # 保存が成功した場合のみ次のホールへ移動
-                    if error_count == 0:
-                        st.session_state.selected_hole = hole_number + 1
-                        st.success(f"ホール{hole_number}のスコアを保存して、ホール{hole_number + 1}に移動しました！")
-                        st.rerun()
-                    else:
-                        st.warning(f"エラーが発生しました: 成功{success_count}件、エラー{error_count}件")
-                else:
-                    # スコア入力なしで次のホールへ
-                    st.session_state.selected_hole = hole_number + 1
-                    st.info(f"ホール{hole_number + 1}に移動しました。")
-                    st.rerun()
-            
-            # 前のホールボタンが押された場合の処理
-            if hole_number > 1 and 'prev_hole_clicked' in locals() and prev_hole_clicked:
-                # 現在のスコアを保存してから前のホールへ移動
-                if member_scores:
-                    # 3の倍数ホールでのsnake_outバリデーション
-                    if hole_number % 3 == 0:
-                        snake_out_count = sum(1 for score_data in member_scores.values() if score_data['snake_out'])
-                        if snake_out_count > 1:
-                            st.error("🐍アウトは1人だけ選択してから前のホールに戻ってください。")
-                            st.stop()
-                    
-                    # スコアを保存
-                    success_count = 0
-                    error_count = 0
-                    
-                    for score_data in member_scores.values():
-                        properties = {
-                            "id": {"title": [{"text": {"content": score_data['score_id']}}]},
-                            "user": {"relation": [{"id": score_data['member']['page_id']}]},
-                            "hole": {"number": hole_number},
-                            "stroke": {"number": score_data['stroke']},
-                            "putt": {"number": score_data['putt']},
-                            "snake": {"number": score_data['snake']}
-                        }
-                        
-                        # 3の倍数ホールの場合のみsnake_outを追加
-                        if hole_number % 3 == 0:
-                            properties["snake_out"] = {"checkbox": score_data['snake_out']}
-                        
-                        if score_data['olympic']:
-                            properties["olympic"] = {"select": {"name": score_data['olympic']}}
-                        
-                        if score_data['existing_score']:
-                            result = notion.update_page(score_data['existing_score']['page_id'], properties)
-                        else:
-                            result = notion.create_page(SCORE_DB_ID, properties)
-                        
-                        if result:
-                            success_count += 1
-                        else:
-                            error_count += 1
-                    
-                    # 保存が成功した場合のみ前のホールへ移動
-                    if error_count == 0:
-                        st.session_state.selected_hole = hole_number - 1
-                        st.success(f"ホール{hole_number}のスコアを保存して、ホール{hole_number - 1}に移動しました！")
-                        st.rerun()
-                    else:
-                        st.warning(f"エラーが発生しました: 成功{success_count}件、エラー{error_count}件")
-                else:
-                    # スコア入力なしで前のホールへ
-                    st.session_state.selected_hole = hole_number - 1
-                    st.info(f"ホール{hole_number - 1}に移動しました。")
-                    st.rerun()
+        score_entry_panel(notion, selected_game, game_members)
     
     elif menu == "スコア確認":
         st.header("スコア確認")
         
-        # ユーザー一覧を取得
-        users = notion.get_users()
+        # ユーザー一覧を取得（ローカル複製から）
+        users = data.local_users()
         
         if not games:
             st.warning("記録されたラウンドがありません。")
@@ -868,421 +1921,17 @@ def main():
             selected_game_key = st.selectbox("ラウンドを選択", list(game_options.keys()))
             selected_game = game_options[selected_game_key]
         
-        # スコアを取得
-        scores = notion.get_scores(selected_game["id"])
-        
-        if not scores:
-            st.warning("このラウンドのスコアが記録されていません。")
-            return
-        
         # ユーザー辞書を作成
         user_dict = {user["page_id"]: user for user in users}
         game_members = [user_dict[member_id] for member_id in selected_game["members"] if member_id in user_dict]
         
-        # スコアカードを表示
-        st.subheader(f"📊 {selected_game['place']} - {selected_game['play_date']}")
-        
-        # ホール別スコア表を作成
-        score_data = {}
-        for member in game_members:
-            score_data[member["name"]] = {}
-        
-        for score in scores:
-            user_name = next((user["name"] for user in users if user["page_id"] == score["user_relation"]), "Unknown")
-            if user_name in score_data:
-                score_data[user_name][score["hole"]] = {
-                    "stroke": score["stroke"],
-                    "putt": score["putt"],
-                    "snake": score["snake"],
-                    "olympic": score["olympic"],
-                    "snake_out": score.get("snake_out", False),
-                    "birdie": score.get("birdie", False)
-                }
-        
-        # スコアシート形式のテーブルを作成
-        st.subheader("📋 スコアシート")
-        
-        # テーブルデータを構築
-        table_data = []
-        
-        # ヘッダー行
-        header = ["名前"] + [str(i) for i in range(1, 10)] + ["IN"] + [str(i) for i in range(10, 19)] + ["OUT", "計"]
-        table_data.append(header)
-        
-        # 合計パー数を取得
-        total_par = selected_game.get('par', 72)
-        
-        # 各メンバーのスコア行
-        for member in game_members:
-            member_name = member["name"]
-            
-            # ストローク行
-            stroke_row = [member_name]
-            in_total = 0
-            out_total = 0
-            
-            # 前半（1-9ホール）
-            for hole in range(1, 10):
-                if hole in score_data[member_name]:
-                    par_diff = score_data[member_name][hole]["stroke"]  # データベースにはパー±が保存されている
-                    stroke_row.append(f"{par_diff:+d}" if par_diff != 0 else "0")
-                    in_total += par_diff
-                else:
-                    stroke_row.append("-")
-            
-            # IN合計をパー±で表示
-            if in_total != 0:
-                stroke_row.append(f"{in_total:+d}")
-            else:
-                stroke_row.append("0" if any(hole in score_data[member_name] for hole in range(1, 10)) else "-")
-            
-            # 後半（10-18ホール）
-            for hole in range(10, 19):
-                if hole in score_data[member_name]:
-                    par_diff = score_data[member_name][hole]["stroke"]  # データベースにはパー±が保存されている
-                    stroke_row.append(f"{par_diff:+d}" if par_diff != 0 else "0")
-                    out_total += par_diff
-                else:
-                    stroke_row.append("-")
-            
-            # OUT合計をパー±で表示
-            if out_total != 0:
-                stroke_row.append(f"{out_total:+d}")
-            else:
-                stroke_row.append("0" if any(hole in score_data[member_name] for hole in range(10, 19)) else "-")
-            
-            # 総合計を「実際スコア(パー±)」形式で表示
-            total_diff = in_total + out_total
-            if any(hole in score_data[member_name] for hole in range(1, 19)):
-                total_actual_score = total_par + total_diff
-                if total_diff != 0:
-                    stroke_row.append(f"{total_actual_score}({total_diff:+d})")
-                else:
-                    stroke_row.append(f"{total_actual_score}(0)")
-            else:
-                stroke_row.append("-")
-            
-            table_data.append(stroke_row)
-            
-            # パット行
-            putt_row = [""]  # 名前欄は空白
-            in_putt_total = 0
-            out_putt_total = 0
-            
-            # 前半（1-9ホール）
-            for hole in range(1, 10):
-                if hole in score_data[member_name]:
-                    putt = score_data[member_name][hole]["putt"]
-                    putt_row.append(str(putt))
-                    in_putt_total += putt
-                else:
-                    putt_row.append("-")
-            
-            putt_row.append(str(in_putt_total) if in_putt_total > 0 else "-")
-            
-            # 後半（10-18ホール）
-            for hole in range(10, 19):
-                if hole in score_data[member_name]:
-                    putt = score_data[member_name][hole]["putt"]
-                    putt_row.append(str(putt))
-                    out_putt_total += putt
-                else:
-                    putt_row.append("-")
-            
-            putt_row.append(str(out_putt_total) if out_putt_total > 0 else "-")
-            putt_row.append(str(in_putt_total + out_putt_total) if (in_putt_total > 0 and out_putt_total > 0) else "-")
-            
-            table_data.append(putt_row)
-        
-                # Streamlitでテーブルを表示
-        import pandas as pd
-        df = pd.DataFrame(table_data[1:], columns=table_data[0])
-        
-        # IN/OUT/計列の数値セルを太字にするスタイリング
-        def style_bold_totals(df):
-            def apply_bold_style(val):
-                if str(val) != "-" and str(val).isdigit():
-                    return "font-weight: bold"
-                return ""
-            
-            styled_df = df.style
-            for col in ["IN", "OUT", "計"]:
-                if col in df.columns:
-                    styled_df = styled_df.applymap(apply_bold_style, subset=[col])
-            
-            return styled_df
-        
-        # スタイル付きデータフレームを表示
-        st.dataframe(style_bold_totals(df), use_container_width=True, hide_index=True)
-        
-        # ヘビスコア確認シートを追加
-        st.subheader("🐍 ヘビスコア")
-        
-        # ヘビスコアのテーブルデータを構築
-        snake_table_data = []
-        
-        # ヘッダー行（3ホールごと）
-        snake_header = ["名前", "1-3", "4-6", "7-9", "10-12", "13-15", "16-18"]
-        snake_table_data.append(snake_header)
-        
-        # 各メンバーのヘビスコア行
-        for member in game_members:
-            member_name = member["name"]
-            snake_row = [member_name]
-            
-            # 3ホールごとの集計
-            for start_hole in [1, 4, 7, 10, 13, 16]:
-                period_snake = 0
-                for hole in range(start_hole, start_hole + 3):
-                    if hole in score_data[member_name]:
-                        period_snake += score_data[member_name][hole]["snake"]
-                
-                snake_row.append(str(period_snake) if period_snake > 0 else "0")
-            
-            snake_table_data.append(snake_row)
-        
-        # 全メンバー合計行を追加
-        total_row = ["合計"]
-        for start_hole in [1, 4, 7, 10, 13, 16]:
-            period_total = 0
-            for member in game_members:
-                member_name = member["name"]
-                for hole in range(start_hole, start_hole + 3):
-                    if hole in score_data[member_name]:
-                        period_total += score_data[member_name][hole]["snake"]
-            total_row.append(str(period_total))
-        
-        snake_table_data.append(total_row)
-        
-        # アウトメンバー行を追加
-        out_row = ["アウト"]
-        for target_hole in [3, 6, 9, 12, 15, 18]:
-            out_members = []
-            for member in game_members:
-                member_name = member["name"]
-                if target_hole in score_data[member_name] and score_data[member_name][target_hole].get("snake_out", False):
-                    out_members.append(member_name)
-            
-            if out_members:
-                out_row.append(", ".join(out_members))
-            else:
-                out_row.append("-")
-        
-        snake_table_data.append(out_row)
-        
-        # ヘビスコアテーブルを表示
-        snake_df = pd.DataFrame(snake_table_data[1:], columns=snake_table_data[0])
-        st.dataframe(snake_df, use_container_width=True, hide_index=True)
-
-        # 各メンバーのOUT合計を計算
-        member_out_totals = {}
-
-        for member in game_members:
-            member_name = member["name"]
-            total_out_score = 0
-            
-            # 3の倍数ホール（3、6、9、12、15、18）をチェック
-            for target_hole in [3, 6, 9, 12, 15, 18]:
-                if target_hole in score_data[member_name] and score_data[member_name][target_hole].get("snake_out", False):
-                    # そのホールまでの3ホール区間の全メンバー合計ヘビ数を計算
-                    start_hole = target_hole - 2  # 3→1, 6→4, 9→7, 12→10, 15→13, 18→16
-                    period_total = 0
-                    
-                    for check_member in game_members:
-                        check_member_name = check_member["name"]
-                        for hole in range(start_hole, target_hole + 1):
-                            if hole in score_data[check_member_name]:
-                                period_total += score_data[check_member_name][hole]["snake"]
-                    
-                    total_out_score += period_total
-            
-            member_out_totals[member_name] = total_out_score
-            
-        # 結果を表示
-        out_total_cols = st.columns(len(game_members))
-        for i, member in enumerate(game_members):
-            member_name = member["name"]
-            with out_total_cols[i]:
-                st.metric(
-                    member_name,
-                    f"{member_out_totals[member_name]}",
-                    help="OUTになった時の3ホール区間合計ヘビ数の累計"
-                )
-        
-        # オリンピックスコア確認シートを追加
-        st.subheader("🏅 オリンピックスコア")
-        
-        # オリンピックスコアのテーブルデータを構築
-        olympic_table_data = []
-        
-        # ヘッダー行
-        olympic_header = ["名前", "金", "銀", "銅", "鉄", "ダイヤモンド", "合計点"]
-        olympic_table_data.append(olympic_header)
-        
-        # オリンピック設定値を取得
-        gold_rate = selected_game.get("gold", 4)
-        silver_rate = selected_game.get("silver", 3)
-        bronze_rate = selected_game.get("bronze", 2)
-        iron_rate = selected_game.get("iron", 1)
-        diamond_rate = selected_game.get("diamond", 5)
-        
-        # 各メンバーのオリンピックスコア行
-        for member in game_members:
-            member_name = member["name"]
-            
-            # 各オリンピックの個数をカウント
-            gold_count = 0
-            silver_count = 0
-            bronze_count = 0
-            iron_count = 0
-            diamond_count = 0
-            
-            for hole in range(1, 19):
-                if hole in score_data[member_name]:
-                    olympic = score_data[member_name][hole]["olympic"]
-                    if olympic == "金":
-                        gold_count += 1
-                    elif olympic == "銀":
-                        silver_count += 1
-                    elif olympic == "銅":
-                        bronze_count += 1
-                    elif olympic == "鉄":
-                        iron_count += 1
-                    elif olympic == "ダイヤモンド":
-                        diamond_count += 1
-            
-            # 合計点を計算（個数×設定値）
-            total_points = (gold_count * gold_rate + 
-                           silver_count * silver_rate + 
-                           bronze_count * bronze_rate + 
-                           iron_count * iron_rate + 
-                           diamond_count * diamond_rate)
-            
-            # 表示は未取得(0)の場合は '-' を表示
-            gold_disp = str(gold_count) if gold_count > 0 else "-"
-            silver_disp = str(silver_count) if silver_count > 0 else "-"
-            bronze_disp = str(bronze_count) if bronze_count > 0 else "-"
-            iron_disp = str(iron_count) if iron_count > 0 else "-"
-            diamond_disp = str(diamond_count) if diamond_count > 0 else "-"
-            total_disp = str(total_points) if total_points > 0 else "-"
-
-            olympic_row = [
-                member_name,
-                gold_disp,
-                silver_disp,
-                bronze_disp,
-                iron_disp,
-                diamond_disp,
-                total_disp
-            ]
-            olympic_table_data.append(olympic_row)
-        
-        # オリンピックスコアテーブルを表示
-        olympic_df = pd.DataFrame(olympic_table_data[1:], columns=olympic_table_data[0])
-        
-        # 合計点列を太字にするスタイリング
-        def style_olympic_totals(df):
-            def apply_bold_style(val):
-                if str(val).isdigit():
-                    return "font-weight: bold"
-                return ""
-            
-            styled_df = df.style
-            if "合計点" in df.columns:
-                styled_df = styled_df.applymap(apply_bold_style, subset=["合計点"])
-            
-            return styled_df
-        
-        st.dataframe(style_olympic_totals(olympic_df), use_container_width=True, hide_index=True)
-        
-        # オリンピック設定値を表示
-        st.caption(f"設定値: 金={gold_rate}点, 銀={silver_rate}点, 銅={bronze_rate}点, 鉄={iron_rate}点, ダイヤモンド={diamond_rate}点")
-        
-        # スペシャルスコア確認シートを追加
-        st.subheader("🏆 スペシャルスコア")
-        
-        # 各メンバーのスペシャルスコア取得数を計算
-        member_special_scores = {}
-        
-        for member in game_members:
-            member_name = member["name"]
-            albatross_count = 0  # -3
-            eagle_count = 0      # -2
-            birdie_count = 0     # -1
-            
-            # 全18ホールのスペシャルスコアをカウント
-            for hole in range(1, 19):
-                if hole in score_data[member_name]:
-                    par_diff = score_data[member_name][hole]["stroke"]
-                    if par_diff == -3:
-                        albatross_count += 1
-                    elif par_diff == -2:
-                        eagle_count += 1
-                    elif par_diff == -1:
-                        birdie_count += 1
-            
-            member_special_scores[member_name] = {
-                "albatross": albatross_count,
-                "eagle": eagle_count,
-                "birdie": birdie_count
-            }
-        
-        # 結果を表示
-        special_score_cols = st.columns(len(game_members))
-        for i, member in enumerate(game_members):
-            member_name = member["name"]
-            scores = member_special_scores[member_name]
-            with special_score_cols[i]:
-                st.markdown(f"**{member_name}**")
-                if scores["albatross"] > 0:
-                    st.metric("🦈 アルバトロス", scores["albatross"])
-                if scores["eagle"] > 0:
-                    st.metric("🦅 イーグル", scores["eagle"])
-                if scores["birdie"] > 0:
-                    st.metric("🐦 バーディー", scores["birdie"])
-                if scores["albatross"] == 0 and scores["eagle"] == 0 and scores["birdie"] == 0:
-                    st.caption("スペシャルスコアなし")
-        
-        # 詳細情報（オリンピック、ヘビ）の表示
-        st.subheader("🏅 詳細情報")
-        
-        for member in game_members:
-            member_name = member["name"]
-            with st.expander(f"{member_name} の詳細"):
-                detail_cols = st.columns(6)
-                
-                for hole in range(1, 19):
-                    col_index = (hole - 1) % 6
-                    with detail_cols[col_index]:
-                        if hole in score_data[member_name]:
-                            hole_data = score_data[member_name][hole]
-                            par_diff = hole_data['stroke']  # データベースにはパー±が保存されている
-                            
-                            st.write(f"**ホール {hole}**")
-                            if par_diff > 0:
-                                st.write(f"パー: +{par_diff}")
-                            elif par_diff < 0:
-                                st.write(f"パー: {par_diff}")
-                            else:
-                                st.write("パー: E")
-                            st.write(f"パット: {hole_data['putt']}")
-                            if hole_data['olympic']:
-                                st.write(f"🏅 {hole_data['olympic']}")
-                            else:
-                                st.write("🏅 -")
-                            if hole_data['snake'] > 0:
-                                st.write(f"🐍 ヘビ: {hole_data['snake']}")
-                            else:
-                                st.write("🐍 -")
-                        else:
-                            st.write(f"**ホール {hole}**")
-                            st.write("未記録")
+        score_review_panel(notion, selected_game, game_members)
     
     elif menu == "計算シート":
         st.header("💰 計算シート")
         
-        # ユーザー一覧を取得
-        users = notion.get_users()
+        # ユーザー一覧を取得（ローカル複製から）
+        users = data.local_users()
         
         if not games:
             st.warning("記録されたラウンドがありません。")
@@ -1298,8 +1947,8 @@ def main():
             selected_game_key = st.selectbox("ラウンドを選択", list(game_options.keys()))
             selected_game = game_options[selected_game_key]
         
-        # スコアを取得
-        scores = notion.get_scores(selected_game["id"])
+        # スコアを取得（ローカル複製から）
+        scores = get_local_scores(notion, selected_game)
         
         if not scores:
             st.warning("このラウンドのスコアが記録されていません。")
@@ -1313,112 +1962,11 @@ def main():
             st.warning("計算には最低2名のメンバーが必要です。")
             return
         
-        # スコアデータを整理
-        score_data = {}
-        for member in game_members:
-            score_data[member["name"]] = {
-                "olympic_score": 0,
-                "snake_score": 0,
-                "special_score": 0,
-                "page_id": member["page_id"]
-            }
-        
-        # オリンピック設定値を取得
-        gold_rate = selected_game.get("gold", 4)
-        silver_rate = selected_game.get("silver", 3)
-        bronze_rate = selected_game.get("bronze", 2)
-        iron_rate = selected_game.get("iron", 1)
-        diamond_rate = selected_game.get("diamond", 5)
-        
-        # 各イベントを記録（個別計算のため）
-        events = []  # {"type": "olympic/special/snake", "player": "name", "points": int}
-        
-        # 各メンバーのスコアを計算
-        for score in scores:
-            user_name = next((user["name"] for user in users if user["page_id"] == score["user_relation"]), None)
-            if user_name and user_name in score_data:
-                # オリンピックスコア
-                olympic = score.get("olympic", "")
-                if olympic == "金":
-                    score_data[user_name]["olympic_score"] += gold_rate
-                    events.append({"type": "olympic", "player": user_name, "points": gold_rate})
-                elif olympic == "銀":
-                    score_data[user_name]["olympic_score"] += silver_rate
-                    events.append({"type": "olympic", "player": user_name, "points": silver_rate})
-                elif olympic == "銅":
-                    score_data[user_name]["olympic_score"] += bronze_rate
-                    events.append({"type": "olympic", "player": user_name, "points": bronze_rate})
-                elif olympic == "鉄":
-                    score_data[user_name]["olympic_score"] += iron_rate
-                    events.append({"type": "olympic", "player": user_name, "points": iron_rate})
-                elif olympic == "ダイヤモンド":
-                    score_data[user_name]["olympic_score"] += diamond_rate
-                    events.append({"type": "olympic", "player": user_name, "points": diamond_rate})
-                
-                # ヘビスコア（個別記録のみ、3ホール集計は後で計算）
-                snake = score.get("snake", 0)
-                if snake > 0:
-                    # 後で3ホール集計するため、ここでは個別のスネークスコアのみ記録
-                    if "individual_snakes" not in score_data[user_name]:
-                        score_data[user_name]["individual_snakes"] = {}
-                    hole_num = score.get("hole", 0)
-                    score_data[user_name]["individual_snakes"][hole_num] = snake
-                
-                # スペシャルスコア（バーディー以上）
-                par_diff = score.get("stroke", 0)  # パー±
-                if par_diff <= -1:  # バーディー以上
-                    if par_diff == -1:  # バーディー
-                        score_data[user_name]["special_score"] += 1
-                        events.append({"type": "special", "player": user_name, "points": 1})
-                    elif par_diff == -2:  # イーグル
-                        score_data[user_name]["special_score"] += 3
-                        events.append({"type": "special", "player": user_name, "points": 3})
-                    elif par_diff <= -3:  # アルバトロス
-                        score_data[user_name]["special_score"] += 5
-                        events.append({"type": "special", "player": user_name, "points": 5})
-        
-        # 3ホール集計でヘビスコアを計算
-        # まず各メンバーのスコアデータを整理
-        member_hole_data = {}
-        for member in game_members:
-            member_name = member["name"]
-            member_hole_data[member_name] = {}
-            
-        for score in scores:
-            user_name = next((user["name"] for user in users if user["page_id"] == score["user_relation"]), None)
-            if user_name and user_name in member_hole_data:
-                hole_num = score.get("hole", 0)
-                snake = score.get("snake", 0)
-                snake_out = score.get("snake_out", False)
-                member_hole_data[user_name][hole_num] = {
-                    "snake": snake,
-                    "snake_out": snake_out
-                }
-        
-        # 各メンバーのOUT合計を計算（3ホール集計方式）
-        for member in game_members:
-            member_name = member["name"]
-            total_snake_score = 0
-            
-            # 3の倍数ホール（3、6、9、12、15、18）をチェック
-            for target_hole in [3, 6, 9, 12, 15, 18]:
-                if target_hole in member_hole_data[member_name] and member_hole_data[member_name][target_hole].get("snake_out", False):
-                    # そのホールまでの3ホール区間の全メンバー合計ヘビ数を計算
-                    start_hole = target_hole - 2  # 3→1, 6→4, 9→7, 12→10, 15→13, 18→16
-                    period_total = 0
-                    
-                    for check_member in game_members:
-                        check_member_name = check_member["name"]
-                        for hole in range(start_hole, target_hole + 1):
-                            if hole in member_hole_data[check_member_name]:
-                                period_total += member_hole_data[check_member_name][hole]["snake"]
-                    
-                    total_snake_score += period_total
-                    # イベントを記録
-                    events.append({"type": "snake", "player": member_name, "points": period_total})
-            
-            # 3ホール集計結果を保存
-            score_data[member_name]["snake_score"] = total_snake_score
+        # メンバー×ホールでスコアを整理し、得点イベントと収支を計算
+        board = ScoreBoard(game_members, scores)
+        round_result = score_round(board, olympic_rates(selected_game))
+        score_totals = round_result["totals"]
+        final_balances = round_result["balances"]
         
         # 各メンバーの合計スコアを計算
         st.subheader("📊 スコア詳細")
@@ -1427,44 +1975,17 @@ def main():
         
         for i, member in enumerate(game_members):
             member_name = member["name"]
-            data = score_data[member_name]
+            member_totals = score_totals[member_name]
             
             with detail_cols[i]:
                 st.markdown(f"**{member_name}**")
-                st.metric("🏅 オリンピック", f"+{data['olympic_score']}")
-                st.metric("🏆 スペシャル", f"+{data['special_score']}")
-                st.metric("🐍 ヘビ", f"-{data['snake_score']}")
+                st.metric("🏅 オリンピック", f"+{member_totals['olympic']}")
+                st.metric("🏆 スペシャル", f"+{member_totals['special']}")
+                st.metric("🐍 ヘビ", f"-{member_totals['snake']}")
         
         # 収支計算（イベントベース）
         st.subheader("💸 収支計算")
         
-        # メンバー数
-        num_members = len(game_members)
-        other_members = num_members - 1
-        
-        # 各メンバーの最終収支を計算
-        final_balances = {member["name"]: 0 for member in game_members}
-        
-        # 各イベントごとに収支を計算
-        for event in events:
-            event_player = event["player"]
-            event_points = event["points"]
-            event_type = event["type"]
-            
-            if event_type in ["olympic", "special"]:
-                # プラスイベント：該当プレイヤーは他全員からポイントをもらう
-                final_balances[event_player] += event_points * other_members
-                for member_name in final_balances:
-                    if member_name != event_player:
-                        final_balances[member_name] -= event_points
-            
-            elif event_type == "snake":
-                # マイナスイベント：該当プレイヤーは他全員にポイントを払う
-                final_balances[event_player] -= event_points * other_members
-                for member_name in final_balances:
-                    if member_name != event_player:
-                        final_balances[member_name] += event_points
-        
         # 収支表示
         balance_cols = st.columns(len(game_members))
         for i, member in enumerate(game_members):
@@ -1480,74 +2001,26 @@ def main():
                 else:
                     st.info("⚖️ ±0点")
         
-        # 最終収支に基づいた正しいメンバー間関係を計算
-        member_relationships = {}
-        
-        # プラス収支とマイナス収支のメンバーを分ける
-        positive_members = {name: balance for name, balance in final_balances.items() if balance > 0}
-        negative_members = {name: abs(balance) for name, balance in final_balances.items() if balance < 0}
-        
-        # 各メンバーの関係を初期化
-        for member in game_members:
-            member_relationships[member["name"]] = {}
-        
-        # プラス収支のメンバーはマイナス収支のメンバーから受け取る
-        for pos_name, pos_amount in positive_members.items():
-            total_negative = sum(negative_members.values())
-            if total_negative > 0:
-                for neg_name, neg_amount in negative_members.items():
-                    # 比例配分で受け取り額を計算
-                    receive_amount = pos_amount * (neg_amount / total_negative)
-                    member_relationships[pos_name][neg_name] = receive_amount
-                    member_relationships[neg_name][pos_name] = -receive_amount
+        # 最終収支を最小回数の支払いで精算する
+        transfers = settle(final_balances)
+        member_relationships = settlement_relations(transfers, [member["name"] for member in game_members])
         
         # メンバー間関係を表示（タイトルなし）
         relationship_cols = st.columns(len(game_members))
         for i, member in enumerate(game_members):
             member_name = member["name"]
-            relationships = member_relationships[member_name]
+            member_relations = member_relationships[member_name]
             
             with relationship_cols[i]:
-                for other_name, points in relationships.items():
-                    if abs(points) > 0.01:  # 小数点以下の誤差を無視
-                        if points > 0:
-                            st.write(f"{other_name}: +{int(points)}点")
-                        else:
-                            st.write(f"{other_name}: {int(points)}点")
-                    elif abs(points) <= 0.01 and points != 0:  # 誤差範囲内の0も±0で表示
-                        st.write(f"{other_name}: ±0点")
-        
-        # 最終的な支払い・受取（相殺後）を計算
-        st.write("---")  # 区切り線
+                for other_name, points in member_relations.items():
+                    if points > 0:
+                        st.write(f"{other_name}: +{points}点")
+                    else:
+                        st.write(f"{other_name}: {points}点")
         
-        # 相殺計算：A→B の関係とB→A の関係を比較
-        final_transactions = {}
-        processed_pairs = set()
+        st.caption(f"精算回数: {len(transfers)}回")
         
-        for member1_name in member_relationships:
-            for member2_name in member_relationships[member1_name]:
-                # ペアの処理済みチェック（順序関係なく）
-                pair = tuple(sorted([member1_name, member2_name]))
-                if pair in processed_pairs:
-                    continue
-                
-                # member1からmember2への関係
-                member1_to_member2 = member_relationships[member1_name].get(member2_name, 0)
-                # member2からmember1への関係
-                member2_to_member1 = member_relationships[member2_name].get(member1_name, 0)
-                
-                # 相殺計算
-                net_amount = member1_to_member2 + member2_to_member1
-                
-                if net_amount > 0:
-                    # member1がmember2から受け取る
-                    final_transactions[f"{member1_name}←{member2_name}"] = net_amount
-                elif net_amount < 0:
-                    # member2がmember1から受け取る
-                    final_transactions[f"{member2_name}←{member1_name}"] = abs(net_amount)
-                # net_amount == 0の場合は相殺されるので表示しない
-                
-                processed_pairs.add(pair)
+        st.write("---")  # 区切り線
         
         # 収支詳細をアコーディオンで表示
         with st.expander("📋 収支詳細"):
@@ -1557,53 +2030,31 @@ def main():
             # テーブルデータを作成
             import pandas as pd
             
-            # 各列のデータを準備（各メンバーごとの列）
+            # 各メンバーの列データを作成（1行目：最終収支、2行目以降：精算相手）
             table_data = {}
-            max_relationships = 0
-            
-            # 各メンバーの他メンバーとの関係数を調べて最大行数を決定
-            for member in game_members:
-                member_name = member["name"]
-                relationships = member_relationships[member_name]
-                relationship_count = sum(1 for points in relationships.values() if abs(points) > 0.01)
-                max_relationships = max(max_relationships, relationship_count)
-            
-            # 各メンバーの列データを作成
             for member in game_members:
                 member_name = member["name"]
-                column_data = []
-                
-                # 1行目：メンバー名（ヘッダーとして使用）
-                # 2行目：最終収支
                 balance = final_balances[member_name]
                 if balance > 0:
-                    column_data.append(f"+{int(balance)}点")
+                    column_data = [f"+{balance}点"]
                 elif balance < 0:
-                    column_data.append(f"{int(balance)}点")
+                    column_data = [f"{balance}点"]
                 else:
-                    column_data.append("±0点")
-                
-                # 3行目以降：他メンバーとの関係
-                relationships = member_relationships[member_name]
-                for other_name, points in relationships.items():
-                    if abs(points) > 0.01:  # 小数点以下の誤差を無視
-                        if points > 0:
-                            column_data.append(f"{other_name}:+{int(points)}")
-                        else:
-                            column_data.append(f"{other_name}:{int(points)}")
+                    column_data = ["±0点"]
                 
-                # 関係がない他メンバーは±0で表示
-                for other_member in game_members:
-                    other_name = other_member["name"]
-                    if other_name != member_name and other_name not in relationships:
-                        column_data.append(f"{other_name}:±0")
-                
-                # 行数を統一するために空行を追加
-                while len(column_data) < max_relationships + 1:  # +1は最終収支の行
-                    column_data.append("")
+                for other_name, points in member_relationships[member_name].items():
+                    if points > 0:
+                        column_data.append(f"{other_name}:+{points}")
+                    else:
+                        column_data.append(f"{other_name}:{points}")
                 
                 table_data[member_name] = column_data
             
+            # 行数を統一するために空行を追加
+            max_relationships = max(len(column_data) for column_data in table_data.values()) - 1
+            for column_data in table_data.values():
+                column_data.extend([""] * (max_relationships + 1 - len(column_data)))
+            
             # 行インデックスを作成
             row_labels = ["最終収支"] + [f"関係{i+1}" for i in range(max_relationships)]
             
@@ -1613,11 +2064,160 @@ def main():
             # テーブルを表示
             st.dataframe(df, use_container_width=True)
         
+        # シーズン台帳への記録
+        st.subheader("📒 シーズン台帳")
+        ledger = get_season_ledger()
+        finalized_at = ledger.finalized_at(selected_game["page_id"])
+        if finalized_at:
+            st.caption(f"確定済み: {datetime.fromtimestamp(finalized_at).strftime('%Y-%m-%d %H:%M')}")
+        else:
+            st.caption("このラウンドは未確定です。確定するとシーズン収支に反映されます。")
+        
+        finalize_col, cancel_col = st.columns(2)
+        with finalize_col:
+            if st.button("✅ 収支を確定" if not finalized_at else "🔄 現在の収支で再確定", use_container_width=True):
+                ledger.finalize(selected_game, [
+                    {
+                        "player_page_id": member["page_id"],
+                        "player_name": member["name"],
+                        "olympic": score_totals[member["name"]]["olympic"],
+                        "special": score_totals[member["name"]]["special"],
+                        "snake": score_totals[member["name"]]["snake"],
+                        "balance": final_balances[member["name"]]
+                    }
+                    for member in game_members
+                ])
+                st.success("シーズン台帳に記録しました")
+                st.rerun()
+        with cancel_col:
+            if finalized_at and st.button("↩️ 確定を取り消す", use_container_width=True):
+                ledger.unfinalize(selected_game["page_id"])
+                st.success("確定を取り消しました")
+                st.rerun()
+        
+    elif menu == "シーズン収支":
+        st.header("📒 シーズン収支")
+        
+        ledger = get_season_ledger()
+        seasons = ledger.seasons()
+        if not seasons:
+            st.warning("確定したラウンドがありません。計算シートで収支を確定してください。")
+            return
+        
+        # シーズン（年）または期間で集計
+        period_type = st.radio("集計単位", ["シーズン", "期間指定"], horizontal=True)
+        if period_type == "シーズン":
+            # プレー日のないラウンドは空のシーズン（""）に記録されている
+            season = st.selectbox("シーズン", seasons, format_func=lambda season: season or "プレー日なし")
+            totals = ledger.season_balances(season)
+        else:
+            latest_season = next((season for season in seasons if season), None)
+            date_range = st.date_input(
+                "期間",
+                value=(date(int(latest_season), 1, 1) if latest_season else date.today(), date.today())
+            )
+            if len(date_range) != 2:
+                st.info("終了日を選択してください。")
+                return
+            start_date, end_date = date_range
+            totals = ledger.range_balances(start_date.isoformat(), end_date.isoformat())
+        
+        if not totals:
+            st.warning("この期間に確定したラウンドがありません。")
+            return
+        
+        import pandas as pd
+        
+        totals_df = pd.DataFrame([
+            {
+                "名前": row["player_name"],
+                "ラウンド数": row["rounds"],
+                "オリンピック": row["olympic"],
+                "スペシャル": row["special"],
+                "ヘビ": row["snake"],
+                "収支": row["balance"]
+            }
+            for row in totals
+        ])
+        st.dataframe(totals_df, use_container_width=True, hide_index=True)
+        
+        # 期間全体の収支をまとめて精算
+        st.subheader("💸 まとめて精算")
+        player_names = {row["player_page_id"]: row["player_name"] for row in totals}
+        transfers = settle({row["player_page_id"]: row["balance"] for row in totals})
+        if not transfers:
+            st.info("⚖️ 精算は必要ありません")
+        for transfer in transfers:
+            st.write(f"{player_names[transfer['from']]} → {player_names[transfer['to']]}: {transfer['amount']}点")
+        
+    elif menu == "統計":
+        st.header("📈 統計")
+        
+        users = data.local_users()
+        if not users:
+            st.warning("ユーザーが登録されていません。")
+            return
+        
+        # 更新されたラウンドだけ集計し直す
+        stats = refresh_player_stats(notion)
+        
+        user_options = {user["name"]: user for user in users}
+        selected_user = user_options[st.selectbox("メンバー", list(user_options.keys()))]
+        
+        summaries = stats.player_summary(selected_user["page_id"])
+        if not summaries:
+            st.warning("このメンバーのスコアが記録されていません。")
+            return
+        
+        import pandas as pd
+        
+        # コースごとの成績（平均は18ホール換算、全体の行を先頭に追加）
+        overall = {"place": "全体", "rounds": sum(row["rounds"] for row in summaries)}
+        for column in summaries[0]:
+            if column not in overall:
+                overall[column] = sum(row[column] for row in summaries)
+        
+        summary_rows = []
+        for row in [overall] + summaries:
+            holes = row["holes"] or 1
+            summary_rows.append({
+                "コース": row["place"] or "-",
+                "ラウンド数": row["rounds"],
+                "ホール数": row["holes"],
+                "平均パー±/ホール": round(row["stroke_sum"] / holes, 2),
+                "平均パー±/18H": round(row["stroke_sum"] / holes * 18, 1),
+                "平均パット/18H": round(row["putt_sum"] / holes * 18, 1),
+                "メダル/ラウンド": round(sum(row[column] for column in ("gold", "silver", "bronze", "iron", "diamond")) / row["rounds"], 2),
+                "ヘビ/ラウンド": round(row["snake_sum"] / row["rounds"], 2),
+                "ヘビアウト率": f"{row['snake_outs'] / max(row['holes'] // 3, 1):.0%}",
+                "バーディー": row["birdies"],
+                "イーグル": row["eagles"],
+                "アルバトロス": row["albatrosses"]
+            })
+        st.dataframe(pd.DataFrame(summary_rows), use_container_width=True, hide_index=True)
+        
+        # ラウンドごとの推移
+        rounds = stats.player_rounds(selected_user["page_id"])
+        full_rounds = [row for row in rounds if row["holes"] == 18]
+        if full_rounds:
+            st.subheader("📉 パー±の推移（18ホール完了ラウンド）")
+            trend_df = pd.DataFrame({
+                "プレー日": [row["play_date"] for row in full_rounds],
+                "パー±": [row["stroke_sum"] for row in full_rounds],
+                "パット": [row["putt_sum"] for row in full_rounds]
+            }).set_index("プレー日")
+            st.line_chart(trend_df)
+            
+            # ハンディキャップの目安：直近20ラウンドのうち良い方から8ラウンドの平均パー±
+            recent = sorted(row["stroke_sum"] for row in full_rounds[-20:])
+            best = recent[:8]
+            st.metric("ハンディキャップ目安", f"{sum(best) / len(best):.1f}", help="直近20ラウンドのうち良い方から8ラウンドの平均パー±")
+        
     elif menu == "ユーザー管理":
         st.header("ユーザー管理")
         
         # 既存ユーザー一覧
-        users = notion.get_users()
+        users = data.users()
         if users:
             st.subheader("登録済みユーザー")
             for user in users:
@@ -1672,5 +2272,46 @@ def main():
                             st.success(f"ユーザー '{user_name}' を追加しました！")
                             st.rerun()
 
+def render_metrics_panel():
+    """リクエスト数・受信量と、処理時間のヒストグラム（件数・平均・p50・p95）を表示する"""
+    with st.sidebar.expander("🔧 計測", expanded=True):
+        st.caption(
+            f"Notionリクエスト: {metrics.registry.counter_total('notion_requests_total')}件 / "
+            f"受信: {metrics.registry.counter_total('notion_response_bytes_total') / 1024:.1f}KB"
+        )
+        summary = metrics.registry.histogram_summary()
+        if summary:
+            import pandas as pd
+            summary_df = pd.DataFrame(summary).round({"avg_ms": 1, "p50_ms": 1, "p95_ms": 1})
+            st.dataframe(summary_df, hide_index=True, use_container_width=True)
+        st.download_button(
+            "Prometheus形式でダウンロード",
+            metrics.registry.prometheus_text(),
+            file_name="golf_metrics.prom",
+            mime="text/plain"
+        )
+
+def main():
+    """画面を描画し、メニューごとの処理時間・Notionリクエスト数を記録する"""
+    started = time.perf_counter()
+    request_count = metrics.registry.counter_total("notion_requests_total")
+    response_bytes = metrics.registry.counter_total("notion_response_bytes_total")
+    try:
+        render_page()
+    finally:
+        # st.rerun() / st.stop() で中断された場合も記録する
+        menu = st.session_state.get("menu", "")
+        elapsed = time.perf_counter() - started
+        metrics.registry.observe("menu_render_seconds", elapsed, menu=menu)
+        metrics.log_event(
+            "rerun",
+            menu=menu,
+            seconds=round(elapsed, 4),
+            # 他のセッションやバックグラウンド送信の分も含む概算
+            notion_requests=metrics.registry.counter_total("notion_requests_total") - request_count,
+            response_bytes=metrics.registry.counter_total("notion_response_bytes_total") - response_bytes
+        )
+        metrics.registry.write_prometheus_file()
+
 if __name__ == "__main__":
     main()
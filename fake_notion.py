@@ -0,0 +1,332 @@
+# Notion APIのローカル代替サーバー（メモリ上、ベンチマーク・オフラインでの動作確認用）
+#   python fake_notion.py --port 8765 --latency 0.2 --rate-limit 3
+#   NOTION_API_URL=http://127.0.0.1:8765/v1 streamlit run app.py
+# secrets.toml のデータベースIDは USER_DB_ID / GAME_DB_ID / SCORE_DB_ID（既定: users / games / scores）に合わせる
+import argparse
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+# データベースの種類ごとのプロパティ（名前: 型）。Notionと同じく、未設定のプロパティも空の値で返す
+SCHEMAS = {
+    "users": {
+        "id": "title", "name": "rich_text", "name_display": "rich_text"
+    },
+    "games": {
+        "id": "title", "play_date": "date", "place": "rich_text", "par": "number",
+        "gold": "number", "silver": "number", "bronze": "number", "iron": "number", "diamond": "number",
+        "member1": "relation", "member2": "relation", "member3": "relation", "member4": "relation"
+    },
+    "scores": {
+        "id": "title", "game": "relation", "user": "relation", "hole": "number", "stroke": "number",
+        "putt": "number", "snake": "number", "olympic": "select", "snake_out": "checkbox", "birdie": "checkbox"
+    }
+}
+
+EMPTY_VALUES = {
+    "title": [], "rich_text": [], "number": None, "date": None,
+    "relation": [], "select": None, "checkbox": False
+}
+
+DEFAULT_DATABASES = {"users": "users", "games": "games", "scores": "scores"}
+
+
+def _now():
+    """Notionと同じく分単位に丸めた現在時刻（ISO 8601）"""
+    return datetime.now(timezone.utc).replace(second=0, microsecond=0).strftime("%Y-%m-%dT%H:%M:%S.000Z")
+
+
+def _text(value):
+    """title / rich_text の値を文字列にする"""
+    return "".join(item.get("text", {}).get("content", "") for item in value or [])
+
+
+class FakeNotion:
+    """Notion APIのうちアプリが使う部分（データベースのクエリ・取得、ページの作成・更新）を再現する
+
+    databases: {データベースID: SCHEMASのキー}
+    latency / jitter: 1リクエストごとの待ち時間（秒）
+    rate_limit / burst: 1秒あたりの上限とバースト。超えた分は 429（Retry-After付き）を返す（0で無制限）
+    """
+    def __init__(self, databases=None, latency=0.0, jitter=0.0, rate_limit=0, burst=10):
+        databases = databases or DEFAULT_DATABASES
+        self.schemas = {db_id: SCHEMAS[kind] for db_id, kind in databases.items()}
+        self.latency = latency
+        self.jitter = jitter
+        self.rate_limit = rate_limit
+        self.burst = burst
+        self.pages = {}
+        self.stats = {"requests": 0, "rate_limited": 0}
+        self._lock = threading.Lock()
+        self._tokens = burst
+        self._updated = time.monotonic()
+        self._server = None
+
+    # ---------- サーバー ----------
+
+    def start(self, host="127.0.0.1", port=0):
+        """別スレッドでHTTPサーバーを起動し、APIのベースURLを返す"""
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                fake._handle(self, "GET")
+
+            def do_POST(self):
+                fake._handle(self, "POST")
+
+            def do_PATCH(self):
+                fake._handle(self, "PATCH")
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, name="fake-notion", daemon=True).start()
+        return f"http://{host}:{self._server.server_address[1]}/v1"
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+
+    def _handle(self, handler, method):
+        """1リクエストを処理してレスポンスを書き込む"""
+        length = int(handler.headers.get("Content-Length") or 0)
+        body = json.loads(handler.rfile.read(length) or b"{}") if length else {}
+        url = urlparse(handler.path)
+
+        with self._lock:
+            self.stats["requests"] += 1
+        if self.latency or self.jitter:
+            time.sleep(self.latency + random.uniform(0, self.jitter))
+
+        if not self._take_token():
+            with self._lock:
+                self.stats["rate_limited"] += 1
+            self._respond(handler, 429, {"code": "rate_limited", "message": "Rate limited"}, {"Retry-After": "1"})
+            return
+
+        try:
+            status, result = self.dispatch(method, url.path, body, parse_qs(url.query))
+        except (KeyError, ValueError) as e:
+            status, result = 400, {"code": "validation_error", "message": str(e)}
+        self._respond(handler, status, result)
+
+    def _respond(self, handler, status, result, headers=None):
+        if status != 200:
+            result = {"object": "error", "status": status, **result}
+        data = json.dumps(result, ensure_ascii=False).encode()
+        handler.send_response(status)
+        handler.send_header("Content-Type", "application/json")
+        handler.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            handler.send_header(name, value)
+        handler.end_headers()
+        handler.wfile.write(data)
+
+    def _take_token(self):
+        """トークンバケットでレート制限を判定する"""
+        if not self.rate_limit:
+            return True
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate_limit)
+            self._updated = now
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            return True
+
+    # ---------- API ----------
+
+    def dispatch(self, method, path, body, query=None):
+        """パスとメソッドに応じてAPIを処理し、(ステータス, レスポンス) を返す"""
+        match = re.fullmatch(r"/v1/databases/([^/]+)/query", path)
+        if match and method == "POST":
+            return self.query(match.group(1), body, (query or {}).get("filter_properties"))
+        match = re.fullmatch(r"/v1/databases/([^/]+)", path)
+        if match and method == "GET":
+            return self.retrieve_database(match.group(1))
+        if path == "/v1/pages" and method == "POST":
+            return 200, self.create_page(body["parent"]["database_id"], body.get("properties", {}))
+        match = re.fullmatch(r"/v1/pages/([^/]+)", path)
+        if match and method == "PATCH":
+            return self.update_page(match.group(1), body.get("properties", {}))
+        if match and method == "GET":
+            page = self.pages.get(match.group(1))
+            return (200, page) if page else (404, {"code": "object_not_found", "message": "Page not found"})
+        return 404, {"code": "invalid_request_url", "message": f"{method} {path}"}
+
+    def _schema(self, db_id):
+        schema = self.schemas.get(db_id) or self.schemas.get(db_id.replace("-", ""))
+        if schema is None:
+            raise KeyError(f"Database {db_id} not found")
+        return schema
+
+    def retrieve_database(self, db_id):
+        schema = self._schema(db_id)
+        properties = {
+            name: {"id": f"p{i}", "name": name, "type": kind}
+            for i, (name, kind) in enumerate(schema.items())
+        }
+        return 200, {"object": "database", "id": db_id, "properties": properties}
+
+    def create_page(self, db_id, properties):
+        schema = self._schema(db_id)
+        now = _now()
+        page = {
+            "object": "page",
+            "id": str(uuid.uuid4()),
+            "parent": {"type": "database_id", "database_id": db_id},
+            "created_time": now,
+            "last_edited_time": now,
+            "archived": False,
+            "properties": {
+                name: {"type": kind, kind: EMPTY_VALUES[kind]} for name, kind in schema.items()
+            }
+        }
+        self._apply(page, properties)
+        with self._lock:
+            self.pages[page["id"]] = page
+        return page
+
+    def update_page(self, page_id, properties):
+        with self._lock:
+            page = self.pages.get(page_id)
+            if page is None:
+                return 404, {"code": "object_not_found", "message": "Page not found"}
+            self._apply(page, properties)
+            page["last_edited_time"] = _now()
+        return 200, page
+
+    def _apply(self, page, properties):
+        for name, value in properties.items():
+            if name not in page["properties"]:
+                raise ValueError(f"{name} is not a property that exists")
+            kind = page["properties"][name]["type"]
+            if kind == "date" and value.get("date") is not None and not value["date"].get("start"):
+                # Notionと同じく、空の日付は {"date": None} でしか指定できない
+                raise ValueError(f"body.properties.{name}.date.start should be defined")
+            page["properties"][name] = {"type": kind, kind: json.loads(json.dumps(value.get(kind)))}
+
+    def query(self, db_id, body, filter_property_ids=None):
+        self._schema(db_id)
+        parent_ids = {db_id, db_id.replace("-", "")}
+        with self._lock:
+            pages = [
+                page for page in self.pages.values()
+                if page["parent"]["database_id"] in parent_ids and self._matches(page, body.get("filter"))
+            ]
+        for sort in reversed(body.get("sorts") or []):
+            pages.sort(key=lambda page: self._sort_key(page, sort), reverse=sort.get("direction") == "descending")
+
+        start = int(body.get("start_cursor") or 0)
+        page_size = min(int(body.get("page_size") or 100), 100)
+        results = pages[start:start + page_size]
+        has_more = start + page_size < len(pages)
+
+        if filter_property_ids:
+            # filter_properties はプロパティIDで指定される
+            _, database = self.retrieve_database(db_id)
+            names = {prop["name"] for prop in database["properties"].values() if prop["id"] in filter_property_ids}
+            results = [
+                {**page, "properties": {name: value for name, value in page["properties"].items() if name in names}}
+                for page in results
+            ]
+        return 200, {
+            "object": "list",
+            "results": results,
+            "has_more": has_more,
+            "next_cursor": str(start + page_size) if has_more else None
+        }
+
+    def _value(self, page, name):
+        prop = page["properties"].get(name, {})
+        return prop.get(prop.get("type"))
+
+    def _sort_key(self, page, sort):
+        if "timestamp" in sort:
+            return page[sort["timestamp"]]
+        value = self._value(page, sort["property"])
+        kind = page["properties"].get(sort["property"], {}).get("type")
+        if kind in ("title", "rich_text"):
+            return _text(value)
+        if kind == "date":
+            return (value or {}).get("start") or ""
+        if kind == "number":
+            return value if value is not None else float("-inf")
+        return str(value)
+
+    def _matches(self, page, condition):
+        """クエリのフィルター（and / or と、アプリが使う条件）を判定する"""
+        if not condition:
+            return True
+        if "and" in condition:
+            return all(self._matches(page, item) for item in condition["and"])
+        if "or" in condition:
+            return any(self._matches(page, item) for item in condition["or"])
+        if "timestamp" in condition:
+            return self._compare_date(page[condition["timestamp"]], condition[condition["timestamp"]])
+
+        value = self._value(page, condition["property"])
+        if "title" in condition or "rich_text" in condition:
+            spec = condition.get("title") or condition.get("rich_text")
+            text = _text(value)
+            if "equals" in spec:
+                return text == spec["equals"]
+            if "starts_with" in spec:
+                return text.startswith(spec["starts_with"])
+            if "contains" in spec:
+                return spec["contains"].lower() in text.lower()
+        if "relation" in condition:
+            target = condition["relation"]["contains"].replace("-", "")
+            return any(item["id"].replace("-", "") == target for item in value or [])
+        if "number" in condition:
+            return value == condition["number"]["equals"]
+        if "checkbox" in condition:
+            return value == condition["checkbox"]["equals"]
+        if "select" in condition:
+            return (value or {}).get("name") == condition["select"]["equals"]
+        if "date" in condition:
+            return self._compare_date((value or {}).get("start"), condition["date"])
+        raise ValueError(f"Unsupported filter: {condition}")
+
+    def _compare_date(self, value, spec):
+        if not value:
+            return False
+        if "on_or_after" in spec and value < spec["on_or_after"]:
+            return False
+        if "on_or_before" in spec and value[:len(spec["on_or_before"])] > spec["on_or_before"]:
+            return False
+        return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Notion APIのローカル代替サーバー")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="1リクエストごとの待ち時間（秒）")
+    parser.add_argument("--jitter", type=float, default=0.0, help="待ち時間に加えるランダムな揺らぎの上限（秒）")
+    parser.add_argument("--rate-limit", type=float, default=0, help="1秒あたりのリクエスト上限（0で無制限）")
+    parser.add_argument("--burst", type=int, default=10)
+    args = parser.parse_args()
+
+    fake = FakeNotion(latency=args.latency, jitter=args.jitter, rate_limit=args.rate_limit, burst=args.burst)
+    print(f"Fake Notion API: {fake.start(args.host, args.port)}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        fake.stop()
+
+
+if __name__ == "__main__":
+    main()
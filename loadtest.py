@@ -0,0 +1,135 @@
+# ローカルのNotion代替サーバー（fake_notion.py）に対して、アプリの一連の操作を
+# streamlit.testing.v1.AppTest で実行し、操作ごとの処理時間を計測する
+#   python loadtest.py --rounds 3 --latency 0.1 --rate-limit 3
+# 流れ: ユーザー登録 → ラウンド記録 → 18ホールのスコア入力 → 計算シート
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+from streamlit.testing.v1 import AppTest
+
+from fake_notion import FakeNotion
+
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "app.py")
+DATABASES = {"loadtest-users": "users", "loadtest-games": "games", "loadtest-scores": "scores"}
+SECRETS = {
+    "api_key": "loadtest",
+    "user_db_id": "loadtest-users",
+    "game_db_id": "loadtest-games",
+    "score_db_id": "loadtest-scores"
+}
+MEMBER_COUNT = 4
+
+
+class LoadTest:
+    """AppTestでアプリを操作し、操作の種類ごとに処理時間を記録する"""
+    def __init__(self, timeout):
+        self.timings = {}
+        self.at = AppTest.from_file(APP_PATH, default_timeout=timeout)
+        self.at.secrets["notion"] = SECRETS
+
+    def step(self, name, action):
+        """操作を1つ実行して時間を記録し、アプリで例外が出ていれば中断する"""
+        started = time.perf_counter()
+        action()
+        self.timings.setdefault(name, []).append(time.perf_counter() - started)
+        if self.at.exception:
+            raise RuntimeError(f"{name}: {self.at.exception[0].value}")
+
+    def select_menu(self, menu):
+        self.step(f"menu:{menu}", lambda: self.at.sidebar.selectbox(key="menu").select(menu).run())
+
+    def button(self, label):
+        return next(button for button in self.at.button if button.label == label)
+
+    def register_users(self):
+        self.select_menu("ユーザー管理")
+        for i in range(1, MEMBER_COUNT + 1):
+            self.at.text_input[0].input(f"player{i}")
+            self.at.text_input[1].input(f"プレーヤー{i}")
+            self.at.text_input[2].input(f"P{i}")
+            self.step("create_user", lambda: self.button("ユーザーを追加").click().run())
+
+    def record_round(self, round_number):
+        self.select_menu("ラウンド記録")
+        self.at.text_input[0].input(f"テストコース{round_number}")
+        for i in range(MEMBER_COUNT):
+            self.at.selectbox(key=f"member_{i}").select_index(i + 1)
+        self.step("create_round", lambda: self.button("ラウンドを記録").click().run())
+
+    def enter_scores(self):
+        self.select_menu("スコア入力")
+        # 最新のラウンド（記録したばかりのラウンド）を選択
+        self.step("select_round", lambda: self.at.sidebar.selectbox(key="sidebar_game_select").select_index(1).run())
+
+        for hole in range(1, 19):
+            for prefix, value in (("stroke", lambda: random.choice([-1, 0, 0, 1, 2])),
+                                  ("putt", lambda: random.choice([1, 2, 2, 3])),
+                                  ("snake", lambda: random.choice([0, 0, 1]))):
+                for number_input in self.at.number_input:
+                    if number_input.key and number_input.key.startswith(f"{prefix}_") and number_input.key.endswith(f"_{hole}"):
+                        number_input.set_value(value())
+            if hole % 3 == 0:
+                snake_outs = [box for box in self.at.checkbox if box.key and box.key.endswith(f"_{hole}")]
+                if snake_outs:
+                    random.choice(snake_outs).check()
+
+            label = "次のホール" if hole < 18 else "保存"
+            self.step("save_hole", lambda: self.button(label).click().run())
+
+    def calc_sheet(self):
+        self.select_menu("計算シート")
+
+    def report(self, fake, elapsed):
+        print(f"\n合計 {elapsed:.1f}秒 / Notionリクエスト {fake.stats['requests']}件（429: {fake.stats['rate_limited']}件）")
+        print(f"{'操作':<24}{'回数':>6}{'平均(ms)':>12}{'p50(ms)':>12}{'p95(ms)':>12}")
+        for name, values in sorted(self.timings.items()):
+            values = sorted(values)
+            p95 = values[min(len(values) - 1, int(len(values) * 0.95))]
+            print(
+                f"{name:<24}{len(values):>6}{statistics.mean(values) * 1000:>12.1f}"
+                f"{statistics.median(values) * 1000:>12.1f}{p95 * 1000:>12.1f}"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ローカルのNotion代替サーバーを使った負荷テスト")
+    parser.add_argument("--rounds", type=int, default=1, help="記録・入力するラウンド数")
+    parser.add_argument("--latency", type=float, default=0.05, help="代替サーバーの1リクエストごとの待ち時間（秒）")
+    parser.add_argument("--jitter", type=float, default=0.02)
+    parser.add_argument("--rate-limit", type=float, default=3, help="代替サーバーの1秒あたりのリクエスト上限（0で無制限）")
+    parser.add_argument("--timeout", type=float, default=120, help="1回の再実行のタイムアウト（秒）")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    fake = FakeNotion(DATABASES, latency=args.latency, jitter=args.jitter, rate_limit=args.rate_limit)
+    os.environ["NOTION_API_URL"] = fake.start()
+    # ローカルデータ（複製・待ち行列など）は本番用と分けて一時ディレクトリに作る
+    local_dir = tempfile.mkdtemp(prefix="golf_loadtest_")
+    os.environ["GOLF_LOCAL_DB"] = os.path.join(local_dir, "golf_local.db")
+    
+    started = time.perf_counter()
+    load_test = LoadTest(args.timeout)
+    try:
+        load_test.step("startup", load_test.at.run)
+        load_test.register_users()
+        for round_number in range(1, args.rounds + 1):
+            load_test.record_round(round_number)
+            load_test.enter_scores()
+            load_test.calc_sheet()
+    except RuntimeError as e:
+        print(f"エラー: {e}", file=sys.stderr)
+        return 1
+    finally:
+        fake.stop()
+    load_test.report(fake, time.perf_counter() - started)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
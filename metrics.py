@@ -0,0 +1,153 @@
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# レイテンシのヒストグラムのバケット（秒、Prometheusの既定値にJSON変換などの1ms未満の区間を追加）
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# 構造化ログ（JSON 1行）を標準エラーに出すかどうかと、Prometheus形式のテキストの書き出し先
+METRICS_LOG = os.environ.get("GOLF_METRICS_LOG") == "1"
+METRICS_PROM_PATH = os.environ.get("GOLF_METRICS_PROM_PATH")
+
+logger = logging.getLogger("golf_metrics")
+if METRICS_LOG and not logger.handlers:
+    logger.addHandler(logging.StreamHandler())
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+
+class Histogram:
+    """累積バケット方式のヒストグラム"""
+    __slots__ = ("buckets", "counts", "count", "total")
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, value):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        self.count += 1
+        self.total += value
+
+    def quantile(self, q):
+        """バケットから分位点を推定する（バケット内は線形補間、最後のバケットを超えた場合は上限値）"""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        cumulative = 0
+        lower = 0.0
+        for bound, bucket_count in zip(self.buckets, self.counts):
+            if bucket_count and cumulative + bucket_count >= rank:
+                return lower + (bound - lower) * (rank - cumulative) / bucket_count
+            cumulative += bucket_count
+            lower = bound
+        return self.buckets[-1]
+
+
+class MetricsRegistry:
+    """カウンターとヒストグラムをラベルごとに集計する（スレッドセーフ）"""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._histograms = {}
+
+    def inc(self, name, value=1, **labels):
+        """カウンターを加算する"""
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name, value, **labels):
+        """ヒストグラムに値を記録する"""
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram()
+            histogram.observe(value)
+
+    @contextmanager
+    def timer(self, name, **labels):
+        """with文の中の処理時間（秒）をヒストグラムに記録する"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started, **labels)
+
+    def counter_total(self, name):
+        """カウンターのラベルを問わない合計"""
+        with self._lock:
+            return sum(value for (counter_name, _), value in self._counters.items() if counter_name == name)
+
+    def histogram_summary(self):
+        """ヒストグラムごとの件数・平均・p50・p95（表示用のdictのリスト）"""
+        with self._lock:
+            items = sorted(self._histograms.items())
+            return [
+                {
+                    "name": name,
+                    "labels": ", ".join(f"{key}={value}" for key, value in labels),
+                    "count": histogram.count,
+                    "avg_ms": histogram.total / histogram.count * 1000 if histogram.count else 0.0,
+                    "p50_ms": histogram.quantile(0.5) * 1000,
+                    "p95_ms": histogram.quantile(0.95) * 1000
+                }
+                for (name, labels), histogram in items
+            ]
+
+    def prometheus_text(self):
+        """Prometheusのテキスト形式で出力する"""
+        def format_labels(labels, extra=()):
+            pairs = list(labels) + list(extra)
+            if not pairs:
+                return ""
+            return "{" + ",".join(f'{key}="{str(value).replace(chr(34), chr(39))}"' for key, value in pairs) + "}"
+
+        lines = []
+        with self._lock:
+            for name in sorted({name for name, _ in self._counters}):
+                lines.append(f"# TYPE {name} counter")
+                for (counter_name, labels), value in sorted(self._counters.items()):
+                    if counter_name == name:
+                        lines.append(f"{name}{format_labels(labels)} {value}")
+            for name in sorted({name for name, _ in self._histograms}):
+                lines.append(f"# TYPE {name} histogram")
+                for (histogram_name, labels), histogram in sorted(self._histograms.items()):
+                    if histogram_name != name:
+                        continue
+                    cumulative = 0
+                    for bound, bucket_count in zip(histogram.buckets, histogram.counts):
+                        cumulative += bucket_count
+                        lines.append(f"{name}_bucket{format_labels(labels, [('le', bound)])} {cumulative}")
+                    lines.append(f"{name}_bucket{format_labels(labels, [('le', '+Inf')])} {histogram.count}")
+                    lines.append(f"{name}_sum{format_labels(labels)} {histogram.total}")
+                    lines.append(f"{name}_count{format_labels(labels)} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus_file(self, path=METRICS_PROM_PATH):
+        """Prometheusのテキストをファイルに書き出す（node_exporterのtextfile collector向け、path未設定なら何もしない）"""
+        if not path:
+            return
+        temp_path = f"{path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            f.write(self.prometheus_text())
+        os.replace(temp_path, path)
+
+
+def log_event(event, **fields):
+    """構造化ログを1行のJSONで出力する（GOLF_METRICS_LOG=1 のときのみ）"""
+    if METRICS_LOG:
+        logger.info(json.dumps({"event": event, "ts": time.time(), **fields}, ensure_ascii=False))
+
+
+# プロセス全体で共有する集計
+registry = MetricsRegistry()
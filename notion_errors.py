@@ -0,0 +1,6 @@
+# Notionクライアントの例外（app.py は再実行のたびに読み直されるため、
+# キャッシュされたクライアントと画面側で同じクラスを参照できるよう別モジュールに置く）
+
+
+class NotionQueryError(Exception):
+    """クエリの途中で取得に失敗した（raise_on_error=True のときに送出、エラーは表示済み）"""
@@ -0,0 +1,165 @@
+import json
+import sqlite3
+import threading
+import time
+
+from notion_errors import NotionQueryError
+
+# 差分同期の最短間隔（秒）。書き込みがあった場合は間隔に関係なく次の読み込みで同期する
+SYNC_INTERVAL = 10
+
+
+def normalize_id(notion_id):
+    """NotionのIDをハイフンなしの形式に揃える"""
+    return notion_id.replace("-", "") if notion_id else notion_id
+
+
+class NotionMirror:
+    """Notionデータベースのローカル複製（SQLite）
+
+    last_edited_time を基準に差分同期する。Notion側で削除（アーカイブ）されたページは
+    差分同期では検出できないため、full=True の再同期で反映する
+    """
+    def __init__(self, path, sync_interval=SYNC_INTERVAL):
+        self.path = path
+        self.sync_interval = sync_interval
+        self._lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+        self._stale = set()
+        self._all_stale = False
+        self._last_synced = {}
+
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS mirror_pages (
+                page_id TEXT PRIMARY KEY,
+                db_id TEXT NOT NULL,
+                title TEXT,
+                game_relation TEXT,
+                last_edited_time TEXT,
+                data TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_mirror_pages_db_game ON mirror_pages (db_id, game_relation);
+            CREATE INDEX IF NOT EXISTS idx_mirror_pages_db_title ON mirror_pages (db_id, title);
+            CREATE INDEX IF NOT EXISTS idx_mirror_pages_db_edited ON mirror_pages (db_id, last_edited_time);
+            CREATE TABLE IF NOT EXISTS mirror_sync_state (
+                db_id TEXT PRIMARY KEY,
+                watermark TEXT
+            );
+        """)
+        self._conn.commit()
+
+    def mark_stale(self, db_id=None):
+        """次の読み込みで同期が必要であることを記録する（db_id=Noneなら全データベース）"""
+        with self._lock:
+            if db_id is None:
+                self._all_stale = True
+            else:
+                self._stale.add(normalize_id(db_id))
+
+    def maybe_sync(self, client, db_id):
+        """書き込みがあったか、前回の同期から一定時間経っていれば差分同期する"""
+        key = normalize_id(db_id)
+        with self._lock:
+            is_stale = self._all_stale or key in self._stale
+            is_expired = time.monotonic() - self._last_synced.get(key, 0) >= self.sync_interval
+        if is_stale or is_expired:
+            self.sync(client, db_id)
+
+    def sync(self, client, db_id, full=False):
+        """Notionから変更されたページを取得して複製に反映し、取得件数を返す（取得に失敗した場合はNone）
+
+        full=True の場合はウォーターマークを使わず、複製を作り直す
+        """
+        key = normalize_id(db_id)
+        with self._sync_lock:
+            with self._lock:
+                row = self._conn.execute(
+                    "SELECT watermark FROM mirror_sync_state WHERE db_id = ?", (key,)
+                ).fetchone()
+                # 同期中の書き込みを取りこぼさないよう、取得前にフラグを下ろす
+                self._stale.discard(key)
+                if self._all_stale:
+                    self._all_stale = False
+                    self._stale.update(
+                        state_key for (state_key,) in self._conn.execute("SELECT db_id FROM mirror_sync_state")
+                    )
+                    self._stale.discard(key)
+            watermark = None if full or not row else row[0]
+
+            filter_dict = None
+            if watermark:
+                # last_edited_time は分単位に丸められるため、同じ時刻のページも取り直す
+                filter_dict = {"timestamp": "last_edited_time", "last_edited_time": {"on_or_after": watermark}}
+            sorts = [{"timestamp": "last_edited_time", "direction": "ascending"}]
+
+            records = []
+            new_watermark = watermark
+            failed = False
+            try:
+                for page in client.iter_query(db_id, filter_dict, sorts, raise_on_error=True):
+                    records.append(self._to_record(key, page))
+                    edited = page.get("last_edited_time")
+                    if edited and (new_watermark is None or edited > new_watermark):
+                        new_watermark = edited
+            except NotionQueryError:
+                failed = True
+
+            with self._lock:
+                if full and not failed:
+                    self._conn.execute("DELETE FROM mirror_pages WHERE db_id = ?", (key,))
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO mirror_pages (page_id, db_id, title, game_relation, last_edited_time, data) VALUES (?, ?, ?, ?, ?, ?)",
+                    records
+                )
+                # 取得に失敗した場合はウォーターマークを進めず、次回取り直す
+                if not failed:
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO mirror_sync_state (db_id, watermark) VALUES (?, ?)",
+                        (key, new_watermark)
+                    )
+                    self._last_synced[key] = time.monotonic()
+                else:
+                    self._stale.add(key)
+                self._conn.commit()
+        return None if failed else len(records)
+
+    def pages(self, db_id, game_relation=None, title_prefix=None, edited_since=None):
+        """複製からページを取得する
+
+        game_relation / title_prefix を両方指定した場合はどちらかに一致するページを返す。
+        edited_since を指定した場合は、その時刻以降に更新されたページに絞り込む
+        """
+        query = "SELECT data FROM mirror_pages WHERE db_id = ?"
+        params = [normalize_id(db_id)]
+        if edited_since:
+            query += " AND last_edited_time >= ?"
+            params.append(edited_since)
+        conditions = []
+        if game_relation:
+            conditions.append("game_relation = ?")
+            params.append(game_relation)
+        if title_prefix:
+            conditions.append("substr(title, 1, ?) = ?")
+            params.extend([len(title_prefix), title_prefix])
+        if conditions:
+            query += " AND (" + " OR ".join(conditions) + ")"
+
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        return [json.loads(data) for (data,) in rows]
+
+    def _to_record(self, db_key, page):
+        """ページを保存用の行に変換する"""
+        properties = page.get("properties", {})
+        title = properties.get("id", {}).get("title") or []
+        relation = properties.get("game", {}).get("relation") or []
+        return (
+            page["id"],
+            db_key,
+            title[0]["text"]["content"] if title else "",
+            relation[0]["id"] if relation else None,
+            page.get("last_edited_time"),
+            json.dumps(page, ensure_ascii=False)
+        )
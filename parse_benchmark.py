@@ -0,0 +1,159 @@
+# Notionのスコアページの変換（parse_score_page）について、変更前のdictを作る変換と
+# records.py のScore（__slots__）への変換の処理時間・メモリ使用量を比較する
+#   python parse_benchmark.py --pages 10000 --repeat 5
+# ページはNotion APIの応答と同じ形（plain_text・annotationsなどを含む）で生成し、Notionには接続しない
+import argparse
+import gc
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+
+from records import parse_score_page
+
+OLYMPIC_MEDALS = ["金", "銀", "銅", "鉄", "ダイヤモンド"]
+
+
+def legacy_parse_score_page(page):
+    """変更前（records.py 導入前）のdictへの変換
+
+    元の get_scores の変換に、filter_properties で省かれたプロパティを既定値にする .get を加えたもの
+    """
+    properties = page["properties"]
+    score_id = properties["id"]["title"][0]["text"]["content"] if properties.get("id", {}).get("title") else ""
+    hole = properties["hole"]["number"] if properties.get("hole", {}).get("number") else 0
+    stroke = properties["stroke"]["number"] if properties.get("stroke", {}).get("number") else 0
+    putt = properties["putt"]["number"] if properties.get("putt", {}).get("number") else 0
+    snake = properties["snake"]["number"] if properties.get("snake", {}).get("number") else 0
+    olympic = properties["olympic"]["select"]["name"] if properties.get("olympic", {}).get("select") else ""
+    snake_out = properties["snake_out"]["checkbox"] if properties.get("snake_out") else False
+    birdie = properties["birdie"]["checkbox"] if properties.get("birdie") else False
+
+    # ゲームとユーザーのリレーション
+    game_relation = properties["game"]["relation"][0]["id"] if properties.get("game", {}).get("relation") else ""
+    user_relation = properties["user"]["relation"][0]["id"] if properties.get("user", {}).get("relation") else ""
+
+    return {
+        "id": score_id,
+        "hole": hole,
+        "stroke": stroke,
+        "putt": putt,
+        "snake": snake,
+        "olympic": olympic,
+        "snake_out": snake_out,
+        "birdie": birdie,
+        "game_relation": game_relation,
+        "user_relation": user_relation,
+        "page_id": page["id"]
+    }
+
+
+def _title(value):
+    return {
+        "id": "title",
+        "type": "title",
+        "title": [{
+            "type": "text",
+            "text": {"content": value, "link": None},
+            "annotations": {"bold": False, "italic": False, "strikethrough": False,
+                            "underline": False, "code": False, "color": "default"},
+            "plain_text": value,
+            "href": None
+        }]
+    }
+
+
+def _number(property_id, value):
+    return {"id": property_id, "type": "number", "number": value}
+
+
+def _relation(property_id, page_id):
+    return {"id": property_id, "type": "relation", "relation": [{"id": page_id}], "has_more": False}
+
+
+def synthetic_score_pages(count, seed=0):
+    """4人×18ホールのラウンドを繰り返した、Notion APIと同じ形のスコアページ"""
+    rng = random.Random(seed)
+    pages = []
+    for i in range(count):
+        round_number, rest = divmod(i, 72)
+        member_index, hole = divmod(rest, 18)
+        hole += 1
+        game_id = f"2026{round_number:08d}"
+        olympic = rng.choice(OLYMPIC_MEDALS) if rng.random() < 0.3 else None
+        pages.append({
+            "object": "page",
+            "id": f"score-{i:08d}",
+            "created_time": "2026-01-01T00:00:00.000Z",
+            "last_edited_time": "2026-01-01T00:00:00.000Z",
+            "archived": False,
+            "parent": {"type": "database_id", "database_id": "scores"},
+            "properties": {
+                "id": _title(f"{game_id}_{member_index + 1}_{hole}"),
+                "game": _relation("g%3Ab", f"game-{round_number:06d}"),
+                "user": _relation("u%3Ac", f"user-{member_index}"),
+                "hole": _number("h%3Ad", hole),
+                "stroke": _number("s%3Ae", rng.choice([-1, 0, 0, 1, 2])),
+                "putt": _number("p%3Af", rng.choice([1, 2, 2, 3])),
+                "snake": _number("n%3Ag", rng.choice([0, 0, 1])),
+                "olympic": {"id": "o%3Ah", "type": "select",
+                            "select": {"id": "medal", "name": olympic, "color": "yellow"} if olympic else None},
+                "snake_out": {"id": "x%3Ai", "type": "checkbox", "checkbox": hole % 3 == 0 and member_index == 0},
+                "birdie": {"id": "b%3Aj", "type": "checkbox", "checkbox": False}
+            },
+            "url": f"https://www.notion.so/score-{i:08d}"
+        })
+    return pages
+
+
+def measure_cpu(parser, pages, repeat):
+    """全ページの変換にかかった時間（秒）の中央値"""
+    runs = []
+    for _ in range(repeat):
+        gc.collect()
+        started = time.perf_counter()
+        for page in pages:
+            parser(page)
+        runs.append(time.perf_counter() - started)
+    return statistics.median(runs)
+
+
+def measure_memory(parser, pages):
+    """変換結果を保持したときのメモリ使用量と、変換中のピーク（バイト）"""
+    gc.collect()
+    tracemalloc.start()
+    parsed = [parser(page) for page in pages]
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del parsed
+    return retained, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description="スコアページの変換の処理時間・メモリ使用量を比較する")
+    parser.add_argument("--pages", type=int, default=10000, help="生成するスコアページの件数")
+    parser.add_argument("--repeat", type=int, default=5, help="処理時間を計測する回数（中央値を表示）")
+    args = parser.parse_args()
+
+    pages = synthetic_score_pages(args.pages)
+    # 同じページから同じ値が得られることを先に確認する
+    for page in pages:
+        if dict(parse_score_page(page)) != legacy_parse_score_page(page):
+            print(f"エラー: {page['id']} の変換結果が変更前と一致しません", file=sys.stderr)
+            return 1
+
+    print(f"スコアページ {args.pages}件")
+    print(f"{'変換':<14}{'時間(ms)':>12}{'1件(µs)':>10}{'保持(KiB)':>12}{'ピーク(KiB)':>13}")
+    for name, parse in (("変更前(dict)", legacy_parse_score_page), ("Score", parse_score_page)):
+        seconds = measure_cpu(parse, pages, args.repeat)
+        retained, peak = measure_memory(parse, pages)
+        print(
+            f"{name:<14}{seconds * 1000:>12.1f}{seconds / args.pages * 1e6:>10.2f}"
+            f"{retained / 1024:>12.1f}{peak / 1024:>13.1f}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,148 @@
+import hashlib
+import json
+import sqlite3
+import threading
+
+from scoreboard import OLYMPIC_MEDALS
+
+# ラウンド×メンバーごとに集計する列
+STAT_COLUMNS = (
+    "holes", "stroke_sum", "putt_sum", "snake_sum", "snake_outs",
+    "gold", "silver", "bronze", "iron", "diamond",
+    "birdies", "eagles", "albatrosses"
+)
+
+_MEDAL_COLUMNS = dict(zip(OLYMPIC_MEDALS, ("gold", "silver", "bronze", "iron", "diamond")))
+
+
+def page_digest(page):
+    """ページの内容のハッシュ（最終更新時刻が同じページの内容が変わったかを判定する）"""
+    return hashlib.sha1(json.dumps(page, sort_keys=True, ensure_ascii=False).encode()).hexdigest()
+
+
+def round_player_stats(scores):
+    """1ラウンド分のスコアをメンバー（user_relation）ごとに集計する"""
+    stats = {}
+    for score in scores:
+        if not score["user_relation"] or not score["hole"]:
+            continue
+        row = stats.setdefault(score["user_relation"], dict.fromkeys(STAT_COLUMNS, 0))
+        row["holes"] += 1
+        row["stroke_sum"] += score["stroke"]
+        row["putt_sum"] += score["putt"]
+        row["snake_sum"] += score["snake"]
+        row["snake_outs"] += 1 if score["snake_out"] else 0
+        if score["olympic"] in _MEDAL_COLUMNS:
+            row[_MEDAL_COLUMNS[score["olympic"]]] += 1
+        if score["stroke"] == -1:
+            row["birdies"] += 1
+        elif score["stroke"] == -2:
+            row["eagles"] += 1
+        elif score["stroke"] <= -3:
+            row["albatrosses"] += 1
+    return stats
+
+
+class PlayerStats:
+    """メンバーごとの成績集計（SQLite）
+
+    スコアページを毎回読み直さないよう、ラウンド×メンバー単位の集計行を保存しておく。
+    スコアが更新されたラウンドだけを集計し直し、どこまで反映したかを watermark に記録する。
+    last_edited_time は分単位に丸められるため、watermark と同じ時刻に更新されたページは
+    反映した内容のハッシュも記録し、内容が変わっていなければ次回は集計し直さない
+    """
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        columns = ",\n".join(f"                {column} INTEGER NOT NULL" for column in STAT_COLUMNS)
+        self._conn.executescript(f"""
+            CREATE TABLE IF NOT EXISTS round_player_stats (
+                game_page_id TEXT NOT NULL,
+                player_page_id TEXT NOT NULL,
+                place TEXT,
+                play_date TEXT,
+{columns},
+                PRIMARY KEY (game_page_id, player_page_id)
+            );
+            CREATE INDEX IF NOT EXISTS idx_round_player_stats_player ON round_player_stats (player_page_id, place);
+            CREATE TABLE IF NOT EXISTS stats_state (
+                key TEXT PRIMARY KEY,
+                value TEXT
+            );
+        """)
+        self._conn.commit()
+
+    def _state(self, key, default=None):
+        row = self._conn.execute("SELECT value FROM stats_state WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else default
+
+    def watermark(self):
+        """集計に反映済みのページの最終更新時刻（未集計ならNone）"""
+        with self._lock:
+            return self._state("watermark")
+
+    def unprocessed(self, pages):
+        """watermark 以降に更新されたページのうち、まだ集計に反映していないものを返す"""
+        with self._lock:
+            watermark = self._state("watermark")
+            processed = json.loads(self._state("watermark_pages", "{}"))
+        return [
+            page for page in pages
+            if not watermark or (page.get("last_edited_time") or "") > watermark or (
+                page.get("last_edited_time") == watermark and processed.get(page["id"]) != page_digest(page)
+            )
+        ]
+
+    def refresh_rounds(self, rounds, pages):
+        """ラウンドの集計行を作り直し、反映したページ（pages）の最終更新時刻まで watermark を進める
+
+        rounds: (ラウンド, そのラウンドの全スコア) のリスト
+        """
+        with self._lock:
+            watermark = self._state("watermark")
+            processed = json.loads(self._state("watermark_pages", "{}"))
+            new_watermark = max([page["last_edited_time"] for page in pages if page.get("last_edited_time")], default=watermark)
+            if new_watermark != watermark:
+                processed = {}
+            processed.update({page["id"]: page_digest(page) for page in pages if page.get("last_edited_time") == new_watermark})
+
+            for game, scores in rounds:
+                self._conn.execute("DELETE FROM round_player_stats WHERE game_page_id = ?", (game["page_id"],))
+                for player_page_id, row in round_player_stats(scores).items():
+                    self._conn.execute(
+                        f"""INSERT INTO round_player_stats (game_page_id, player_page_id, place, play_date, {", ".join(STAT_COLUMNS)})
+                            VALUES (?, ?, ?, ?, {", ".join("?" for _ in STAT_COLUMNS)})""",
+                        [game["page_id"], player_page_id, game["place"], game["play_date"]] + [row[column] for column in STAT_COLUMNS]
+                    )
+            if new_watermark:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO stats_state (key, value) VALUES (?, ?)",
+                    [("watermark", new_watermark), ("watermark_pages", json.dumps(processed))]
+                )
+            self._conn.commit()
+
+    def player_summary(self, player_page_id):
+        """メンバーのコースごとの成績（ラウンド数・ホール数と各合計）"""
+        sums = ", ".join(f"SUM({column})" for column in STAT_COLUMNS)
+        with self._lock:
+            rows = self._conn.execute(
+                f"""SELECT place, COUNT(*), {sums} FROM round_player_stats
+                    WHERE player_page_id = ? GROUP BY place ORDER BY COUNT(*) DESC, place""",
+                (player_page_id,)
+            ).fetchall()
+        return [
+            dict(zip(("place", "rounds") + STAT_COLUMNS, row))
+            for row in rows
+        ]
+
+    def player_rounds(self, player_page_id):
+        """メンバーのラウンドごとの成績（プレー日順）"""
+        with self._lock:
+            rows = self._conn.execute(
+                f"""SELECT play_date, place, {", ".join(STAT_COLUMNS)} FROM round_player_stats
+                    WHERE player_page_id = ? ORDER BY play_date""",
+                (player_page_id,)
+            ).fetchall()
+        return [dict(zip(("play_date", "place") + STAT_COLUMNS, row)) for row in rows]
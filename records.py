@@ -0,0 +1,146 @@
+from collections.abc import Mapping
+from dataclasses import dataclass
+
+# ラウンドのメンバー枠（member1〜member4）
+MEMBER_SLOTS = 4
+
+# レートが未設定・0のときの点数
+DEFAULT_RATES = {"gold": 4, "silver": 3, "bronze": 2, "iron": 1, "diamond": 5}
+DEFAULT_PAR = 72
+
+_EMPTY = {}
+
+
+class Record(Mapping):
+    """属性でもキー（record["stroke"]、record.get("olympic")、{**record}）でも読めるレコード
+
+    dictを前提にした既存の画面・集計処理はそのまま使える
+    """
+    __slots__ = ()
+
+    def __getitem__(self, key):
+        if key not in self.__slots__:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __iter__(self):
+        return iter(self.__slots__)
+
+    def __len__(self):
+        return len(self.__slots__)
+
+
+@dataclass(slots=True)
+class User(Record):
+    id: str
+    name: str
+    name_display: str
+    page_id: str
+
+
+@dataclass(slots=True)
+class Game(Record):
+    id: str
+    play_date: str
+    place: str
+    par: int
+    members: list  # 登録済みのメンバーのpage_id（枠順）
+    member_ids: dict  # {"member1_id": page_id または None, ...}
+    gold: int
+    silver: int
+    bronze: int
+    iron: int
+    diamond: int
+    page_id: str
+
+
+@dataclass(slots=True)
+class Score(Record):
+    id: str
+    hole: int
+    stroke: int
+    putt: int
+    snake: int
+    olympic: str
+    snake_out: bool
+    birdie: bool
+    game_relation: str
+    user_relation: str
+    page_id: str
+
+
+def _text(prop, kind):
+    """title / rich_text プロパティの先頭の文字列（空・未取得なら""）"""
+    values = prop.get(kind) if prop else None
+    return values[0]["text"]["content"] if values else ""
+
+
+def _relation(prop):
+    """リレーションの先頭のpage_id（空・未取得ならNone）"""
+    values = prop.get("relation") if prop else None
+    return values[0]["id"] if values else None
+
+
+def parse_user_page(page):
+    """ユーザーページをUserに変換する"""
+    get = page["properties"].get
+    name = _text(get("name"), "rich_text")
+    # 表示名が未入力（rich_textが空）のときだけ名前の先頭3文字にする
+    name_display = get("name_display")
+    name_display = _text(name_display, "rich_text") if name_display and name_display.get("rich_text") else name[:3]
+    return User(_text(get("id"), "title"), name, name_display, page["id"])
+
+
+def parse_game_page(page):
+    """ラウンドページをGameに変換する（必要なプロパティだけを1回ずつ読む）"""
+    get = page["properties"].get
+    play_date = (get("play_date") or _EMPTY).get("date")
+    rates = [(get(key) or _EMPTY).get("number") or default for key, default in DEFAULT_RATES.items()]
+
+    members = []
+    member_ids = {}
+    for i in range(1, MEMBER_SLOTS + 1):
+        member_id = _relation(get(f"member{i}"))
+        member_ids[f"member{i}_id"] = member_id
+        if member_id:
+            members.append(member_id)
+
+    return Game(
+        _text(get("id"), "title"),
+        play_date["start"] if play_date else "",
+        _text(get("place"), "rich_text"),
+        (get("par") or _EMPTY).get("number") or DEFAULT_PAR,
+        members,
+        member_ids,
+        *rates,
+        page["id"]
+    )
+
+
+def parse_score_page(page):
+    """スコアページをScoreに変換する（filter_propertiesで省かれたプロパティは既定値）"""
+    # 件数が多いため、関数呼び出しを挟まずにプロパティを1回ずつ読む
+    get = page["properties"].get
+    title = get("id")
+    title = title["title"] if title else None
+    hole, stroke, putt, snake = get("hole"), get("stroke"), get("putt"), get("snake")
+    olympic = get("olympic")
+    olympic = olympic["select"] if olympic else None
+    snake_out, birdie = get("snake_out"), get("birdie")
+    game = get("game")
+    game = game["relation"] if game else None
+    user = get("user")
+    user = user["relation"] if user else None
+    return Score(
+        title[0]["text"]["content"] if title else "",
+        hole and hole["number"] or 0,
+        stroke and stroke["number"] or 0,
+        putt and putt["number"] or 0,
+        snake and snake["number"] or 0,
+        olympic["name"] if olympic else "",
+        snake_out["checkbox"] if snake_out else False,
+        birdie["checkbox"] if birdie else False,
+        game[0]["id"] if game else "",
+        user[0]["id"] if user else "",
+        page["id"]
+    )
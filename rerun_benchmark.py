@@ -0,0 +1,118 @@
+# スコア入力のホール移動・スコア確認の更新について、画面全体の再実行と
+# フラグメント（st.fragment）の部分だけの再実行にかかる時間を AppTest で比較する
+#   python rerun_benchmark.py --switches 36 --latency 0.05
+# AppTest はフラグメントだけの再実行を再現できないため、操作ごとに画面全体を再実行した時間（フラグメント導入前）と、
+# その中でパネル部分の描画にかかった時間（metrics の panel_render_seconds、フラグメント導入後の再実行）を並べて表示する
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+from streamlit.testing.v1 import AppTest
+
+import metrics
+from fake_notion import FakeNotion
+from loadtest import APP_PATH, DATABASES, MEMBER_COUNT, SECRETS
+
+
+def _text(value):
+    return [{"text": {"content": value}}]
+
+
+def seed(fake):
+    """ユーザー・ラウンド・18ホール分のスコアを代替サーバーに直接登録する"""
+    users = [
+        fake.create_page("loadtest-users", {
+            "id": {"title": _text(f"player{i}")},
+            "name": {"rich_text": _text(f"プレーヤー{i}")},
+            "name_display": {"rich_text": _text(f"P{i}")}
+        })
+        for i in range(1, MEMBER_COUNT + 1)
+    ]
+    game_id = "202601011000"
+    game = fake.create_page("loadtest-games", {
+        "id": {"title": _text(game_id)},
+        "play_date": {"date": {"start": "2026-01-01"}},
+        "place": {"rich_text": _text("ベンチマークコース")},
+        "par": {"number": 72},
+        **{f"member{i}": {"relation": [{"id": user["id"]}]} for i, user in enumerate(users, 1)}
+    })
+    for member_index, user in enumerate(users, 1):
+        for hole in range(1, 19):
+            fake.create_page("loadtest-scores", {
+                "id": {"title": _text(f"{game_id}_{member_index}_{hole}")},
+                "game": {"relation": [{"id": game["id"]}]},
+                "user": {"relation": [{"id": user["id"]}]},
+                "hole": {"number": hole},
+                "stroke": {"number": (member_index + hole) % 3},
+                "putt": {"number": 2},
+                "snake": {"number": 0}
+            })
+
+
+def panel_times(panel):
+    """metrics に記録されたパネルの描画時間の (件数, p50, p95)（秒）"""
+    for row in metrics.registry.histogram_summary():
+        if row["name"] == "panel_render_seconds" and row["labels"] == f"panel={panel}":
+            return row["count"], row["p50_ms"] / 1000, row["p95_ms"] / 1000
+    return 0, 0.0, 0.0
+
+
+def report(name, full_runs, panel):
+    full_runs = sorted(full_runs)
+    count, panel_p50, panel_p95 = panel_times(panel)
+    p95 = full_runs[min(len(full_runs) - 1, int(len(full_runs) * 0.95))]
+    print(
+        f"{name:<16}{len(full_runs):>6}{statistics.median(full_runs) * 1000:>14.1f}{p95 * 1000:>14.1f}"
+        f"{count:>8}{panel_p50 * 1000:>14.1f}{panel_p95 * 1000:>14.1f}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="画面全体の再実行とフラグメントの再実行の時間を比較する")
+    parser.add_argument("--switches", type=int, default=36, help="ホールを切り替える回数")
+    parser.add_argument("--refreshes", type=int, default=10, help="スコア確認で更新する回数")
+    parser.add_argument("--latency", type=float, default=0.05, help="代替サーバーの1リクエストごとの待ち時間（秒）")
+    parser.add_argument("--timeout", type=float, default=120)
+    args = parser.parse_args()
+
+    fake = FakeNotion(DATABASES, latency=args.latency)
+    os.environ["NOTION_API_URL"] = fake.start()
+    os.environ["GOLF_LOCAL_DB"] = os.path.join(tempfile.mkdtemp(prefix="golf_benchmark_"), "golf_local.db")
+    seed(fake)
+
+    at = AppTest.from_file(APP_PATH, default_timeout=args.timeout)
+    at.secrets["notion"] = SECRETS
+    switch_runs = []
+    refresh_runs = []
+    try:
+        at.run()
+        at.sidebar.selectbox(key="menu").select("スコア入力").run()
+        at.sidebar.selectbox(key="sidebar_game_select").select_index(1).run()
+        for i in range(args.switches):
+            button = next(button for button in at.button if button.key == f"hole_{i % 18 + 1}")
+            started = time.perf_counter()
+            button.click().run()
+            switch_runs.append(time.perf_counter() - started)
+
+        at.sidebar.selectbox(key="menu").select("スコア確認").run()
+        for _ in range(args.refreshes):
+            started = time.perf_counter()
+            at.button(key="refresh_score_review").click().run()
+            refresh_runs.append(time.perf_counter() - started)
+        if at.exception:
+            print(f"エラー: {at.exception[0].value}", file=sys.stderr)
+            return 1
+    finally:
+        fake.stop()
+
+    print(f"{'操作':<16}{'回数':>6}{'全体p50(ms)':>14}{'全体p95(ms)':>14}{'回数':>8}{'部分p50(ms)':>14}{'部分p95(ms)':>14}")
+    report("ホール切り替え", switch_runs, "score_entry")
+    report("スコア確認の更新", refresh_runs, "score_review")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
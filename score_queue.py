@@ -0,0 +1,145 @@
+import json
+import sqlite3
+import threading
+import time
+
+# バックグラウンド送信の間隔（秒）と、失敗時の最大待ち時間（秒）
+FLUSH_INTERVAL = 5
+MAX_RETRY_INTERVAL = 60
+
+
+class ScoreWriteQueue:
+    """スコア書き込みをSQLiteに保存しておく待ち行列
+
+    同じscore_idへの編集は1件にまとめ、送信時にはまとめた結果だけを書き込む
+    """
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS pending_writes (
+                score_id TEXT PRIMARY KEY,
+                db_id TEXT NOT NULL,
+                page_id TEXT,
+                properties TEXT NOT NULL,
+                version INTEGER NOT NULL DEFAULT 1,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                last_error TEXT,
+                updated_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS created_pages (
+                score_id TEXT PRIMARY KEY,
+                page_id TEXT NOT NULL
+            );
+        """)
+        self._conn.commit()
+
+    def enqueue(self, score_id, db_id, page_id, properties):
+        """書き込みを追加する（未送信の同じscore_idがあればプロパティを上書きでまとめる）"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT page_id, properties FROM pending_writes WHERE score_id = ?",
+                (score_id,)
+            ).fetchone()
+
+            if row:
+                # 順番にPATCHした場合と同じ結果になるよう、後の値で上書きする
+                merged = json.loads(row[1])
+                merged.update(properties)
+                self._conn.execute(
+                    "UPDATE pending_writes SET page_id = ?, properties = ?, version = version + 1, updated_at = ? WHERE score_id = ?",
+                    (page_id or row[0], json.dumps(merged), time.time(), score_id)
+                )
+            else:
+                self._conn.execute(
+                    "INSERT INTO pending_writes (score_id, db_id, page_id, properties, updated_at) VALUES (?, ?, ?, ?, ?)",
+                    (score_id, db_id, page_id, json.dumps(properties), time.time())
+                )
+            self._conn.commit()
+
+    def pending_count(self):
+        """未送信の書き込み件数"""
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM pending_writes").fetchone()[0]
+
+    def pending_properties(self, score_id_prefix=""):
+        """未送信のプロパティを {score_id: properties} で返す"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT score_id, properties FROM pending_writes WHERE substr(score_id, 1, ?) = ?",
+                (len(score_id_prefix), score_id_prefix)
+            ).fetchall()
+        return {score_id: json.loads(properties) for score_id, properties in rows}
+
+    def created_page_ids(self, score_id_prefix=""):
+        """待ち行列から作成したページのIDを {score_id: page_id} で返す"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT score_id, page_id FROM created_pages WHERE substr(score_id, 1, ?) = ?",
+                (len(score_id_prefix), score_id_prefix)
+            ).fetchall()
+        return dict(rows)
+
+    def flush(self, client):
+        """未送信の書き込みをまとめて送信し、(成功件数, 失敗件数) を返す"""
+        with self._lock:
+            rows = self._conn.execute("""
+                SELECT p.score_id, p.db_id, COALESCE(p.page_id, c.page_id), p.properties, p.version
+                FROM pending_writes p LEFT JOIN created_pages c ON p.score_id = c.score_id
+                ORDER BY p.updated_at
+            """).fetchall()
+        if not rows:
+            return 0, 0
+
+        writes = [
+            {"score_id": score_id, "db_id": db_id, "page_id": page_id, "properties": json.loads(properties)}
+            for score_id, db_id, page_id, properties, _ in rows
+        ]
+        outcomes = client.batch_write(writes)
+
+        success_count = 0
+        error_count = 0
+        with self._lock:
+            for (score_id, _, page_id, _, version), (result, error) in zip(rows, outcomes):
+                if error:
+                    error_count += 1
+                    self._conn.execute(
+                        "UPDATE pending_writes SET attempts = attempts + 1, last_error = ? WHERE score_id = ?",
+                        (error, score_id)
+                    )
+                    continue
+
+                success_count += 1
+                if not page_id:
+                    # 作成したページを記録し、以降の編集が重複作成にならないようにする
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO created_pages (score_id, page_id) VALUES (?, ?)",
+                        (score_id, result["id"])
+                    )
+                # 送信中に新しい編集が入っていなければ削除
+                self._conn.execute(
+                    "DELETE FROM pending_writes WHERE score_id = ? AND version = ?",
+                    (score_id, version)
+                )
+            self._conn.commit()
+        return success_count, error_count
+
+
+def start_flush_worker(queue, client, interval=FLUSH_INTERVAL):
+    """待ち行列をバックグラウンドで定期的に送信するスレッドを開始する"""
+    def run():
+        wait_time = interval
+        while True:
+            time.sleep(wait_time)
+            try:
+                _, error_count = queue.flush(client)
+            except Exception:
+                error_count = 1
+            # 失敗が続く間は待ち時間を倍々に延ばす（電波の悪いコース上を想定）
+            wait_time = min(wait_time * 2, MAX_RETRY_INTERVAL) if error_count else interval
+
+    worker = threading.Thread(target=run, name="score-queue-flush", daemon=True)
+    worker.start()
+    return worker
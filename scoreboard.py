@@ -0,0 +1,175 @@
+import numpy as np
+import pandas as pd
+
+# 1ラウンドのホール数
+HOLES = 18
+
+# 表のセルは表示用の文字列。pandas 3 の文字列型への列ごとの変換は表の作成時間の大半を占めるため、
+# 以前の pandas と同じ object 型のまま DataFrame にする
+TABLE_DTYPE = object
+
+# オリンピックのメダル（配列にはインデックス+1を格納し、0はメダルなし）
+OLYMPIC_MEDALS = ["金", "銀", "銅", "鉄", "ダイヤモンド"]
+OLYMPIC_CODES = {medal: code for code, medal in enumerate(OLYMPIC_MEDALS, 1)}
+
+
+class ScoreBoard:
+    """1ラウンド分のスコアを (メンバー, ホール) の配列にまとめたもの
+
+    行はメンバー（membersの順番）、列はホール（1番ホールが0列目）。
+    ラウンドごとに1回だけ作成し、各画面はここから値を読む
+    """
+    __slots__ = (
+        "members", "member_rows", "stroke", "putt", "snake",
+        "olympic", "snake_out", "recorded", "_scores"
+    )
+
+    def __init__(self, members, scores):
+        self.members = list(members)
+        self.member_rows = {member["page_id"]: row for row, member in enumerate(self.members)}
+
+        shape = (len(self.members), HOLES)
+        self.stroke = np.zeros(shape, dtype=np.int16)
+        self.putt = np.zeros(shape, dtype=np.int16)
+        self.snake = np.zeros(shape, dtype=np.int16)
+        self.olympic = np.zeros(shape, dtype=np.int8)
+        self.snake_out = np.zeros(shape, dtype=bool)
+        self.recorded = np.zeros(shape, dtype=bool)
+        self._scores = {}
+
+        for score in scores:
+            row = self.member_rows.get(score["user_relation"])
+            hole = score["hole"]
+            if row is None or not 1 <= hole <= HOLES:
+                continue
+
+            col = hole - 1
+            self.stroke[row, col] = score["stroke"]
+            self.putt[row, col] = score["putt"]
+            self.snake[row, col] = score["snake"]
+            self.olympic[row, col] = OLYMPIC_CODES.get(score["olympic"], 0)
+            self.snake_out[row, col] = score.get("snake_out", False)
+            self.recorded[row, col] = True
+            self._scores[(row, col)] = score
+
+    def has(self, row, hole):
+        """指定したメンバー・ホールのスコアが記録されているか"""
+        return bool(self.recorded[row, hole - 1])
+
+    def score(self, member_page_id, hole):
+        """指定したメンバー・ホールの元のスコア（page_idなどを含む）。未記録ならNone"""
+        row = self.member_rows.get(member_page_id)
+        if row is None:
+            return None
+        return self._scores.get((row, hole - 1))
+
+    def olympic_name(self, row, hole):
+        """指定したメンバー・ホールのオリンピックのメダル名（なしは空文字）"""
+        code = self.olympic[row, hole - 1]
+        return OLYMPIC_MEDALS[code - 1] if code else ""
+
+
+def _format_par_diff(values):
+    """パー±の配列を "+1" / "0" / "-1" 形式の文字列配列にする"""
+    return np.char.add(np.where(values > 0, "+", ""), values.astype(str))
+
+
+def scorecard_table(board, total_par):
+    """スコアシート（メンバーごとにストローク行・パット行）のDataFrameを作成する"""
+    names = [member["name"] for member in board.members]
+    recorded = board.recorded
+    front_recorded = recorded[:, :9].any(axis=1)
+    back_recorded = recorded[:, 9:].any(axis=1)
+
+    # ストローク行
+    stroke_in = board.stroke[:, :9].sum(axis=1)
+    stroke_out = board.stroke[:, 9:].sum(axis=1)
+    stroke_total = stroke_in + stroke_out
+    stroke_holes = np.where(recorded, _format_par_diff(board.stroke), "-")
+    stroke_in_cells = np.where(stroke_in != 0, _format_par_diff(stroke_in), np.where(front_recorded, "0", "-"))
+    stroke_out_cells = np.where(stroke_out != 0, _format_par_diff(stroke_out), np.where(back_recorded, "0", "-"))
+    stroke_total_cells = np.where(
+        front_recorded | back_recorded,
+        np.char.add(
+            np.char.add((total_par + stroke_total).astype(str), "("),
+            np.char.add(_format_par_diff(stroke_total), ")")
+        ),
+        "-"
+    )
+
+    # パット行
+    putt_in = board.putt[:, :9].sum(axis=1)
+    putt_out = board.putt[:, 9:].sum(axis=1)
+    putt_holes = np.where(recorded, board.putt.astype(str), "-")
+    putt_in_cells = np.where(putt_in > 0, putt_in.astype(str), "-")
+    putt_out_cells = np.where(putt_out > 0, putt_out.astype(str), "-")
+    putt_total_cells = np.where((putt_in > 0) & (putt_out > 0), (putt_in + putt_out).astype(str), "-")
+
+    def build_rows(name_cells, holes, in_cells, out_cells, total_cells):
+        return np.column_stack([name_cells, holes[:, :9], in_cells, holes[:, 9:], out_cells, total_cells])
+
+    stroke_rows = build_rows(np.array(names, dtype=object), stroke_holes, stroke_in_cells, stroke_out_cells, stroke_total_cells)
+    putt_rows = build_rows(np.full(len(names), ""), putt_holes, putt_in_cells, putt_out_cells, putt_total_cells)
+
+    # メンバーごとにストローク行・パット行の順に並べる
+    rows = np.empty((len(names) * 2, stroke_rows.shape[1]), dtype=object)
+    rows[0::2] = stroke_rows
+    rows[1::2] = putt_rows
+
+    columns = ["名前"] + [str(i) for i in range(1, 10)] + ["IN"] + [str(i) for i in range(10, 19)] + ["OUT", "計"]
+    return pd.DataFrame(rows, columns=columns, dtype=TABLE_DTYPE)
+
+
+def snake_period_totals(board):
+    """3ホール区間ごとのヘビ数（メンバー×6区間）"""
+    return board.snake.reshape(len(board.members), HOLES // 3, 3).sum(axis=2)
+
+
+def snake_out_totals(board):
+    """各メンバーがアウトになった3ホール区間の、全メンバー合計ヘビ数の累計"""
+    period_totals = snake_period_totals(board).sum(axis=0)
+    return (board.snake_out[:, 2::3] * period_totals).sum(axis=1)
+
+
+def snake_table(board):
+    """ヘビスコア（3ホール区間ごと・合計・アウトメンバー）のDataFrameを作成する"""
+    names = [member["name"] for member in board.members]
+    periods = snake_period_totals(board)
+
+    rows = [[name] + [str(value) for value in member_periods] for name, member_periods in zip(names, periods.tolist())]
+    rows.append(["合計"] + [str(value) for value in periods.sum(axis=0).tolist()])
+
+    out_row = ["アウト"]
+    for period_out in board.snake_out[:, 2::3].T:
+        out_members = [name for name, is_out in zip(names, period_out) if is_out]
+        out_row.append(", ".join(out_members) if out_members else "-")
+    rows.append(out_row)
+
+    return pd.DataFrame(rows, columns=["名前", "1-3", "4-6", "7-9", "10-12", "13-15", "16-18"], dtype=TABLE_DTYPE)
+
+
+def olympic_counts(board):
+    """各メンバーのメダル獲得数（メンバー×メダル、OLYMPIC_MEDALSの順）"""
+    codes = np.arange(1, len(OLYMPIC_MEDALS) + 1, dtype=np.int8)
+    return (board.olympic[:, :, None] == codes).sum(axis=1)
+
+
+def olympic_table(board, rates):
+    """オリンピックスコアのDataFrameを作成する（rates: メダル名→点数）"""
+    counts = olympic_counts(board)
+    totals = counts @ np.array([rates[medal] for medal in OLYMPIC_MEDALS])
+
+    count_cells = np.where(counts > 0, counts.astype(str), "-")
+    total_cells = np.where(totals > 0, totals.astype(str), "-")
+    names = np.array([member["name"] for member in board.members], dtype=object)
+    rows = np.column_stack([names, count_cells, total_cells])
+
+    return pd.DataFrame(rows, columns=["名前"] + OLYMPIC_MEDALS + ["合計点"], dtype=TABLE_DTYPE)
+
+
+def special_score_counts(board):
+    """各メンバーのアルバトロス・イーグル・バーディー数（メンバー×3）"""
+    return np.stack([
+        ((board.stroke == par_diff) & board.recorded).sum(axis=1)
+        for par_diff in (-3, -2, -1)
+    ], axis=1)
@@ -0,0 +1,243 @@
+# スコア確認の表（スコアシート・ヘビ・オリンピック・ヘビアウト・スペシャル）の作成について、
+# 変更前のメンバー×ホールのループと scoreboard.py の配列演算の処理時間を比較する
+#   python scoreboard_benchmark.py --rounds 500 --repeat 5
+# スコアは4人×18ホールのラウンドをランダムに生成し、Notionには接続しない
+import argparse
+import random
+import statistics
+import sys
+import time
+
+import pandas as pd
+
+from scoreboard import (
+    OLYMPIC_MEDALS,
+    ScoreBoard,
+    olympic_table,
+    scorecard_table,
+    snake_out_totals,
+    snake_table,
+    special_score_counts
+)
+
+MEMBER_COUNT = 4
+TOTAL_PAR = 72
+RATES = {"金": 4, "銀": 3, "銅": 2, "鉄": 1, "ダイヤモンド": 5}
+
+
+def legacy_scorecard_table(board, total_par):
+    """変更前のスコアシート（比較用にそのまま残したもの）"""
+    header = ["名前"] + [str(i) for i in range(1, 10)] + ["IN"] + [str(i) for i in range(10, 19)] + ["OUT", "計"]
+    table_data = [header]
+    for row, member in enumerate(board.members):
+        stroke_row = [member["name"]]
+        in_total = 0
+        out_total = 0
+        for hole in range(1, 10):
+            if board.has(row, hole):
+                par_diff = int(board.stroke[row, hole - 1])
+                stroke_row.append(f"{par_diff:+d}" if par_diff != 0 else "0")
+                in_total += par_diff
+            else:
+                stroke_row.append("-")
+        if in_total != 0:
+            stroke_row.append(f"{in_total:+d}")
+        else:
+            stroke_row.append("0" if board.recorded[row, 0:9].any() else "-")
+        for hole in range(10, 19):
+            if board.has(row, hole):
+                par_diff = int(board.stroke[row, hole - 1])
+                stroke_row.append(f"{par_diff:+d}" if par_diff != 0 else "0")
+                out_total += par_diff
+            else:
+                stroke_row.append("-")
+        if out_total != 0:
+            stroke_row.append(f"{out_total:+d}")
+        else:
+            stroke_row.append("0" if board.recorded[row, 9:18].any() else "-")
+        total_diff = in_total + out_total
+        if board.recorded[row, 0:18].any():
+            total_actual_score = total_par + total_diff
+            stroke_row.append(f"{total_actual_score}({total_diff:+d})" if total_diff != 0 else f"{total_actual_score}(0)")
+        else:
+            stroke_row.append("-")
+        table_data.append(stroke_row)
+
+        putt_row = [""]
+        in_putt_total = 0
+        out_putt_total = 0
+        for hole in range(1, 10):
+            if board.has(row, hole):
+                putt = int(board.putt[row, hole - 1])
+                putt_row.append(str(putt))
+                in_putt_total += putt
+            else:
+                putt_row.append("-")
+        putt_row.append(str(in_putt_total) if in_putt_total > 0 else "-")
+        for hole in range(10, 19):
+            if board.has(row, hole):
+                putt = int(board.putt[row, hole - 1])
+                putt_row.append(str(putt))
+                out_putt_total += putt
+            else:
+                putt_row.append("-")
+        putt_row.append(str(out_putt_total) if out_putt_total > 0 else "-")
+        putt_row.append(str(in_putt_total + out_putt_total) if (in_putt_total > 0 and out_putt_total > 0) else "-")
+        table_data.append(putt_row)
+    return pd.DataFrame(table_data[1:], columns=table_data[0])
+
+
+def legacy_snake_table(board):
+    """変更前のヘビスコア表"""
+    rows = []
+    for row, member in enumerate(board.members):
+        snake_row = [member["name"]]
+        for start_hole in [1, 4, 7, 10, 13, 16]:
+            period_snake = 0
+            for hole in range(start_hole, start_hole + 3):
+                if board.has(row, hole):
+                    period_snake += int(board.snake[row, hole - 1])
+            snake_row.append(str(period_snake) if period_snake > 0 else "0")
+        rows.append(snake_row)
+    rows.append(["合計"] + [str(int(board.snake[:, start - 1:start + 2].sum())) for start in [1, 4, 7, 10, 13, 16]])
+    out_row = ["アウト"]
+    for target_hole in [3, 6, 9, 12, 15, 18]:
+        out_members = [member["name"] for row, member in enumerate(board.members) if board.snake_out[row, target_hole - 1]]
+        out_row.append(", ".join(out_members) if out_members else "-")
+    rows.append(out_row)
+    return pd.DataFrame(rows, columns=["名前", "1-3", "4-6", "7-9", "10-12", "13-15", "16-18"])
+
+
+def legacy_snake_out_totals(board):
+    """変更前のヘビアウト合計"""
+    totals = []
+    for row in range(len(board.members)):
+        total_out_score = 0
+        for target_hole in [3, 6, 9, 12, 15, 18]:
+            if board.snake_out[row, target_hole - 1]:
+                total_out_score += int(board.snake[:, target_hole - 3:target_hole].sum())
+        totals.append(total_out_score)
+    return totals
+
+
+def legacy_olympic_table(board, rates):
+    """変更前のオリンピックスコア表"""
+    rows = []
+    for row, member in enumerate(board.members):
+        counts = dict.fromkeys(OLYMPIC_MEDALS, 0)
+        for hole in range(1, 19):
+            if board.has(row, hole):
+                olympic = board.olympic_name(row, hole)
+                if olympic in counts:
+                    counts[olympic] += 1
+        total_points = sum(counts[medal] * rates[medal] for medal in OLYMPIC_MEDALS)
+        rows.append(
+            [member["name"]]
+            + [str(counts[medal]) if counts[medal] > 0 else "-" for medal in OLYMPIC_MEDALS]
+            + [str(total_points) if total_points > 0 else "-"]
+        )
+    return pd.DataFrame(rows, columns=["名前"] + OLYMPIC_MEDALS + ["合計点"])
+
+
+def legacy_special_score_counts(board):
+    """変更前のスペシャルスコア数（アルバトロス・イーグル・バーディー）"""
+    counts = []
+    for row in range(len(board.members)):
+        member_counts = [0, 0, 0]
+        for hole in range(1, 19):
+            if board.has(row, hole):
+                par_diff = int(board.stroke[row, hole - 1])
+                if -3 <= par_diff <= -1:
+                    member_counts[par_diff + 3] += 1
+        counts.append(member_counts)
+    return counts
+
+
+def legacy_tables(board):
+    return (
+        legacy_scorecard_table(board, TOTAL_PAR),
+        legacy_snake_table(board),
+        legacy_olympic_table(board, RATES),
+        legacy_snake_out_totals(board),
+        legacy_special_score_counts(board)
+    )
+
+
+def scoreboard_tables(board):
+    return (
+        scorecard_table(board, TOTAL_PAR),
+        snake_table(board),
+        olympic_table(board, RATES),
+        snake_out_totals(board).tolist(),
+        special_score_counts(board).tolist()
+    )
+
+
+def synthetic_rounds(count, missing_rate, seed=0):
+    """ランダムなラウンド（メンバー, スコア）の一覧。missing_rate の割合のホールは未記録にする"""
+    rng = random.Random(seed)
+    members = [{"page_id": f"user-{i}", "name": f"プレーヤー{i}"} for i in range(1, MEMBER_COUNT + 1)]
+    rounds = []
+    for _ in range(count):
+        scores = []
+        for member_index, member in enumerate(members):
+            for hole in range(1, 19):
+                if rng.random() < missing_rate:
+                    continue
+                scores.append({
+                    "user_relation": member["page_id"],
+                    "hole": hole,
+                    "stroke": rng.choice([-2, -1, 0, 0, 1, 2, 3]),
+                    "putt": rng.choice([1, 2, 2, 3]),
+                    "snake": rng.choice([0, 0, 1]),
+                    "olympic": rng.choice(OLYMPIC_MEDALS) if rng.random() < 0.3 else "",
+                    "snake_out": hole % 3 == 0 and member_index == (hole // 3) % MEMBER_COUNT
+                })
+        rounds.append((members, scores))
+    return rounds
+
+
+def same_tables(left, right):
+    """2つの実装の結果（DataFrameの列名・セルと集計値）が同じか（列の型は比べない）"""
+    return all(
+        list(a.columns) == list(b.columns) and a.values.tolist() == b.values.tolist()
+        if isinstance(a, pd.DataFrame) else a == b
+        for a, b in zip(left, right)
+    )
+
+
+def measure(build, boards, repeat):
+    """全ラウンドの表を作るのにかかった時間（秒）の中央値"""
+    runs = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for board in boards:
+            build(board)
+        runs.append(time.perf_counter() - started)
+    return statistics.median(runs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="スコア確認の表の作成時間を比較する")
+    parser.add_argument("--rounds", type=int, default=500, help="生成するラウンド数")
+    parser.add_argument("--repeat", type=int, default=5, help="処理時間を計測する回数（中央値を表示）")
+    parser.add_argument("--missing", type=float, default=0.0, help="未記録にするホールの割合（0〜1）")
+    args = parser.parse_args()
+
+    boards = [ScoreBoard(members, scores) for members, scores in synthetic_rounds(args.rounds, args.missing)]
+    # 同じラウンドから同じ表が得られることを先に確認する
+    for i, board in enumerate(boards):
+        if not same_tables(legacy_tables(board), scoreboard_tables(board)):
+            print(f"エラー: {i + 1}ラウンド目の表が変更前と一致しません", file=sys.stderr)
+            return 1
+
+    print(f"{args.rounds}ラウンド（未記録 {args.missing:.0%}）")
+    print(f"{'表の作成':<16}{'合計(ms)':>12}{'1ラウンド(ms)':>16}")
+    for name, build in (("変更前(ループ)", legacy_tables), ("ScoreBoard", scoreboard_tables)):
+        seconds = measure(build, boards, args.repeat)
+        print(f"{name:<16}{seconds * 1000:>12.1f}{seconds / args.rounds * 1000:>16.3f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,188 @@
+import heapq
+
+from scoreboard import HOLES, OLYMPIC_MEDALS
+
+# スペシャルスコアの点数（パー±: 点数）。-3以下はアルバトロス扱い
+SPECIAL_POINTS = {-1: 1, -2: 3, -3: 5}
+
+# オリンピックのレートの既定値
+DEFAULT_OLYMPIC_RATES = {"金": 4, "銀": 3, "銅": 2, "鉄": 1, "ダイヤモンド": 5}
+
+# ヘビアウトを判定するホール（3ホール区間の最終ホール）
+SNAKE_OUT_HOLES = [3, 6, 9, 12, 15, 18]
+
+# 得点になるイベント（他の全員から受け取る）。それ以外（ヘビ）は他の全員に支払う
+PLUS_EVENT_TYPES = ("olympic", "special")
+
+# 最小回数の精算を厳密に求める人数の上限（それより多い場合は貪欲法）
+EXACT_SETTLEMENT_LIMIT = 12
+
+_RATE_KEYS = {"金": "gold", "銀": "silver", "銅": "bronze", "鉄": "iron", "ダイヤモンド": "diamond"}
+
+
+def olympic_rates(game):
+    """ラウンド情報からオリンピックのレート（メダル名→点数）を取得する"""
+    return {medal: game.get(_RATE_KEYS[medal], DEFAULT_OLYMPIC_RATES[medal]) for medal in OLYMPIC_MEDALS}
+
+
+def special_points(par_diff):
+    """パー±からスペシャルスコアの点数を返す（バーディー未満は0）"""
+    if par_diff >= 0:
+        return 0
+    return SPECIAL_POINTS[max(par_diff, -3)]
+
+
+def round_events(board, rates):
+    """ラウンドの得点イベントを一覧にする
+
+    戻り値: {"type": "olympic/special/snake", "player": メンバー名, "points": int} のリスト
+    """
+    events = []
+    for row, member in enumerate(board.members):
+        player = member["name"]
+        for hole in range(1, HOLES + 1):
+            if not board.has(row, hole):
+                continue
+
+            medal = board.olympic_name(row, hole)
+            if medal:
+                events.append({"type": "olympic", "player": player, "points": rates[medal]})
+
+            points = special_points(int(board.stroke[row, hole - 1]))
+            if points:
+                events.append({"type": "special", "player": player, "points": points})
+
+    # ヘビ：アウトになったメンバーは、その3ホール区間の全メンバー合計ヘビ数を失点する
+    for row, member in enumerate(board.members):
+        for target_hole in SNAKE_OUT_HOLES:
+            if board.snake_out[row, target_hole - 1]:
+                period_total = int(board.snake[:, target_hole - 3:target_hole].sum())
+                events.append({"type": "snake", "player": member["name"], "points": period_total})
+    return events
+
+
+def event_totals(events, players):
+    """メンバーごとにイベント種別の合計点を集計する"""
+    totals = {player: {"olympic": 0, "special": 0, "snake": 0} for player in players}
+    for event in events:
+        if event["player"] in totals:
+            totals[event["player"]][event["type"]] += event["points"]
+    return totals
+
+
+def balances(events, players):
+    """イベントから各メンバーの最終収支（整数、合計は常に0）を計算する
+
+    得点イベントは他の全員から1人ずつ点数分を受け取り、失点イベントは他の全員に支払う
+    """
+    final_balances = {player: 0 for player in players}
+    other_count = len(final_balances) - 1
+    for event in events:
+        player = event["player"]
+        if player not in final_balances:
+            continue
+
+        sign = 1 if event["type"] in PLUS_EVENT_TYPES else -1
+        for other in final_balances:
+            if other == player:
+                final_balances[other] += sign * event["points"] * other_count
+            else:
+                final_balances[other] -= sign * event["points"]
+    return final_balances
+
+
+def _zero_sum_groups(amounts):
+    """合計0になるグループにできるだけ多く分割する（ビットDP、戻り値はインデックスのリスト）
+
+    グループ内はメンバー数-1回で精算できるため、グループ数が最大のとき精算回数が最小になる
+    """
+    count = len(amounts)
+    size = 1 << count
+    totals = [0] * size
+    for mask in range(1, size):
+        low = mask & -mask
+        totals[mask] = totals[mask ^ low] + amounts[low.bit_length() - 1]
+
+    best = [0] * size
+    for mask in range(1, size):
+        best[mask] = max(best[mask ^ (1 << i)] for i in range(count) if mask >> i & 1) + (totals[mask] == 0)
+
+    # 最適解をたどり、合計が0になるたびにグループを区切る
+    groups = []
+    current = []
+    mask = size - 1
+    while mask:
+        gain = totals[mask] == 0
+        index = next(
+            i for i in range(count)
+            if mask >> i & 1 and best[mask ^ (1 << i)] + gain == best[mask]
+        )
+        current.append(index)
+        mask ^= 1 << index
+        if totals[mask] == 0:
+            groups.append(current)
+            current = []
+    return groups
+
+
+def _greedy_transfers(balance_items):
+    """最大の受取額と最大の支払額を順に相殺していく精算（(メンバー, 収支) のリスト）"""
+    creditors = [(-amount, player) for player, amount in balance_items if amount > 0]
+    debtors = [(amount, player) for player, amount in balance_items if amount < 0]
+    heapq.heapify(creditors)
+    heapq.heapify(debtors)
+
+    transfers = []
+    while creditors and debtors:
+        credit, creditor = heapq.heappop(creditors)
+        debt, debtor = heapq.heappop(debtors)
+        amount = min(-credit, -debt)
+        transfers.append({"from": debtor, "to": creditor, "amount": amount})
+        if -credit > amount:
+            heapq.heappush(creditors, (credit + amount, creditor))
+        if -debt > amount:
+            heapq.heappush(debtors, (debt + amount, debtor))
+    return transfers
+
+
+def settle(final_balances):
+    """最終収支を精算する支払いの一覧を、できるだけ少ない回数で作成する
+
+    収支が0でないメンバーがEXACT_SETTLEMENT_LIMIT人以下なら最小回数、
+    それより多い場合は貪欲法（最大でメンバー数-1回）で求める。
+    戻り値: {"from": 支払うメンバー, "to": 受け取るメンバー, "amount": int} のリスト
+    """
+    balance_items = [(player, int(amount)) for player, amount in final_balances.items() if amount]
+    if sum(amount for _, amount in balance_items) != 0:
+        raise ValueError("収支の合計が0ではありません")
+
+    if len(balance_items) > EXACT_SETTLEMENT_LIMIT:
+        return _greedy_transfers(balance_items)
+
+    transfers = []
+    for group in _zero_sum_groups([amount for _, amount in balance_items]):
+        transfers.extend(_greedy_transfers([balance_items[i] for i in group]))
+    return transfers
+
+
+def settlement_relations(transfers, players):
+    """精算の支払い一覧をメンバーごとの {相手: 受け取る額（支払う場合は負）} にする"""
+    relations = {player: {} for player in players}
+    for transfer in transfers:
+        payer, receiver, amount = transfer["from"], transfer["to"], transfer["amount"]
+        receiver_relations = relations.setdefault(receiver, {})
+        payer_relations = relations.setdefault(payer, {})
+        receiver_relations[payer] = receiver_relations.get(payer, 0) + amount
+        payer_relations[receiver] = payer_relations.get(receiver, 0) - amount
+    return relations
+
+
+def score_round(board, rates):
+    """1ラウンド分の計算結果（イベント・種別ごとの合計・最終収支）をまとめて返す"""
+    players = [member["name"] for member in board.members]
+    events = round_events(board, rates)
+    return {
+        "events": events,
+        "totals": event_totals(events, players),
+        "balances": balances(events, players)
+    }
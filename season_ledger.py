@@ -0,0 +1,159 @@
+import sqlite3
+import threading
+import time
+
+# 集計値の列（ラウンドごとの記録・シーズン累計で共通）
+TOTAL_COLUMNS = ("olympic", "special", "snake", "balance")
+
+
+def season_of(play_date):
+    """プレー日（YYYY-MM-DD）からシーズン（年）を返す"""
+    return play_date[:4] if play_date else ""
+
+
+class SeasonLedger:
+    """確定したラウンドの収支をSQLiteに記録するシーズン台帳
+
+    ラウンドごとの記録（round_ledger）と、シーズンごとの累計（season_totals）を持つ。
+    累計は確定・取り消しのたびに差分だけ更新するため、シーズン収支は集計済みの行を読むだけで済む
+    """
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS round_ledger (
+                game_page_id TEXT NOT NULL,
+                player_page_id TEXT NOT NULL,
+                player_name TEXT NOT NULL,
+                play_date TEXT NOT NULL,
+                place TEXT,
+                olympic INTEGER NOT NULL,
+                special INTEGER NOT NULL,
+                snake INTEGER NOT NULL,
+                balance INTEGER NOT NULL,
+                finalized_at REAL NOT NULL,
+                PRIMARY KEY (game_page_id, player_page_id)
+            );
+            CREATE INDEX IF NOT EXISTS idx_round_ledger_date ON round_ledger (play_date);
+            CREATE TABLE IF NOT EXISTS season_totals (
+                season TEXT NOT NULL,
+                player_page_id TEXT NOT NULL,
+                player_name TEXT NOT NULL,
+                rounds INTEGER NOT NULL,
+                olympic INTEGER NOT NULL,
+                special INTEGER NOT NULL,
+                snake INTEGER NOT NULL,
+                balance INTEGER NOT NULL,
+                PRIMARY KEY (season, player_page_id)
+            );
+        """)
+        self._conn.commit()
+
+    def finalize(self, game, rows):
+        """ラウンドの収支を確定して記録する（確定済みなら置き換える）
+
+        rows: {"player_page_id", "player_name", "olympic", "special", "snake", "balance"} のリスト
+        """
+        finalized_at = time.time()
+        with self._lock:
+            self._remove(game["page_id"])
+            for row in rows:
+                self._conn.execute(
+                    """INSERT INTO round_ledger (game_page_id, player_page_id, player_name, play_date, place,
+                       olympic, special, snake, balance, finalized_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                    (
+                        game["page_id"], row["player_page_id"], row["player_name"], game["play_date"], game["place"],
+                        row["olympic"], row["special"], row["snake"], row["balance"], finalized_at
+                    )
+                )
+                self._add_to_season(season_of(game["play_date"]), row, 1)
+            self._conn.commit()
+
+    def unfinalize(self, game_page_id):
+        """ラウンドの確定を取り消す"""
+        with self._lock:
+            self._remove(game_page_id)
+            self._conn.commit()
+
+    def finalized_at(self, game_page_id):
+        """ラウンドを確定した時刻（未確定ならNone）"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT MAX(finalized_at) FROM round_ledger WHERE game_page_id = ?", (game_page_id,)
+            ).fetchone()
+        return row[0]
+
+    def seasons(self):
+        """記録があるシーズンの一覧（新しい順）"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT DISTINCT season FROM season_totals WHERE rounds > 0 ORDER BY season DESC"
+            ).fetchall()
+        return [season for (season,) in rows]
+
+    def season_balances(self, season):
+        """シーズンのメンバーごとの累計（集計済みの行を読む）"""
+        with self._lock:
+            rows = self._conn.execute(
+                """SELECT player_page_id, player_name, rounds, olympic, special, snake, balance
+                   FROM season_totals WHERE season = ? AND rounds > 0 ORDER BY balance DESC""",
+                (season,)
+            ).fetchall()
+        return [self._to_totals(row) for row in rows]
+
+    def range_balances(self, start_date, end_date):
+        """期間内（両端を含む）に確定したラウンドのメンバーごとの合計"""
+        with self._lock:
+            rows = self._conn.execute(
+                """SELECT player_page_id, MAX(player_name), COUNT(*), SUM(olympic), SUM(special), SUM(snake), SUM(balance)
+                   FROM round_ledger WHERE play_date BETWEEN ? AND ?
+                   GROUP BY player_page_id ORDER BY SUM(balance) DESC""",
+                (start_date, end_date)
+            ).fetchall()
+        return [self._to_totals(row) for row in rows]
+
+    def _remove(self, game_page_id):
+        """確定済みの記録を削除し、シーズン累計から差し引く（ロック取得済みで呼ぶ）"""
+        rows = self._conn.execute(
+            """SELECT player_page_id, player_name, play_date, olympic, special, snake, balance
+               FROM round_ledger WHERE game_page_id = ?""",
+            (game_page_id,)
+        ).fetchall()
+        for player_page_id, player_name, play_date, olympic, special, snake, balance in rows:
+            row = {
+                "player_page_id": player_page_id, "player_name": player_name,
+                "olympic": olympic, "special": special, "snake": snake, "balance": balance
+            }
+            self._add_to_season(season_of(play_date), row, -1)
+        self._conn.execute("DELETE FROM round_ledger WHERE game_page_id = ?", (game_page_id,))
+
+    def _add_to_season(self, season, row, sign):
+        """シーズン累計に1ラウンド分を加算（sign=-1で減算）する（ロック取得済みで呼ぶ）"""
+        values = [sign * row[column] for column in TOTAL_COLUMNS]
+        self._conn.execute(
+            """INSERT INTO season_totals (season, player_page_id, player_name, rounds, olympic, special, snake, balance)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+               ON CONFLICT (season, player_page_id) DO UPDATE SET
+                   player_name = excluded.player_name,
+                   rounds = rounds + excluded.rounds,
+                   olympic = olympic + excluded.olympic,
+                   special = special + excluded.special,
+                   snake = snake + excluded.snake,
+                   balance = balance + excluded.balance""",
+            [season, row["player_page_id"], row["player_name"], sign] + values
+        )
+
+    def _to_totals(self, row):
+        """集計結果の行をdictに変換する"""
+        player_page_id, player_name, rounds, olympic, special, snake, balance = row
+        return {
+            "player_page_id": player_page_id,
+            "player_name": player_name,
+            "rounds": rounds,
+            "olympic": olympic,
+            "special": special,
+            "snake": snake,
+            "balance": balance
+        }
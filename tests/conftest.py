@@ -0,0 +1,36 @@
+import pytest
+
+import app
+from fake_notion import FakeNotion
+
+
+@pytest.fixture
+def fake(monkeypatch):
+    """アプリのデータベースIDで起動したNotionの代替サーバー（接続先を差し替える）"""
+    fake = FakeNotion({app.USER_DB_ID: "users", app.GAME_DB_ID: "games", app.SCORE_DB_ID: "scores"})
+    monkeypatch.setattr(app, "NOTION_API_URL", fake.start())
+    yield fake
+    fake.stop()
+
+
+@pytest.fixture
+def client(fake):
+    """代替サーバーに接続し、待ち時間なしで送信・再試行するクライアント"""
+    return app.NotionClient(backoff_factor=0, rate_limiter=app.RateLimiter(rate=1000, burst=1000))
+
+
+@pytest.fixture
+def fail_queries(fake):
+    """呼び出した以降のデータベースのクエリを失敗させる（戻り値の関数で元に戻す）"""
+    dispatch = fake.dispatch
+
+    def failing_dispatch(method, path, body, query=None):
+        if path.endswith("/query"):
+            return 500, {"code": "internal_server_error", "message": "query failed"}
+        return dispatch(method, path, body, query)
+
+    def start():
+        fake.dispatch = failing_dispatch
+        return lambda: setattr(fake, "dispatch", dispatch)
+
+    return start
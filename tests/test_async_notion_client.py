@@ -0,0 +1,133 @@
+import asyncio
+
+import pytest
+
+import app
+
+# AsyncNotionClient は httpx がある場合だけ使える
+pytest.importorskip("httpx")
+
+
+def text(kind, value):
+    return {kind: [{"text": {"content": value}}]}
+
+
+def user_properties(user_id):
+    return {"id": text("title", user_id), "name": text("rich_text", user_id.capitalize())}
+
+
+def fail_requests(fake, method, path_suffix, statuses):
+    """method・パスが一致するリクエストに statuses のステータスを順に返し、使い切ったら元の処理に戻す"""
+    dispatch = fake.dispatch
+    statuses = list(statuses)
+    sent = []
+
+    def failing_dispatch(request_method, path, body, query=None):
+        if request_method == method and path.endswith(path_suffix):
+            sent.append(path)
+            if statuses:
+                return statuses.pop(0), {"code": "injected", "message": "injected failure"}
+        return dispatch(request_method, path, body, query)
+
+    fake.dispatch = failing_dispatch
+    return sent
+
+
+def run(client, action):
+    """AsyncNotionClient を開いて action(async_client) を実行する"""
+    async def main():
+        async with app.AsyncNotionClient(client, backoff_factor=0) as async_client:
+            return await action(async_client)
+    return asyncio.run(main())
+
+
+def test_reads_match_the_sync_client(fake, client):
+    for i in range(app.QUERY_PAGE_SIZE + 3):
+        fake.create_page(app.USER_DB_ID, user_properties(f"user{i}"))
+    game = fake.create_page(app.GAME_DB_ID, {"id": text("title", "202601011000"), "play_date": {"date": {"start": "2026-01-01"}}})
+    fake.create_page(app.SCORE_DB_ID, {
+        "id": text("title", "202601011000_1_1"),
+        "game": {"relation": [{"id": game["id"]}]},
+        "hole": {"number": 1},
+        "stroke": {"number": -1}
+    })
+
+    async def read_all(async_client):
+        return await asyncio.gather(
+            async_client.get_users(),
+            async_client.get_games(),
+            async_client.get_games_page(),
+            async_client.get_scores(app.parse_game_page(game), filter_properties=app.SCORE_ENTRY_PROPERTIES)
+        )
+
+    users, games, games_page, scores = run(client, read_all)
+    sync_client = app.NotionClient(rate_limiter=client.rate_limiter)
+    assert len(users) == app.QUERY_PAGE_SIZE + 3
+    assert users == sync_client.get_users()
+    assert games == sync_client.get_games()
+    assert games_page == sync_client.get_games_page()
+    assert scores == sync_client.get_scores(app.parse_game_page(game), filter_properties=app.SCORE_ENTRY_PROPERTIES)
+
+
+def test_shares_the_rate_limiter(fake, client):
+    reserved = []
+    reserve = client.rate_limiter.reserve
+    client.rate_limiter.reserve = lambda: reserved.append(1) or reserve()
+
+    async def write_users(async_client):
+        assert async_client.rate_limiter is client.rate_limiter
+        return await async_client.batch_write([
+            {"db_id": app.USER_DB_ID, "properties": user_properties(user_id)} for user_id in ("alice", "bob", "carol")
+        ])
+
+    outcomes = run(client, write_users)
+    assert [error for _, error in outcomes] == [None, None, None]
+    assert len(reserved) == 3
+
+
+def test_shares_the_read_cache_and_invalidates_on_write(fake, client):
+    fake.create_page(app.USER_DB_ID, user_properties("alice"))
+    assert [user["id"] for user in client.get_users()] == ["alice"]
+
+    async def read_then_write(async_client):
+        cached = await async_client.get_users()
+        await async_client.create_page(app.USER_DB_ID, user_properties("bob"))
+        return cached
+
+    requests_before = fake.stats["requests"]
+    assert [user["id"] for user in run(client, read_then_write)] == ["alice"]
+    # キャッシュから読み、送信は作成の1件だけ
+    assert fake.stats["requests"] == requests_before + 1
+    assert [user["id"] for user in client.get_users()] == ["alice", "bob"]
+
+
+def test_retries_rate_limited_and_failed_queries(fake, client):
+    fake.create_page(app.USER_DB_ID, user_properties("alice"))
+    sent = fail_requests(fake, "POST", "/query", [429, 503])
+    assert [user["id"] for user in run(client, lambda async_client: async_client.get_users())] == ["alice"]
+    assert len(sent) == 3
+
+
+def test_retries_page_creation_only_on_429(fake, client):
+    sent = fail_requests(fake, "POST", "/pages", [429])
+    assert run(client, lambda async_client: async_client.create_page(app.USER_DB_ID, user_properties("alice")))
+    assert len(sent) == 2
+
+    # 5xxは作成済みの可能性があるため再送しない
+    sent = fail_requests(fake, "POST", "/pages", [500])
+    assert run(client, lambda async_client: async_client.create_page(app.USER_DB_ID, user_properties("bob"))) is None
+    assert len(sent) == 1
+    assert sorted(page["properties"]["id"]["title"][0]["text"]["content"] for page in fake.pages.values()) == ["alice"]
+
+
+def test_retries_failed_updates(fake, client):
+    page = fake.create_page(app.USER_DB_ID, user_properties("alice"))
+    sent = fail_requests(fake, "PATCH", page["id"], [502])
+    assert run(client, lambda async_client: async_client.update_page(page["id"], {"name": text("rich_text", "Alicia")}))
+    assert len(sent) == 2
+
+
+def test_failed_scores_raise_on_error(fake, client):
+    fail_requests(fake, "POST", "/query", [500] * (app.MAX_RETRIES + 1))
+    with pytest.raises(app.NotionQueryError):
+        run(client, lambda async_client: async_client.get_scores(raise_on_error=True))
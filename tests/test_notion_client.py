@@ -0,0 +1,62 @@
+import pytest
+
+import app
+
+
+def text(kind, value):
+    return {kind: [{"text": {"content": value}}]}
+
+
+def add_user(fake, user_id, name):
+    fake.create_page(app.USER_DB_ID, {"id": text("title", user_id), "name": text("rich_text", name)})
+
+
+def test_get_users_follows_every_page(fake, client):
+    for i in range(app.QUERY_PAGE_SIZE + 5):
+        add_user(fake, f"user{i}", f"User{i}")
+    users = client.get_users()
+    assert len(users) == app.QUERY_PAGE_SIZE + 5
+    assert users[0]["name_display"] == "Use"
+
+
+def test_cache_keeps_reads_when_another_request_fails(fake, client):
+    add_user(fake, "alice", "Alice")
+    query_database = client.query_database
+
+    def query_while_another_request_fails(*args, **kwargs):
+        # 同じクライアントの別の送信（他のセッション・バックグラウンド送信など）が失敗する
+        client.update_page("missing-page", {})
+        return query_database(*args, **kwargs)
+
+    client.query_database = query_while_another_request_fails
+    assert [user["id"] for user in client.get_users()] == ["alice"]
+    assert client.error_count == 1
+
+    requests_before = fake.stats["requests"]
+    assert [user["id"] for user in client.get_users()] == ["alice"]
+    assert fake.stats["requests"] == requests_before
+    assert client.cache_stats == {"hits": 1, "misses": 1}
+
+
+def test_cache_skips_failed_reads(fake, client, fail_queries):
+    add_user(fake, "alice", "Alice")
+    restore = fail_queries()
+    assert client.get_users() == []
+
+    # 失敗した結果はキャッシュされず、次の読み込みで取り直す
+    restore()
+    assert [user["id"] for user in client.get_users()] == ["alice"]
+    assert client.cache_stats["misses"] == 2
+
+
+def test_get_scores_raises_on_failed_query(client, fail_queries):
+    fail_queries()
+    with pytest.raises(app.NotionQueryError):
+        client.get_scores(raise_on_error=True)
+
+
+def test_writes_invalidate_cached_reads(fake, client):
+    add_user(fake, "alice", "Alice")
+    assert len(client.get_users()) == 1
+    client.create_page(app.USER_DB_ID, {"id": text("title", "bob"), "name": text("rich_text", "Bob")})
+    assert [user["id"] for user in client.get_users()] == ["alice", "bob"]
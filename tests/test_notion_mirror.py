@@ -0,0 +1,63 @@
+import pytest
+
+import app
+from notion_mirror import NotionMirror
+
+
+def add_user(fake, user_id):
+    return fake.create_page(app.USER_DB_ID, {"id": {"title": [{"text": {"content": user_id}}]}})
+
+
+def mirrored_ids(mirror):
+    return sorted(page["properties"]["id"]["title"][0]["text"]["content"] for page in mirror.pages(app.USER_DB_ID))
+
+
+@pytest.fixture
+def mirror(tmp_path):
+    return NotionMirror(str(tmp_path / "mirror.db"))
+
+
+def test_sync_copies_pages(fake, client, mirror):
+    add_user(fake, "alice")
+    add_user(fake, "bob")
+    assert mirror.sync(client, app.USER_DB_ID) == 2
+    assert mirrored_ids(mirror) == ["alice", "bob"]
+
+
+def test_sync_ignores_failures_of_other_requests(fake, client, mirror):
+    add_user(fake, "alice")
+    iter_query = client.iter_query
+
+    def iter_query_while_another_request_fails(*args, **kwargs):
+        # 同じクライアントの別の送信（他のセッション・バックグラウンド送信など）が失敗する
+        client.update_page("missing-page", {})
+        yield from iter_query(*args, **kwargs)
+
+    client.iter_query = iter_query_while_another_request_fails
+    assert mirror.sync(client, app.USER_DB_ID) == 1
+    # 同期は成功として扱われ、再同期の予約は残らない
+    assert not mirror._stale
+
+    add_user(fake, "bob")
+    client.iter_query = iter_query
+    mirror.sync(client, app.USER_DB_ID)
+    assert mirrored_ids(mirror) == ["alice", "bob"]
+
+
+def test_failed_full_resync_keeps_the_mirror(fake, client, mirror, fail_queries):
+    add_user(fake, "alice")
+    mirror.sync(client, app.USER_DB_ID)
+
+    fail_queries()
+    assert mirror.sync(client, app.USER_DB_ID, full=True) is None
+    assert mirrored_ids(mirror) == ["alice"]
+
+
+def test_full_resync_drops_vanished_pages(fake, client, mirror):
+    alice = add_user(fake, "alice")
+    add_user(fake, "bob")
+    mirror.sync(client, app.USER_DB_ID)
+
+    del fake.pages[alice["id"]]
+    assert mirror.sync(client, app.USER_DB_ID, full=True) == 1
+    assert mirrored_ids(mirror) == ["bob"]
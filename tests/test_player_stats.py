@@ -0,0 +1,78 @@
+import pytest
+
+import app
+import fake_notion
+from notion_mirror import NotionMirror
+from player_stats import PlayerStats
+
+EDITED_TIME = "2026-01-01T10:00:00.000Z"
+
+
+def text(kind, value):
+    return {kind: [{"text": {"content": value}}]}
+
+
+@pytest.fixture
+def stats_env(fake, client, tmp_path, monkeypatch):
+    """代替サーバー・ローカル複製・成績集計をつなぎ、集計し直したラウンド数を記録する"""
+    # 同じ分のうちに続けて更新された状態にする（last_edited_time は分単位）
+    monkeypatch.setattr(fake_notion, "_now", lambda: EDITED_TIME)
+    mirror = NotionMirror(str(tmp_path / "local.db"), sync_interval=0)
+    stats = PlayerStats(str(tmp_path / "local.db"))
+    monkeypatch.setattr(app, "get_notion_mirror", lambda: mirror)
+    monkeypatch.setattr(app, "get_player_stats", lambda: stats)
+
+    refreshed = []
+    refresh_rounds = stats.refresh_rounds
+
+    def recording_refresh_rounds(rounds, pages):
+        refreshed.append([game["id"] for game, _ in rounds])
+        refresh_rounds(rounds, pages)
+
+    stats.refresh_rounds = recording_refresh_rounds
+
+    user = fake.create_page(app.USER_DB_ID, {"id": text("title", "alice"), "name": text("rich_text", "Alice")})
+    game = fake.create_page(app.GAME_DB_ID, {
+        "id": text("title", "202601011000"),
+        "play_date": {"date": {"start": "2026-01-01"}},
+        "place": text("rich_text", "テストコース"),
+        "member1": {"relation": [{"id": user["id"]}]}
+    })
+    scores = [
+        fake.create_page(app.SCORE_DB_ID, {
+            "id": text("title", f"202601011000_1_{hole}"),
+            "game": {"relation": [{"id": game["id"]}]},
+            "user": {"relation": [{"id": user["id"]}]},
+            "hole": {"number": hole},
+            "stroke": {"number": 1},
+            "putt": {"number": 2}
+        })
+        for hole in (1, 2)
+    ]
+    return client, stats, refreshed, user, scores
+
+
+def test_unchanged_rounds_are_not_aggregated_again(stats_env):
+    client, stats, refreshed, user, _ = stats_env
+    app.refresh_player_stats(client)
+    assert refreshed == [["202601011000"]]
+    assert stats.watermark() == EDITED_TIME
+
+    # ウォーターマークと同じ時刻のページは反映済みなので、集計し直さない
+    app.refresh_player_stats(client)
+    app.refresh_player_stats(client)
+    assert refreshed == [["202601011000"]]
+    assert stats.player_summary(user["id"])[0]["stroke_sum"] == 2
+
+
+def test_edits_within_the_watermark_minute_are_aggregated(fake, stats_env):
+    client, stats, refreshed, user, scores = stats_env
+    app.refresh_player_stats(client)
+
+    fake.update_page(scores[0]["id"], {"stroke": {"number": -1}})
+    app.refresh_player_stats(client)
+    assert refreshed == [["202601011000"], ["202601011000"]]
+    assert stats.player_summary(user["id"])[0]["stroke_sum"] == 0
+
+    app.refresh_player_stats(client)
+    assert len(refreshed) == 2
@@ -0,0 +1,209 @@
+import pickle
+import random
+
+import pytest
+
+from records import Game, Score, User, parse_game_page, parse_score_page, parse_user_page
+
+
+# ---------- 元の NotionClient.get_users / get_games / get_scores の変換（クエリ結果を受け取る以外はそのまま） ----------
+
+def baseline_get_users(result):
+    users = []
+    if result and "results" in result:
+        for page in result["results"]:
+            user_id = page["properties"]["id"]["title"][0]["text"]["content"] if page["properties"]["id"]["title"] else ""
+            user_name = page["properties"]["name"]["rich_text"][0]["text"]["content"] if page["properties"]["name"]["rich_text"] else ""
+            name_display = page["properties"]["name_display"]["rich_text"][0]["text"]["content"] if page["properties"].get("name_display", {}).get("rich_text") else user_name[:3]
+            users.append({"id": user_id, "name": user_name, "name_display": name_display, "page_id": page["id"]})
+    return users
+
+
+def baseline_get_games(result):
+    games = []
+    if result and "results" in result:
+        for page in result["results"]:
+            game_id = page["properties"]["id"]["title"][0]["text"]["content"] if page["properties"]["id"]["title"] else ""
+            play_date = page["properties"]["play_date"]["date"]["start"] if page["properties"]["play_date"]["date"] else ""
+            place = page["properties"]["place"]["rich_text"][0]["text"]["content"] if page["properties"]["place"]["rich_text"] else ""
+            par = page["properties"]["par"]["number"] if "par" in page["properties"] and page["properties"]["par"]["number"] else 72
+
+            # レート情報を取得
+            gold = page["properties"]["gold"]["number"] if "gold" in page["properties"] and page["properties"]["gold"]["number"] else 4
+            silver = page["properties"]["silver"]["number"] if "silver" in page["properties"] and page["properties"]["silver"]["number"] else 3
+            bronze = page["properties"]["bronze"]["number"] if "bronze" in page["properties"] and page["properties"]["bronze"]["number"] else 2
+            iron = page["properties"]["iron"]["number"] if "iron" in page["properties"] and page["properties"]["iron"]["number"] else 1
+            diamond = page["properties"]["diamond"]["number"] if "diamond" in page["properties"] and page["properties"]["diamond"]["number"] else 5
+
+            # メンバー情報を取得
+            members = []
+            member_names = {}
+            for i in range(1, 5):
+                member_key = f"member{i}"
+                if page["properties"][member_key]["relation"]:
+                    member_id = page["properties"][member_key]["relation"][0]["id"]
+                    members.append(member_id)
+                    # メンバー名も取得する（後でユーザー情報から名前を検索するため）
+                    member_names[f"member{i}_id"] = member_id
+                else:
+                    member_names[f"member{i}_id"] = None
+
+            games.append({
+                "id": game_id,
+                "play_date": play_date,
+                "place": place,
+                "par": par,
+                "members": members,
+                "member_ids": member_names,  # 個別のメンバーID情報を追加
+                "gold": gold,
+                "silver": silver,
+                "bronze": bronze,
+                "iron": iron,
+                "diamond": diamond,
+                "page_id": page["id"]
+            })
+    return games
+
+
+def baseline_get_scores(result):
+    scores = []
+    if result and "results" in result:
+        for page in result["results"]:
+            score_id = page["properties"]["id"]["title"][0]["text"]["content"] if page["properties"]["id"]["title"] else ""
+            hole = page["properties"]["hole"]["number"] if page["properties"]["hole"]["number"] else 0
+            stroke = page["properties"]["stroke"]["number"] if page["properties"]["stroke"]["number"] else 0
+            putt = page["properties"]["putt"]["number"] if page["properties"]["putt"]["number"] else 0
+            snake = page["properties"]["snake"]["number"] if page["properties"]["snake"]["number"] else 0
+            olympic = page["properties"]["olympic"]["select"]["name"] if page["properties"]["olympic"]["select"] else ""
+            snake_out = page["properties"]["snake_out"]["checkbox"] if "snake_out" in page["properties"] and page["properties"]["snake_out"] else False
+            birdie = page["properties"]["birdie"]["checkbox"] if "birdie" in page["properties"] and page["properties"]["birdie"] else False
+
+            # ゲームとユーザーのリレーション
+            game_relation = page["properties"]["game"]["relation"][0]["id"] if page["properties"]["game"]["relation"] else ""
+            user_relation = page["properties"]["user"]["relation"][0]["id"] if page["properties"]["user"]["relation"] else ""
+
+            scores.append({
+                "id": score_id,
+                "hole": hole,
+                "stroke": stroke,
+                "putt": putt,
+                "snake": snake,
+                "olympic": olympic,
+                "snake_out": snake_out,
+                "birdie": birdie,
+                "game_relation": game_relation,
+                "user_relation": user_relation,
+                "page_id": page["id"]
+            })
+    return scores
+
+
+# ---------- フィクスチャ ----------
+
+def text(kind, *values):
+    return {kind: [{"type": "text", "text": {"content": value}, "plain_text": value} for value in values]}
+
+
+def relation(*page_ids):
+    return {"relation": [{"id": page_id} for page_id in page_ids]}
+
+
+USER_PAGES = [
+    {"id": "u1", "properties": {"id": text("title", "alice"), "name": text("rich_text", "Alice"), "name_display": text("rich_text", "A")}},
+    # 表示名のプロパティがない・空・内容が空文字
+    {"id": "u2", "properties": {"id": text("title", "bob"), "name": text("rich_text", "Bobby")}},
+    {"id": "u3", "properties": {"id": text("title", "carol"), "name": text("rich_text", "Carol"), "name_display": text("rich_text")}},
+    {"id": "u4", "properties": {"id": text("title", "dave"), "name": text("rich_text", "Dave"), "name_display": text("rich_text", "")}},
+    {"id": "u5", "properties": {"id": text("title"), "name": text("rich_text")}}
+]
+
+GAME_PAGES = [
+    {"id": "g1", "properties": {
+        "id": text("title", "202601011000"),
+        "play_date": {"date": {"start": "2026-01-01"}},
+        "place": text("rich_text", "テストコース"),
+        "par": {"number": 70},
+        "member1": relation("a"), "member2": relation(), "member3": relation("c", "x"), "member4": relation(),
+        "gold": {"number": 10}, "silver": {"number": None}, "diamond": {"number": 0}
+    }},
+    # 日付・場所・パー・レートが未設定
+    {"id": "g2", "properties": {
+        "id": text("title"),
+        "play_date": {"date": None},
+        "place": text("rich_text"),
+        "par": {"number": None},
+        **{f"member{i}": relation() for i in range(1, 5)}
+    }}
+]
+
+
+def random_score_pages(count, seed=0):
+    """Notionの応答と同じく全プロパティを含むスコアページ（未入力の値・チェックボックスなしを含む）"""
+    rng = random.Random(seed)
+    pages = []
+    for i in range(count):
+        properties = {
+            "id": text("title", *([f"202601011000_{i % 4 + 1}_{i % 18 + 1}"] if rng.random() < 0.95 else [])),
+            "game": relation(*(["game-page"] if rng.random() < 0.8 else [])),
+            "user": relation(*([f"user-{i % 4}"] if rng.random() < 0.9 else [])),
+            "hole": {"number": rng.choice([None, 0, i % 18 + 1])},
+            "stroke": {"number": rng.choice([None, -2, -1, 0, 1, 3])},
+            "putt": {"number": rng.choice([None, 0, 1, 2, 3])},
+            "snake": {"number": rng.choice([None, 0, 1, 2])},
+            "olympic": {"select": rng.choice([None, {"name": "金"}, {"name": "ダイヤモンド"}])}
+        }
+        if rng.random() < 0.7:
+            properties["snake_out"] = {"checkbox": rng.random() < 0.3}
+        if rng.random() < 0.7:
+            properties["birdie"] = {"checkbox": rng.random() < 0.3}
+        pages.append({"id": f"s{i}", "properties": properties})
+    return pages
+
+
+SCORE_PAGES = random_score_pages(300)
+
+
+# ---------- テスト ----------
+
+def test_parse_user_page_matches_baseline():
+    assert [dict(parse_user_page(page)) for page in USER_PAGES] == baseline_get_users({"results": USER_PAGES})
+
+
+def test_parse_game_page_matches_baseline():
+    assert [dict(parse_game_page(page)) for page in GAME_PAGES] == baseline_get_games({"results": GAME_PAGES})
+
+
+def test_parse_score_page_matches_baseline():
+    assert [dict(parse_score_page(page)) for page in SCORE_PAGES] == baseline_get_scores({"results": SCORE_PAGES})
+
+
+@pytest.mark.parametrize("properties, expected", [
+    ({"id": text("title", "202601011000_1_3"), "olympic": {"select": None}}, {"id": "202601011000_1_3"}),
+    ({"hole": {"number": 3}, "snake_out": {"checkbox": True}}, {"hole": 3, "snake_out": True}),
+    ({}, {})
+])
+def test_parse_score_page_defaults_omitted_properties(properties, expected):
+    # filter_properties で一部のプロパティだけを取得した場合（元の変換にはない機能）
+    defaults = {
+        "id": "", "hole": 0, "stroke": 0, "putt": 0, "snake": 0, "olympic": "",
+        "snake_out": False, "birdie": False, "game_relation": "", "user_relation": "", "page_id": "s"
+    }
+    assert dict(parse_score_page({"id": "s", "properties": properties})) == {**defaults, **expected}
+
+
+def test_records_read_like_dicts():
+    score = parse_score_page(SCORE_PAGES[0])
+    assert isinstance(score, Score)
+    assert score["stroke"] == score.stroke
+    assert score.get("missing", "default") == "default"
+    assert "olympic" in score and "missing" not in score
+    assert {**score}["page_id"] == score.page_id
+    with pytest.raises(KeyError):
+        score["get"]
+
+
+def test_records_have_no_instance_dict():
+    for record in (parse_user_page(USER_PAGES[0]), parse_game_page(GAME_PAGES[0]), parse_score_page(SCORE_PAGES[0])):
+        assert isinstance(record, (User, Game, Score))
+        assert not hasattr(record, "__dict__")
+        assert pickle.loads(pickle.dumps(record)) == record
@@ -0,0 +1,207 @@
+import random
+
+import pytest
+
+from scoreboard import OLYMPIC_MEDALS, ScoreBoard
+from scoring import (
+    DEFAULT_OLYMPIC_RATES,
+    EXACT_SETTLEMENT_LIMIT,
+    balances,
+    event_totals,
+    olympic_rates,
+    round_events,
+    score_round,
+    settle,
+    settlement_relations
+)
+
+
+def make_board(names, scores):
+    """メンバー名と {(メンバー名, ホール): 値} からScoreBoardを作る"""
+    members = [{"page_id": f"page-{name}", "name": name} for name in names]
+    rows = [
+        {
+            "user_relation": f"page-{name}",
+            "hole": hole,
+            "stroke": values.get("stroke", 0),
+            "putt": values.get("putt", 2),
+            "snake": values.get("snake", 0),
+            "olympic": values.get("olympic", ""),
+            "snake_out": values.get("snake_out", False)
+        }
+        for (name, hole), values in scores.items()
+    ]
+    return ScoreBoard(members, rows)
+
+
+def net_amounts(transfers):
+    """支払い一覧から各メンバーの受取額の合計（支払いは負）"""
+    net = {}
+    for transfer in transfers:
+        net[transfer["to"]] = net.get(transfer["to"], 0) + transfer["amount"]
+        net[transfer["from"]] = net.get(transfer["from"], 0) - transfer["amount"]
+    return {player: amount for player, amount in net.items() if amount}
+
+
+def random_board(rng, player_count):
+    """全ホール記録済みのランダムなラウンド"""
+    names = [f"p{i}" for i in range(player_count)]
+    scores = {}
+    for hole in range(1, 19):
+        out_player = rng.choice(names) if hole % 3 == 0 and rng.random() < 0.7 else None
+        for name in names:
+            scores[(name, hole)] = {
+                "stroke": rng.choice([-3, -2, -1, 0, 0, 1, 2]),
+                "snake": rng.choice([0, 0, 1, 2]),
+                "olympic": rng.choice(OLYMPIC_MEDALS) if rng.random() < 0.3 else "",
+                "snake_out": name == out_player
+            }
+    return make_board(names, scores)
+
+
+def random_balances(rng, player_count):
+    """合計0で、全員の収支が0でないランダムな最終収支"""
+    amounts = [rng.randint(1, 500) * rng.choice((1, -1)) for _ in range(player_count - 1)]
+    if sum(amounts) == 0:
+        amounts[0] += 1 if amounts[0] > 0 else -1
+    amounts.append(-sum(amounts))
+    return {f"p{i}": amount for i, amount in enumerate(amounts)}
+
+
+# A: 1番でバーディー・金、2番でヘビ1
+# B: 2番でイーグル、5番で-4（アルバトロス扱い）
+# C: 3番でヘビ2・アウト（1〜3番の全員のヘビ3を失点）
+ROUND_SCORES = {
+    ("A", 1): {"stroke": -1, "olympic": "金"},
+    ("A", 2): {"snake": 1},
+    ("B", 2): {"stroke": -2},
+    ("B", 5): {"stroke": -4},
+    ("C", 3): {"snake": 2, "snake_out": True}
+}
+
+
+@pytest.fixture
+def board():
+    return make_board(["A", "B", "C"], ROUND_SCORES)
+
+
+def test_round_events(board):
+    assert round_events(board, DEFAULT_OLYMPIC_RATES) == [
+        {"type": "olympic", "player": "A", "points": 4},
+        {"type": "special", "player": "A", "points": 1},
+        {"type": "special", "player": "B", "points": 3},
+        {"type": "special", "player": "B", "points": 5},
+        {"type": "snake", "player": "C", "points": 3}
+    ]
+
+
+def test_round_events_use_game_rates(board):
+    rates = olympic_rates({"gold": 10})
+    assert rates == {**DEFAULT_OLYMPIC_RATES, "金": 10}
+    assert round_events(board, rates)[0] == {"type": "olympic", "player": "A", "points": 10}
+
+
+def test_event_totals(board):
+    events = round_events(board, DEFAULT_OLYMPIC_RATES)
+    assert event_totals(events, ["A", "B", "C"]) == {
+        "A": {"olympic": 4, "special": 1, "snake": 0},
+        "B": {"olympic": 0, "special": 8, "snake": 0},
+        "C": {"olympic": 0, "special": 0, "snake": 3}
+    }
+
+
+def test_balances(board):
+    events = round_events(board, DEFAULT_OLYMPIC_RATES)
+    # A: +5×2 -8 +3、B: -5 +8×2 +3、C: -5 -8 -3×2
+    assert balances(events, ["A", "B", "C"]) == {"A": 5, "B": 14, "C": -19}
+
+
+def test_snake_out_counts_only_its_three_hole_window():
+    board = make_board(["A", "B"], {
+        ("A", 3): {"snake": 5},
+        ("A", 4): {"snake": 1},
+        ("B", 5): {"snake": 2},
+        ("B", 6): {"snake_out": True},
+        ("A", 9): {"snake_out": True}
+    })
+    events = [event for event in round_events(board, DEFAULT_OLYMPIC_RATES) if event["type"] == "snake"]
+    # 4〜6番のヘビは1+2、7〜9番はヘビなしでも0点のイベントになる
+    assert events == [
+        {"type": "snake", "player": "A", "points": 0},
+        {"type": "snake", "player": "B", "points": 3}
+    ]
+
+
+def test_unrecorded_holes_are_ignored():
+    board = make_board(["A", "B"], {("A", 1): {"stroke": 0}})
+    assert round_events(board, DEFAULT_OLYMPIC_RATES) == []
+    assert score_round(board, DEFAULT_OLYMPIC_RATES)["balances"] == {"A": 0, "B": 0}
+
+
+def test_settle(board):
+    final_balances = score_round(board, DEFAULT_OLYMPIC_RATES)["balances"]
+    assert settle(final_balances) == [
+        {"from": "C", "to": "B", "amount": 14},
+        {"from": "C", "to": "A", "amount": 5}
+    ]
+
+
+def test_settle_splits_into_zero_sum_groups():
+    # 貪欲法だけでは4回になるが、{d, e} と {a, b, c} に分ければ3回で済む
+    transfers = settle({"a": 6, "b": -4, "c": -2, "d": 5, "e": -5})
+    assert len(transfers) == 3
+    assert {"from": "e", "to": "d", "amount": 5} in transfers
+
+
+def test_settle_skips_settled_players():
+    assert settle({"a": 0, "b": 0}) == []
+
+
+def test_settle_rejects_non_zero_sum():
+    with pytest.raises(ValueError):
+        settle({"a": 3, "b": -2})
+
+
+def test_settlement_relations():
+    relations = settlement_relations([{"from": "C", "to": "B", "amount": 14}], ["A", "B", "C"])
+    assert relations == {"A": {}, "B": {"C": 14}, "C": {"B": -14}}
+
+
+@pytest.mark.parametrize("seed", range(50))
+@pytest.mark.parametrize("player_count", [2, 4])
+def test_transfers_net_to_balances(seed, player_count):
+    rng = random.Random(seed)
+    board = random_board(rng, player_count)
+    final_balances = score_round(board, DEFAULT_OLYMPIC_RATES)["balances"]
+    assert sum(final_balances.values()) == 0
+
+    transfers = settle(final_balances)
+    assert net_amounts(transfers) == {player: amount for player, amount in final_balances.items() if amount}
+    assert all(transfer["amount"] > 0 for transfer in transfers)
+    assert len(transfers) <= max(0, sum(1 for amount in final_balances.values() if amount) - 1)
+
+
+@pytest.mark.parametrize("seed", range(20))
+@pytest.mark.parametrize("player_count", [EXACT_SETTLEMENT_LIMIT, 60])
+def test_season_transfers_net_to_balances(seed, player_count):
+    # シーズン全体の精算（厳密解の上限ちょうど・貪欲法）でも収支と一致する
+    final_balances = random_balances(random.Random(seed), player_count)
+    transfers = settle(final_balances)
+    assert net_amounts(transfers) == final_balances
+    assert len(transfers) <= player_count - 1
+
+
+# ---------- ベンチマーク（pytest-benchmark） ----------
+
+def test_benchmark_score_round(benchmark):
+    board = random_board(random.Random(0), 4)
+    result = benchmark(score_round, board, DEFAULT_OLYMPIC_RATES)
+    assert sum(result["balances"].values()) == 0
+
+
+@pytest.mark.parametrize("player_count", [4, EXACT_SETTLEMENT_LIMIT, 200])
+def test_benchmark_settle(benchmark, player_count):
+    # 1ラウンド（4人）、最小回数を厳密に求める上限の人数、貪欲法になるシーズン全体の人数
+    final_balances = random_balances(random.Random(player_count), player_count)
+    transfers = benchmark(settle, final_balances)
+    assert net_amounts(transfers) == final_balances
@@ -0,0 +1,68 @@
+import pytest
+
+import app
+import transfer
+
+
+def text(kind, value):
+    return {kind: [{"text": {"content": value}}]}
+
+
+def seed_round(fake, game_id, play_date):
+    """メンバー1人・1ホール分のスコアがあるラウンドを作る（play_date=None ならプレー日なし）"""
+    user = fake.create_page(app.USER_DB_ID, {"id": text("title", f"user{game_id}"), "name": text("rich_text", "Alice")})
+    properties = {
+        "id": text("title", game_id),
+        "place": text("rich_text", "テストコース"),
+        "member1": {"relation": [{"id": user["id"]}]}
+    }
+    if play_date:
+        properties["play_date"] = {"date": {"start": play_date}}
+    game = fake.create_page(app.GAME_DB_ID, properties)
+    fake.create_page(app.SCORE_DB_ID, {
+        "id": text("title", f"{game_id}_1_3"),
+        "game": {"relation": [{"id": game["id"]}]},
+        "user": {"relation": [{"id": user["id"]}]},
+        "hole": {"number": 3},
+        "stroke": {"number": -1},
+        "putt": {"number": 1},
+        "snake": {"number": 1},
+        "olympic": {"select": {"name": "金"}},
+        "snake_out": {"checkbox": True}
+    })
+
+
+def read_tables(out_dir, file_format):
+    """書き出したファイルを {テーブル: page_idを除いた行（ID順）} として読む"""
+    tables = {}
+    for table in transfer.COLUMNS:
+        rows = list(transfer.read_rows(str(out_dir / f"{table}.{file_format}"), table))
+        tables[table] = sorted(({**row, "page_id": None} for row in rows), key=lambda row: row["id"])
+    return tables
+
+
+@pytest.mark.parametrize("file_format", ["csv", "parquet"])
+def test_export_import_round_trip(fake, client, tmp_path, file_format):
+    if file_format == "parquet" and transfer.pq is None:
+        pytest.skip("pyarrow is not installed")
+    seed_round(fake, "202601011000", "2026-01-01")
+    seed_round(fake, "202602011000", None)
+
+    assert transfer.export_all(client, str(tmp_path / "before"), file_format)
+    before = read_tables(tmp_path / "before", file_format)
+    assert {row["id"]: row["play_date"] or None for row in before["games"]} == {
+        "202601011000": "2026-01-01",
+        "202602011000": None
+    }
+
+    # 空のワークスペースに取り込み直し、もう一度書き出す
+    fake.pages.clear()
+    client.invalidate_cache()
+    for table in ("users", "games", "scores"):
+        path = str(tmp_path / "before" / f"{table}.{file_format}")
+        assert transfer.import_rows(client, table, path, str(tmp_path / f"{table}.checkpoint")) == (2, 0, 0)
+        client.invalidate_cache()
+
+    assert transfer.export_all(client, str(tmp_path / "after"), file_format)
+    assert read_tables(tmp_path / "after", file_format) == before
+
@@ -0,0 +1,279 @@
+# ユーザー・ラウンド・スコアのエクスポート／インポート（Notionの設定はアプリと同じ secrets.toml を使う）
+#   python transfer.py export 出力先ディレクトリ [--format parquet|csv]
+#   python transfer.py import {users|games|scores} 入力ファイル(.csv/.parquet) [--checkpoint ファイル]
+import argparse
+import csv
+import os
+import sys
+from itertools import islice
+
+from app import (
+    GAME_DB_ID,
+    SCORE_DB_ID,
+    USER_DB_ID,
+    NotionClient
+)
+from notion_mirror import normalize_id
+from records import parse_game_page, parse_score_page, parse_user_page
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+# エクスポート・インポート時にまとめて扱う行数
+CHUNK_SIZE = 500
+
+# テーブルごとの列と型（str / int / bool）
+COLUMNS = {
+    "users": [
+        ("id", "str"), ("name", "str"), ("name_display", "str"), ("page_id", "str")
+    ],
+    "games": [
+        ("id", "str"), ("play_date", "str"), ("place", "str"), ("par", "int"),
+        ("gold", "int"), ("silver", "int"), ("bronze", "int"), ("iron", "int"), ("diamond", "int"),
+        ("member1", "str"), ("member2", "str"), ("member3", "str"), ("member4", "str"), ("page_id", "str")
+    ],
+    "scores": [
+        ("id", "str"), ("game_id", "str"), ("user_id", "str"), ("hole", "int"), ("stroke", "int"),
+        ("putt", "int"), ("snake", "int"), ("olympic", "str"), ("snake_out", "bool"), ("page_id", "str")
+    ]
+}
+
+DB_IDS = {"users": USER_DB_ID, "games": GAME_DB_ID, "scores": SCORE_DB_ID}
+
+
+def chunked(iterable, size=CHUNK_SIZE):
+    """イテレータをsize件ずつのリストに区切る"""
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+# ---------- エクスポート ----------
+
+def export_rows(client, table, users_by_page_id, games_by_page_id):
+    """Notionのページを1件ずつ取得し、エクスポート用の行に変換して返す"""
+    for page in client.iter_query(DB_IDS[table]):
+        if table == "users":
+            yield dict(parse_user_page(page))
+        elif table == "games":
+            game = parse_game_page(page)
+            row = {column: game[column] for column, _ in COLUMNS["games"] if column in game}
+            for i in range(1, 5):
+                member_page_id = normalize_id(game["member_ids"][f"member{i}_id"])
+                row[f"member{i}"] = users_by_page_id[member_page_id]["id"] if member_page_id in users_by_page_id else None
+            yield row
+        else:
+            score = parse_score_page(page)
+            game = games_by_page_id.get(normalize_id(score["game_relation"]))
+            user = users_by_page_id.get(normalize_id(score["user_relation"]))
+            yield {
+                **score,
+                # ラウンドのリレーションがない古いスコアはIDの接頭辞をラウンドIDとする
+                "game_id": game["id"] if game else score["id"].rsplit("_", 2)[0],
+                "user_id": user["id"] if user else None
+            }
+
+
+def write_csv(path, table, rows):
+    """行をCSVに逐次書き出し、件数を返す"""
+    count = 0
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=[column for column, _ in COLUMNS[table]], extrasaction="ignore")
+        writer.writeheader()
+        for chunk in chunked(rows):
+            writer.writerows(chunk)
+            count += len(chunk)
+    return count
+
+
+def write_parquet(path, table, rows):
+    """行をCHUNK_SIZE件ずつParquetの行グループとして書き出し、件数を返す"""
+    arrow_types = {"str": pa.string(), "int": pa.int64(), "bool": pa.bool_()}
+    schema = pa.schema([(column, arrow_types[kind]) for column, kind in COLUMNS[table]])
+    count = 0
+    with pq.ParquetWriter(path, schema) as writer:
+        for chunk in chunked(rows):
+            writer.write_table(pa.Table.from_pylist(chunk, schema=schema))
+            count += len(chunk)
+    return count
+
+
+def export_all(client, out_dir, file_format):
+    """ユーザー・ラウンド・スコアを1ファイルずつ書き出す"""
+    os.makedirs(out_dir, exist_ok=True)
+    users_by_page_id = {normalize_id(user["page_id"]): user for user in client.get_users()}
+    games_by_page_id = {normalize_id(game["page_id"]): game for game in client.get_games()}
+    writer = write_parquet if file_format == "parquet" else write_csv
+
+    for table in ("users", "games", "scores"):
+        error_count = client.error_count
+        path = os.path.join(out_dir, f"{table}.{file_format}")
+        count = writer(path, table, export_rows(client, table, users_by_page_id, games_by_page_id))
+        if client.error_count != error_count:
+            print(f"{table}: 取得中にエラーが発生しました（{count}件のみ書き出し）", file=sys.stderr)
+            return False
+        print(f"{table}: {count}件 -> {path}")
+    return True
+
+
+# ---------- インポート ----------
+
+def read_rows(path, table):
+    """CSV/Parquetから1行ずつ読み込み、列の型を揃えて返す"""
+    if path.endswith(".parquet"):
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=CHUNK_SIZE):
+            yield from batch.to_pylist()
+        return
+
+    converters = {
+        "str": lambda value: value or None,
+        "int": lambda value: int(value) if value not in ("", None) else 0,
+        "bool": lambda value: str(value).lower() in ("true", "1", "yes")
+    }
+    types = dict(COLUMNS[table])
+    with open(path, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            yield {column: converters[types[column]](value) for column, value in row.items() if column in types}
+
+
+def page_properties(table, row, users_by_id, games_by_id):
+    """インポートする行をNotionのプロパティに変換する（参照先が見つからなければエラーメッセージ）"""
+    if table == "users":
+        return {
+            "id": {"title": [{"text": {"content": row["id"]}}]},
+            "name": {"rich_text": [{"text": {"content": row["name"]}}]},
+            "name_display": {"rich_text": [{"text": {"content": row.get("name_display") or row["name"][:3]}}]}
+        }, None
+
+    if table == "games":
+        properties = {
+            "id": {"title": [{"text": {"content": row["id"]}}]},
+            "place": {"rich_text": [{"text": {"content": row["place"] or ""}}]}
+        }
+        # プレー日が未設定のラウンドは日付を送らない（空の日付はNotionでエラーになる）
+        if row.get("play_date"):
+            properties["play_date"] = {"date": {"start": row["play_date"]}}
+        for column in ("par", "gold", "silver", "bronze", "iron", "diamond"):
+            if row.get(column):
+                properties[column] = {"number": row[column]}
+        for i in range(1, 5):
+            user_id = row.get(f"member{i}")
+            if not user_id:
+                continue
+            if user_id not in users_by_id:
+                return None, f"ユーザー '{user_id}' が見つかりません"
+            properties[f"member{i}"] = {"relation": [{"id": users_by_id[user_id]["page_id"]}]}
+        return properties, None
+
+    game = games_by_id.get(row["game_id"])
+    user = users_by_id.get(row["user_id"])
+    if not game:
+        return None, f"ラウンド '{row['game_id']}' が見つかりません"
+    if not user:
+        return None, f"ユーザー '{row['user_id']}' が見つかりません"
+
+    properties = {
+        "id": {"title": [{"text": {"content": row["id"]}}]},
+        "game": {"relation": [{"id": game["page_id"]}]},
+        "user": {"relation": [{"id": user["page_id"]}]},
+        "hole": {"number": row["hole"]},
+        "stroke": {"number": row["stroke"]},
+        "putt": {"number": row["putt"]},
+        "snake": {"number": row["snake"]}
+    }
+    if row["hole"] % 3 == 0:
+        properties["snake_out"] = {"checkbox": bool(row.get("snake_out"))}
+    if row.get("olympic"):
+        properties["olympic"] = {"select": {"name": row["olympic"]}}
+    return properties, None
+
+
+def load_checkpoint(path):
+    """インポート済みの行ID一覧を読み込む"""
+    if not os.path.exists(path):
+        return set()
+    with open(path, encoding="utf-8") as f:
+        return {line.strip() for line in f if line.strip()}
+
+
+def import_rows(client, table, path, checkpoint_path):
+    """ファイルの行をページとして作成する
+
+    作成できた行のIDをチェックポイントに追記していき、再実行時は作成済みの行を飛ばす。
+    戻り値: (作成件数, スキップ件数, 失敗件数)
+    """
+    done = load_checkpoint(checkpoint_path)
+    users_by_id = {user["id"]: user for user in client.get_users()}
+    games_by_id = {game["id"]: game for game in client.get_games()}
+
+    created_count = 0
+    skipped_count = 0
+    error_count = 0
+    with open(checkpoint_path, "a", encoding="utf-8") as checkpoint:
+        for chunk in chunked(read_rows(path, table)):
+            writes = []
+            row_ids = []
+            for row in chunk:
+                if row["id"] in done:
+                    skipped_count += 1
+                    continue
+                properties, error = page_properties(table, row, users_by_id, games_by_id)
+                if error:
+                    error_count += 1
+                    print(f"{row['id']}: {error}", file=sys.stderr)
+                    continue
+                writes.append({"db_id": DB_IDS[table], "properties": properties})
+                row_ids.append(row["id"])
+
+            # 並列・レート制限付きで送信し、成功した行だけチェックポイントに記録
+            for row_id, (_, error) in zip(row_ids, client.batch_write(writes)):
+                if error:
+                    error_count += 1
+                    print(f"{row_id}: {error}", file=sys.stderr)
+                    continue
+                created_count += 1
+                done.add(row_id)
+                checkpoint.write(row_id + "\n")
+            checkpoint.flush()
+            print(f"{table}: 作成 {created_count}件 / スキップ {skipped_count}件 / 失敗 {error_count}件")
+    return created_count, skipped_count, error_count
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="ユーザー・ラウンド・スコアのエクスポート／インポート")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    export_parser = subparsers.add_parser("export", help="Notionの全データをファイルに書き出す")
+    export_parser.add_argument("out_dir")
+    export_parser.add_argument("--format", choices=["parquet", "csv"], default="parquet")
+
+    import_parser = subparsers.add_parser("import", help="ファイルの行をNotionに作成する")
+    import_parser.add_argument("table", choices=list(COLUMNS))
+    import_parser.add_argument("path")
+    import_parser.add_argument("--checkpoint", help="作成済みの行IDを記録するファイル（既定: 入力ファイル名.checkpoint）")
+
+    args = parser.parse_args(argv)
+    uses_parquet = (args.command == "export" and args.format == "parquet") or (
+        args.command == "import" and args.path.endswith(".parquet")
+    )
+    if uses_parquet and pq is None:
+        print("Parquetを扱うには pyarrow をインストールしてください（CSVは不要）", file=sys.stderr)
+        return 1
+
+    client = NotionClient()
+    if args.command == "export":
+        return 0 if export_all(client, args.out_dir, args.format) else 1
+
+    _, _, error_count = import_rows(client, args.table, args.path, args.checkpoint or f"{args.path}.checkpoint")
+    return 1 if error_count else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())